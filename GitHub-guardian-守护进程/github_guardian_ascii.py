@@ -9,19 +9,27 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # 从service层导入工具函数
-from service.config_utils import load_config
+from service.config_utils import load_config, watch_config
 from service.guardian_utils import (
     save_state, load_state, is_admin,
     find_best_ip, check_connection, get_current_hosts_github_ip,
     update_hosts
 )
+from github_utils.config_cache_utils import poll_config_changes
+from github_utils.health_utils import get_health_monitor
 
 
-# 加载配置
-CONFIG = load_config()
-IP_POOL = CONFIG["ip_pool"]
-CHECK_INTERVAL = CONFIG["check_interval"]
-TIMEOUT = CONFIG["timeout"]
+def apply_config(config):
+    """应用配置（配置文件修改后无需重启即可生效）"""
+    global CONFIG, IP_POOL, CHECK_INTERVAL, TIMEOUT
+    CONFIG = config
+    IP_POOL = config["ip_pool"]
+    CHECK_INTERVAL = config["check_interval"]
+    TIMEOUT = config["timeout"]
+
+
+apply_config(load_config())
+watch_config(apply_config)
 
 running = True
 
@@ -37,9 +45,10 @@ def check_and_repair(force=False):
         if saved_ip == current_ip and time.time() - saved_time < CHECK_INTERVAL:
             return {"status": "cached", "ip": current_ip, "message": "使用缓存状态"}
 
-    if check_connection(IP_POOL, TIMEOUT):
-        last_status = {"status": "ok", "ip": current_ip, "time": time.time()}
-        save_state(last_status)
+    # 界面或巡检刚探测过且GitHub可访问时直接采用共享的健康状态，不再重复探测
+    health = get_health_monitor().latest(CHECK_INTERVAL)
+    if (health and health.get("status") in ("good", "warn")) or check_connection(IP_POOL, TIMEOUT):
+        save_state({"status": "ok", "ip": current_ip, "time": time.time()})
         return {"status": "OK", "ip": current_ip, "message": "连接正常"}
 
     if not is_admin():
@@ -53,8 +62,7 @@ def check_and_repair(force=False):
             save_state(last_status)
             return {"status": "OK", "ip": ip, "update": result, "message": "已修复"}
         return {"status": "FAIL", "ip": ip, "error": result.get("error", "更新失败")}
-    else:
-        return {"status": "FAIL", "ip": None, "error": "无可用IP"}
+    return {"status": "FAIL", "ip": None, "error": "无可用IP"}
 
 
 def signal_handler(signum, frame):
@@ -87,10 +95,11 @@ def guardian_loop():
         else:
             print(f"[{time.strftime('%H:%M:%S')}] 状态: 异常 - {result.get('error', '未知错误')}")
 
-        for _ in range(CHECK_INTERVAL):
-            if not running:
-                break
+        waited = 0
+        while running and waited < CHECK_INTERVAL:
+            poll_config_changes()
             time.sleep(1)
+            waited += 1
 
     print("\n守护进程已退出")
 
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""导入耗时基准：在独立子进程中导入trace/service层模块，统计耗时和已加载的子项目模块数"""
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent
+MODULES = [
+    "trace.ip_speed_ranking",
+    "trace.quick_speed_test",
+    "trace.dns_explorer",
+    "trace.scheduled_inspection",
+    "service.auto_diagnose_service",
+    "service.connection_diagnostic_service",
+]
+ROUNDS = 5
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+try:
+    import {module}
+    ok = "ok"
+except Exception as e:
+    ok = type(e).__name__
+elapsed = (time.perf_counter() - start) * 1000
+loaded = sum(1 for name in sys.modules if name.startswith("github_tools_"))
+print(f"{{elapsed:.1f}} {{loaded}} {{ok}}")
+"""
+
+
+def measure(module):
+    """多次在新进程中导入模块，返回 (耗时中位数ms, 子项目模块数, 状态)"""
+    samples = []
+    for _ in range(ROUNDS):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT_DIR), str(ROOT_DIR / "service")]))
+        )
+        line = (result.stdout.strip().splitlines() or ["0 0 error"])[-1]
+        elapsed, loaded, status = line.split()
+        samples.append(float(elapsed))
+    return statistics.median(samples), int(loaded), status
+
+
+def main():
+    print("=== trace/service 层导入耗时 ===")
+    print(f"{'模块':<40} {'耗时(ms)':>10} {'子项目模块':>10}  状态")
+    for module in MODULES:
+        elapsed, loaded, status = measure(module)
+        print(f"{module:<40} {elapsed:>10.1f} {loaded:>10}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""主界面冷启动基准：导入耗时、最重的导入项（-X importtime）和首帧绘制耗时"""
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent
+ROUNDS = 5
+TOP_N = 10
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import main_gui
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+print(" ".join(name for name in ("ssl", "tkinter", "concurrent.futures") if name in sys.modules))
+"""
+
+# 首帧绘制：导入并构建主界面，第一次事件循环空闲时（窗口已绘制）记录耗时并退出
+PAINT_PROBE = """
+import time
+start = time.perf_counter()
+import tkinter
+
+def mainloop(self, n=0):
+    self.update()
+    print(f"{(time.perf_counter() - start) * 1000:.1f}")
+    self.destroy()
+
+tkinter.Misc.mainloop = mainloop
+import main_gui
+main_gui.main()
+"""
+
+
+def run_probe(code, *flags):
+    """在新进程中运行探测代码"""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    )
+
+
+def measure_import():
+    """导入 main_gui 的耗时中位数（ms）和已加载的重量级模块"""
+    samples, heavy = [], ""
+    for _ in range(ROUNDS):
+        lines = run_probe(IMPORT_PROBE).stdout.splitlines()
+        samples.append(float(lines[0]))
+        heavy = lines[1] if len(lines) > 1 else ""
+    return statistics.median(samples), heavy or "无"
+
+
+def top_imports():
+    """解析 -X importtime 输出，返回累计耗时最高的导入项 [(累计us, 模块名), ...]"""
+    rows = []
+    for line in run_probe("import main_gui", "-X", "importtime").stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:TOP_N]
+
+
+def measure_first_paint():
+    """首帧绘制耗时中位数（ms），没有图形环境时返回 None"""
+    samples = []
+    for _ in range(ROUNDS):
+        result = run_probe(PAINT_PROBE)
+        if result.returncode != 0:
+            return None
+        samples.append(float(result.stdout.splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main():
+    print("=== 主界面冷启动基准 ===")
+    elapsed, heavy = measure_import()
+    print(f"导入 main_gui: {elapsed:.1f}ms（已加载: {heavy}）")
+
+    print(f"\n累计导入耗时前{TOP_N}项（-X importtime）:")
+    for cumulative, name in top_imports():
+        print(f"  {cumulative / 1000:>8.1f}ms  {name}")
+
+    paint = measure_first_paint()
+    print(f"\n首帧绘制: {f'{paint:.1f}ms' if paint is not None else '无图形环境，已跳过'}")
+
+
+if __name__ == "__main__":
+    main()
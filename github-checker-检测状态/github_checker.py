@@ -1,72 +1,57 @@
 # -*- coding: ascii -*-
 """
-GitHub Checker v2.0.0 - Simple GitHub accessibility checker
+GitHub Checker v2.1.0 - Simple GitHub accessibility checker
 """
 
-import time
-import socket
-import ssl
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from github_utils.common_utils import create_spinner
+from github_utils.aio_utils import run_sync, http_probe_async, probe_targets_async, summarize_check
 
 TARGETS = [
     ("homepage", "github.com", 443),
+    ("api", "api.github.com", 443),
+    ("raw", "raw.githubusercontent.com", 443),
+    ("objects", "objects.githubusercontent.com", 443),
+    ("codeload", "codeload.github.com", 443),
+    ("assets", "github.githubassets.com", 443),
 ]
 DEFAULT_TIMEOUT = 8.0
+THRESHOLD_MS = 3000
 
 
 def test_connection(host, port, timeout):
-    """Test connection using socket with real timeout control"""
-    start = time.time()
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(timeout)
-        s.connect((host, port))
-        
-        context = ssl.create_default_context()
-        with s, context.wrap_socket(s, server_hostname=host) as ssock:
-            request = f"GET / HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n"
-            ssock.sendall(request.encode())
-            ssock.recv(1024)
-            
-            ms = round((time.time() - start) * 1000)
-            return {"ok": True, "ms": ms}
-    except socket.timeout:
-        return {"ok": False, "ms": 0, "error": "timeout"}
-    except Exception as e:
-        return {"ok": False, "ms": 0, "error": str(e)}
-
-
-def check_single():
-    results = []
-    
-    for name, host, port in TARGETS:
-        # Start spinner using github_utils
-        spinner = create_spinner()
-        spinner_thread = spinner["start"]("Checking {host}... {char}", host=host)
-        
-        try:
-            result = test_connection(host, port, DEFAULT_TIMEOUT)
-        finally:
-            spinner["stop"](spinner_thread)
-        
-        results.append((name, result))
-        break
+    """Test connection: TLS handshake plus one HTTP request, bounded by timeout"""
+    return run_sync(http_probe_async(host, port, timeout))
+
+
+def probe_targets(targets, timeout):
+    """Probe all targets concurrently on one event loop under one shared deadline"""
+    return run_sync(probe_targets_async(targets, timeout))
 
-    homepage_result = results[0][1] if results else {"ok": False, "ms": 0}
-    avg_ms = homepage_result["ms"]
 
-    status = "good" if homepage_result["ok"] and avg_ms < 3000 else "warn" if homepage_result["ok"] else "bad"
+def check_single(timeout=DEFAULT_TIMEOUT, targets=None):
+    targets = targets or TARGETS
+
+    # Only animate the spinner for an interactive terminal
+    spinner = None
+    if sys.stdout.isatty():
+        spinner = create_spinner()
+        spinner_thread = spinner["start"]("Checking {count} targets... {char}", count=len(targets))
+    try:
+        results = probe_targets(targets, timeout)
+    finally:
+        if spinner:
+            spinner["stop"](spinner_thread)
 
-    return {"status": status, "ms": avg_ms, "results": results}
+    return summarize_check(results, THRESHOLD_MS)
 
 
 def check(timeout=DEFAULT_TIMEOUT):
-    return check_single()
+    return check_single(timeout)
 
 
 def main():
@@ -75,7 +60,7 @@ def main():
     suffix = f" ({r['ms']}ms)" if r["status"] != "bad" else ""
     print(f"\nStatus: {status}{suffix}")
     for name, res in r["results"]:
-        print(f"  {name}: {'OK' if res['ok'] else 'FAIL'} ({res['ms']}ms)")
+        print(f"  {name:<9} {res['host']:<32} {'OK' if res['ok'] else 'FAIL'} ({res['ms']}ms)")
 
 
 if __name__ == "__main__":
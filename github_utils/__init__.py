@@ -1,49 +1,82 @@
 #!/usr/bin/env python3
-"""GitHub工具合集 - 通用工具包"""
-from .common_utils import (
-    load_module, run_tool, get_tool_config,
-    get_tools_order, get_ui_config, load_sub_config, create_spinner
-)
-from .async_utils import Tooltip, AsyncTaskRunner, ResultPanel
-from .gui_utils import (
-    create_main_window, setup_window_style, create_notebook,
-    create_tab, create_button_panel, create_exit_button, ToolButton
-)
-from .scheduled_inspection_utils import (
-    load_config, save_config, load_history,
-    save_history, prune_history, generate_alert,
-    check_ip_blacklist, update_ip_blacklist
-)
-from .dns_utils import (
-    resolve_dns, get_known_good_ips, fallback_dns_lookup
-)
-from .ip_utils import (
-    test_ip_speed, test_ips_speeds, get_best_ip,
-    is_ip_valid, filter_valid_ips
-)
-from .hosts_utils import (
-    get_hosts_path, read_hosts_file, write_hosts_file,
-    find_hosts_entries, add_host_entry, remove_host_entry,
-    update_host_entries, backup_hosts_file, restore_hosts_file,
-    get_github_host_entries
-)
+"""GitHub工具合集 - 通用工具包
 
-__all__ = [
-    'load_module', 'run_tool', 'get_tool_config',
-    'get_tools_order', 'get_ui_config', 'load_sub_config',
-    'create_spinner',
-    'Tooltip', 'AsyncTaskRunner', 'ResultPanel',
-    'create_main_window', 'setup_window_style',
-    'create_notebook', 'create_tab',
-    'create_button_panel', 'create_exit_button', 'ToolButton',
-    'load_config', 'save_config', 'load_history',
-    'save_history', 'prune_history', 'generate_alert',
-    'check_ip_blacklist', 'update_ip_blacklist',
-    'resolve_dns', 'get_known_good_ips', 'fallback_dns_lookup',
-    'test_ip_speed', 'test_ips_speeds', 'get_best_ip',
-    'is_ip_valid', 'filter_valid_ips',
-    'get_hosts_path', 'read_hosts_file', 'write_hosts_file',
-    'find_hosts_entries', 'add_host_entry', 'remove_host_entry',
-    'update_host_entries', 'backup_hosts_file', 'restore_hosts_file',
-    'get_github_host_entries'
-]
+包内各模块按需延迟导入：首次访问某个名称时才导入其所在的子模块，
+导入包本身不会连带加载 tkinter、ssl 等较重的依赖。
+"""
+import importlib
+
+# 子模块 -> 对外导出的名称
+_EXPORTS = {
+    "common_utils": (
+        'load_module', 'run_tool', 'get_tool_config',
+        'get_tools_order', 'get_ui_config', 'get_monitor_config',
+        'load_sub_config', 'get_root_config', 'create_spinner',
+        'LazyModule', 'subproject_module', 'lazy_function'
+    ),
+    "config_cache_utils": (
+        'read_json_config', 'merged_config', 'subscribe_config', 'poll_config_changes'
+    ),
+    "async_utils": ('Tooltip', 'AsyncTaskRunner', 'ResultPanel', 'UiDispatcher', 'TaskCancelled'),
+    "gui_utils": (
+        'create_main_window', 'setup_window_style',
+        'create_notebook', 'create_tab',
+        'create_button_panel', 'create_exit_button', 'ToolButton',
+        'shared_widget', 'TooltipWindow', 'get_tooltip_window'
+    ),
+    "scheduled_inspection_utils": (
+        'load_config', 'save_config', 'load_history',
+        'save_history', 'prune_history', 'generate_alert',
+        'check_ip_blacklist', 'update_ip_blacklist',
+        'append_history_record', 'iter_history', 'list_history_segments',
+        'prune_history_segments', 'migrate_history'
+    ),
+    "dns_utils": ('resolve_dns', 'get_known_good_ips', 'fallback_dns_lookup'),
+    "ip_utils": (
+        'test_ip_speed', 'test_ips_speeds', 'get_best_ip',
+        'is_ip_valid', 'filter_valid_ips'
+    ),
+    "hosts_utils": (
+        'get_hosts_path', 'read_hosts_file', 'write_hosts_file',
+        'find_hosts_entries', 'add_host_entry', 'remove_host_entry',
+        'update_host_entries', 'backup_hosts_file', 'restore_hosts_file',
+        'get_github_host_entries'
+    ),
+    "probe_utils": ('TieredProber', 'tcp_probe', 'tls_probe'),
+    "health_utils": ('HealthMonitor', 'get_health_monitor'),
+    "event_log_utils": ('EventLog',),
+    "stage_utils": ('run_parallel', 'run_stage_graph'),
+    "ping_utils": ('ping_hosts', 'default_gateways'),
+    "port_scan_utils": ('probe_port_matrix',),
+    "ranking_utils": (
+        'new_ip_stats', 'prior_stats', 'add_sample', 'cost_interval', 'undecided_ips',
+        'sample_stream_async', 'rank_ips_sequential'
+    ),
+    "aio_utils": (
+        'run_sync', 'map_bounded', 'dns_query_async', 'resolve_dns_async',
+        'tcp_probe_async', 'tls_probe_async', 'http_probe_async',
+        'probe_targets_async', 'check_github_async',
+        'resolve_dns_many', 'tcp_probe_many', 'http_probe_many'
+    ),
+    "sketch_utils": (
+        'new_sketch', 'sketch_add', 'sketch_merge', 'merge_sketches',
+        'sketch_quantile', 'sketch_percentiles'
+    ),
+}
+_LOCATIONS = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_LOCATIONS)
+
+
+def __getattr__(name):
+    """首次访问导出名称时导入对应子模块，并缓存到包命名空间"""
+    module = _LOCATIONS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 异步网络核心模块（协程版DNS解析、TCP/TLS/HTTP探测与GitHub检测）
+
+所有探测都是协程，一个事件循环即可同时驱动成千上万个探测；map_bounded 限制同时在途的协程数，
+内存占用与并发上限成正比，而不是与探测总数成正比。同步调用方使用 run_sync 或 *_many 包装函数。
+"""
+import asyncio
+import socket
+import ssl
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from github_utils.dns_utils import build_dns_query, parse_dns_response
+
+DEFAULT_LIMIT = 200  # 同时在途的最大探测数
+DEFAULT_DNS_SERVERS = ["8.8.8.8", "223.5.5.5"]
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """在当前线程中运行协程并返回结果（供同步调用方使用）"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    coro.close()
+    raise RuntimeError("当前线程已有运行中的事件循环，请直接 await 协程版本")
+
+
+async def map_bounded(func: Callable[[Any], Awaitable], items: Iterable, limit: int = DEFAULT_LIMIT) -> List:
+    """并发地对每一项执行协程函数，同时在途的协程不超过 limit，按输入顺序返回结果"""
+    items = list(items)
+    results = [None] * len(items)
+    iterator = iter(enumerate(items))
+
+    async def worker():
+        for index, item in iterator:
+            results[index] = await func(item)
+
+    await asyncio.gather(*(worker() for _ in range(min(limit, len(items)))))
+    return results
+
+
+def _elapsed_ms(start: float) -> int:
+    return round((time.perf_counter() - start) * 1000)
+
+
+def _failure(error: Exception) -> Dict[str, Any]:
+    """探测失败的结果，错误字符串与同步版 test_ip_speed 一致：
+    timeout、ssl_error: …、socket_error: …、unknown_error: …
+    """
+    if isinstance(error, (asyncio.TimeoutError, socket.timeout)):
+        message = "timeout"
+    elif isinstance(error, ssl.SSLError):
+        message = f"ssl_error: {error}"
+    elif isinstance(error, OSError):
+        message = f"socket_error: {error}"
+    else:
+        message = f"unknown_error: {error}"
+    return {"ok": False, "ms": 0, "error": message}
+
+
+def _close(writer):
+    try:
+        writer.close()
+    except Exception:
+        pass
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """接收单个DNS应答的数据报协议"""
+
+    def __init__(self, future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+async def dns_query_async(domain: str, dns_server: str, timeout: float = 5.0) -> List[str]:
+    """向单个DNS服务器查询A记录，失败时返回空列表"""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    transport = None
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DnsProtocol(future), remote_addr=(dns_server, 53))
+        transport.sendto(build_dns_query(domain))
+        return parse_dns_response(await asyncio.wait_for(future, timeout))
+    except Exception:
+        return []
+    finally:
+        if transport:
+            transport.close()
+
+
+async def resolve_dns_async(domain: str, dns_servers: List[str] = None, timeout: float = 5.0) -> List[str]:
+    """同时向所有DNS服务器查询，返回最先得到的非空结果"""
+    tasks = [asyncio.ensure_future(dns_query_async(domain, server, timeout))
+             for server in dns_servers or DEFAULT_DNS_SERVERS]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            ips = await next_done
+            if ips:
+                return sorted(set(ips))
+        return []
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def tcp_probe_async(host: str, port: int = 443, timeout: float = 2.0) -> Dict[str, Any]:
+    """TCP连接探测"""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        _close(writer)
+        return {"ok": True, "ms": _elapsed_ms(start)}
+    except Exception as e:
+        return _failure(e)
+
+
+async def tls_probe_async(host: str, port: int = 443, timeout: float = 4.0,
+                          server_hostname: str = None) -> Dict[str, Any]:
+    """TLS握手探测（不发送HTTP请求）；host 为IP时用 server_hostname 指定SNI并校验证书"""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=ssl.create_default_context(), server_hostname=server_hostname or host), timeout)
+        _close(writer)
+        return {"ok": True, "ms": _elapsed_ms(start)}
+    except Exception as e:
+        return _failure(e)
+
+
+async def http_probe_async(host: str, port: int = 443, timeout: float = 8.0, hostname: str = None,
+                           use_tls: bool = True, path: str = "/") -> Dict[str, Any]:
+    """HTTP(S)探测：发送GET请求并读取响应的第一块数据，整个过程受 timeout 限制
+
+    Args:
+        host: 连接的主机名或IP
+        hostname: Host头与SNI使用的域名（默认与 host 相同，直连IP时指定为 github.com）
+    """
+    hostname = hostname or host
+    start = time.perf_counter()
+
+    async def request():
+        context = ssl.create_default_context() if use_tls else None
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=context, server_hostname=hostname if use_tls else None)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {hostname}\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read(1024)
+        finally:
+            _close(writer)
+        status_line = response.split(b"\r\n", 1)[0].decode("latin-1")
+        return {"ok": True, "ms": _elapsed_ms(start), "status_line": status_line,
+                "response_length": len(response)}
+
+    try:
+        return await asyncio.wait_for(request(), timeout)
+    except Exception as e:
+        return _failure(e)
+
+
+async def probe_targets_async(targets: List[Tuple[str, str, int]], timeout: float = 8.0) -> List[Tuple[str, Dict]]:
+    """同时对 (名称, 主机, 端口) 目标执行HTTPS探测，返回 [(名称, 结果)]，结果附带 host 字段"""
+    results = await asyncio.gather(*(http_probe_async(host, port, timeout) for _, host, port in targets))
+    return [(name, dict(result, host=host)) for (name, host, _), result in zip(targets, results)]
+
+
+def summarize_check(results: List[Tuple[str, Dict]], threshold_ms: int = 3000) -> Dict[str, Any]:
+    """把各目标的探测结果汇总为GitHub检测结果（以首页为准）"""
+    homepage_result = results[0][1] if results else {"ok": False, "ms": 0}
+    ms = homepage_result["ms"]
+    status = "good" if homepage_result["ok"] and ms < threshold_ms else "warn" if homepage_result["ok"] else "bad"
+    degraded = [name for name, result in results if not result["ok"]]
+    return {"status": status, "ms": ms, "results": results, "degraded": degraded}
+
+
+async def check_github_async(targets: List[Tuple[str, str, int]], timeout: float = 8.0,
+                             threshold_ms: int = 3000) -> Dict[str, Any]:
+    """GitHub可访问性检测（协程版），返回与 check() 相同的 status/ms/results/degraded 字段"""
+    return summarize_check(await probe_targets_async(targets, timeout), threshold_ms)
+
+
+def resolve_dns_many(domains: List[str], dns_servers: List[str] = None, timeout: float = 5.0) -> Dict[str, List[str]]:
+    """同步包装：同时解析多个域名，返回 {域名: IP列表}"""
+    async def resolve_all():
+        return await asyncio.gather(*(resolve_dns_async(domain, dns_servers, timeout) for domain in domains))
+    return dict(zip(domains, run_sync(resolve_all())))
+
+
+def tcp_probe_many(hosts: List[str], port: int = 443, timeout: float = 2.0,
+                   limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """同步包装：并发TCP探测多个主机，按输入顺序返回结果（附带 host 字段）"""
+    async def probe(host):
+        return dict(await tcp_probe_async(host, port, timeout), host=host)
+    return run_sync(map_bounded(probe, hosts, limit))
+
+
+def http_probe_many(hosts: List[str], port: int = 443, timeout: float = 8.0, hostname: str = None,
+                    use_tls: bool = True, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """同步包装：并发HTTP(S)探测多个主机（直连IP时用 hostname 指定域名），按输入顺序返回结果"""
+    async def probe(host):
+        return dict(await http_probe_async(host, port, timeout, hostname, use_tls), host=host)
+    return run_sync(map_bounded(probe, hosts, limit))
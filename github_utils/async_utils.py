@@ -2,91 +2,242 @@
 """GitHub工具合集 - 异步任务工具模块"""
 import queue
 import threading
-from tkinter import Tk, ttk, Text, Scrollbar
+import traceback
+from collections import deque
+from tkinter import ttk, Text, Scrollbar
+
+from .gui_utils import get_tooltip_window
+
+DEFAULT_MAX_LINES = 2000  # 结果面板保留的最大行数
+PROGRESS_MARK = "progress"  # 进度行标记名前缀，每个任务一个标记
 
 
 class Tooltip:
+    """工具提示：所有控件共用窗口内的一个提示框，悬停时只更新文字和位置"""
     def __init__(self, widget, text, ui_config):
         self.widget = widget
         self.text = text
         self.ui_config = ui_config
-        self.tooltip_window = None
         self.widget.bind("<Enter>", self.show_tooltip)
         self.widget.bind("<Leave>", self.hide_tooltip)
 
     def show_tooltip(self, event=None):
-        x, y, cx, cy = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + self.ui_config["tooltip"]["offset_x"]
-        y += self.widget.winfo_rooty() + self.ui_config["tooltip"]["offset_y"]
-
-        self.tooltip_window = Tk()
-        self.tooltip_window.wm_overrideredirect(True)
-        self.tooltip_window.wm_geometry(f"+{x}+{y}")
-        tooltip_cfg = self.ui_config["tooltip"]
-        label = ttk.Label(self.tooltip_window, text=self.text, justify="left",
-                          background=tooltip_cfg["background"],
-                          relief=tooltip_cfg["relief"],
-                          borderwidth=tooltip_cfg["borderwidth"],
-                          padding=(tooltip_cfg["padding_x"],
-                                   tooltip_cfg["padding_y"]))
-        label.pack()
+        x = self.widget.winfo_rootx() + self.ui_config["tooltip"]["offset_x"]
+        y = self.widget.winfo_rooty() + self.ui_config["tooltip"]["offset_y"]
+        get_tooltip_window(self.widget, self.ui_config).show(self, self.text, x, y)
 
     def hide_tooltip(self, event=None):
-        if self.tooltip_window:
-            self.tooltip_window.destroy()
-            self.tooltip_window = None
+        get_tooltip_window(self.widget, self.ui_config).hide(self)
+
+
+def _set_busy(btn, busy):
+    """切换工具按钮的运行状态：支持 set_running 的按钮在运行时变为停止按钮，其他按钮运行时禁用"""
+    if hasattr(btn, "set_running"):
+        btn.set_running(busy)
+    else:
+        btn.config(state="disabled" if busy else "normal")
+
+
+class TaskCancelled(Exception):
+    """任务已被取消（工具下一次输出时抛出，用于协作式取消正在运行的任务）"""
+
+
+class UiDispatcher:
+    """线程安全的界面调度通道
+
+    任意线程都可以通过 post() 投递界面操作，界面线程按帧批量执行；同一输出函数在一帧内收到的
+    多行输出合并为一次调用。有投递时按帧间隔轮询，空闲时降低轮询频率。
+    """
+
+    def __init__(self, widget, frame_ms=16, idle_ms=100):
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.idle_ms = idle_ms
+        self.queue = queue.SimpleQueue()
+        self.widget.after(self.idle_ms, self._pump)
+
+    def post(self, func, *args):
+        """投递一个界面操作（可在任意线程调用）"""
+        self.queue.put(("call", func, args))
+
+    def output_func(self, sink):
+        """把界面线程的 sink(lines) 包装为可在任意线程调用的 output_func(line)"""
+        def output_func(line):
+            self.queue.put(("line", sink, line))
+        return output_func
+
+    def _pump(self):
+        """在界面线程执行本帧积累的操作"""
+        batch = []
+        try:
+            while True:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        pending_sink, pending_lines = None, []
+        for kind, func, payload in batch:
+            if kind == "call":
+                if pending_sink:
+                    self._call(pending_sink, pending_lines)
+                    pending_sink, pending_lines = None, []
+                self._call(func, *payload)
+            else:
+                # 输出行：同一 sink 的连续多行合并为一次调用
+                if pending_sink is not func:
+                    if pending_sink:
+                        self._call(pending_sink, pending_lines)
+                    pending_sink, pending_lines = func, []
+                pending_lines.append(payload)
+        if pending_sink:
+            self._call(pending_sink, pending_lines)
+
+        try:
+            self.widget.after(self.frame_ms if batch else self.idle_ms, self._pump)
+        except Exception:
+            pass  # 窗口已销毁
+
+    def _call(self, func, *args):
+        """执行一个回调；异常打印到标准错误，不影响同一批的其他回调"""
+        try:
+            func(*args)
+        except Exception:
+            traceback.print_exc()
 
 
 class AsyncTaskRunner:
-    def __init__(self, result_callback=None):
+    """后台任务运行器
+
+    每个任务在一个守护线程中执行，同时运行的任务数由信号量限制（超出的任务排队等待名额），
+    同一工具同时只运行一个任务；守护线程不会阻止进程退出。提供 dispatcher 时，
+    结果通过调度通道回到界面线程，无需轮询 check_queue。
+    """
+
+    def __init__(self, result_callback=None, max_workers=4, dispatcher=None):
         self.result_queue = queue.Queue()
         self.running_tasks = {}
         self.result_callback = result_callback
+        self.dispatcher = dispatcher
+        self.slots = threading.BoundedSemaphore(max_workers)
+        self.lock = threading.Lock()
+        self.runs = {}  # 工具 -> 本次运行的取消事件（同时用于识别过期的结果）
+        self.started = set()  # 已取得运行名额的取消事件
+        self.buttons = {}
+        self.closed = False
+
+    def is_running(self, tool_key):
+        with self.lock:
+            return self.running_tasks.get(tool_key, False)
 
     def run_tool_async(self, tool_key, tool_config, run_tool_func, btn,
                        on_complete=None, output_func=None):
-        if self.running_tasks.get(tool_key, False):
-            return
+        with self.lock:
+            if self.closed or self.running_tasks.get(tool_key, False):
+                return
+            self.running_tasks[tool_key] = True
+            run = self.runs[tool_key] = threading.Event()
+            self.buttons[tool_key] = (btn, on_complete)
+        _set_busy(btn, True)
 
-        self.running_tasks[tool_key] = True
-        btn.config(state="disabled")
+        def checked_output(line):
+            # 协作式取消：任务已被取消时，在下一次输出处中止
+            if run.is_set():
+                raise TaskCancelled()
+            output_func(line)
 
         def task():
-            try:
-                result = run_tool_func(tool_config, output_func)
-                self.result_queue.put((tool_key, "success", result))
-            except Exception as e:
-                self.result_queue.put((tool_key, "error", str(e)))
+            with self.slots:
+                with self.lock:
+                    if run.is_set():
+                        return  # 排队期间已取消，cancel() 已交付结果
+                    self.started.add(run)
+                try:
+                    result = run_tool_func(tool_config, checked_output if output_func else None)
+                    self._deliver(tool_key, run, "success", result)
+                except TaskCancelled:
+                    self._deliver(tool_key, run, "cancelled", "任务已取消")
+                except Exception as e:
+                    self._deliver(tool_key, run, "error", str(e))
+                finally:
+                    with self.lock:
+                        self.started.discard(run)
 
-        threading.Thread(target=task, daemon=True).start()
+        threading.Thread(target=task, daemon=True, name=f"tool-{tool_key}").start()
         return self
 
-    def check_queue(self, buttons, on_status_change=None):
-        try:
-            while not self.result_queue.empty():
-                tool_key, status, data = self.result_queue.get_nowait()
-                self.running_tasks[tool_key] = False
+    def cancel(self, tool_key):
+        """取消任务：排队中的任务直接取消，运行中的任务在下一次输出时中止且结果被丢弃"""
+        with self.lock:
+            if not self.running_tasks.get(tool_key, False):
+                return False
+            run = self.runs[tool_key]
+            run.set()
+            queued = run not in self.started
+        if queued:
+            self._deliver(tool_key, run, "cancelled", "任务已取消")
+        return True
 
-                for btn in buttons:
-                    if btn.tool_key == tool_key:
-                        btn.config(state="normal")
-                        break
+    def shutdown(self):
+        """取消所有任务并拒绝新任务；仍在运行的任务在下一次输出时中止，其守护线程不会阻止进程退出"""
+        with self.lock:
+            self.closed = True
+            runs = list(self.runs.values())
+        for run in runs:
+            run.set()
+
+    def _deliver(self, tool_key, run, status, data):
+        """任务结束：有调度通道时回到界面线程处理，否则放入结果队列等待 check_queue"""
+        if run.is_set() and status != "cancelled":
+            status, data = "cancelled", "任务已取消"
+        if self.dispatcher:
+            self.dispatcher.post(self._finish, tool_key, status, data, None, None, run)
+        else:
+            self.result_queue.put((tool_key, status, data, run))
+
+    def _finish(self, tool_key, status, data, buttons=None, on_status_change=None, run=None):
+        """在界面线程更新任务状态、恢复按钮并回调（忽略已被新一次运行取代的结果）"""
+        with self.lock:
+            if not self.running_tasks.get(tool_key, False):
+                return
+            if run is not None and self.runs.get(tool_key) is not run:
+                return
+            self.running_tasks[tool_key] = False
+            self.runs.pop(tool_key, None)
+            btn, on_complete = self.buttons.pop(tool_key, (None, None))
 
-                if self.result_callback:
-                    self.result_callback(tool_key, status, data)
+        if btn is None:
+            btn = next((b for b in buttons or [] if b.tool_key == tool_key), None)
+        if btn is not None:
+            _set_busy(btn, False)
 
-                if on_status_change:
-                    on_status_change(tool_key, status, data)
+        if self.result_callback:
+            self.result_callback(tool_key, status, data)
+        if on_complete:
+            on_complete(tool_key, status, data)
+        if on_status_change:
+            on_status_change(tool_key, status, data)
+
+    def check_queue(self, buttons, on_status_change=None):
+        try:
+            while not self.result_queue.empty():
+                tool_key, status, data, run = self.result_queue.get_nowait()
+                self._finish(tool_key, status, data, buttons, on_status_change, run)
         except queue.Empty:
             pass
 
-        if any(self.running_tasks.values()):
-            return True
-        return False
+        with self.lock:
+            return any(self.running_tasks.values())
 
 
 class ResultPanel:
-    def __init__(self, parent, ui_config, layout_config):
+    """结果面板
+
+    日志模型是有行数上限的环形缓冲区（layout.result_max_lines），文本控件只保存缓冲区中的行，
+    超出上限时从顶部删除最旧的行；每个任务有自己的进度行，由按 tool_key 命名的Tk标记定位，
+    更新和清理都不需要扫描整个文本，长时间运行时内存和每次更新的开销保持不变。
+    """
+
+    def __init__(self, parent, ui_config, layout_config, dispatcher=None):
         self.frame = ttk.LabelFrame(
             parent, text=ui_config["text"]["result_frame_title"],
             padding=layout_config["frame_padding"])
@@ -97,96 +248,97 @@ class ResultPanel:
         self.text.config(yscrollcommand=self.scrollbar.set)
         self.text.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
-        self.progress_line_num = None
-        self._active_progress = False
+        self.max_lines = max(1, layout_config.get("result_max_lines", DEFAULT_MAX_LINES))
+        self.lines = deque(maxlen=self.max_lines)
+        self._progress = {}  # tool_key -> 当前输出函数的句柄，渲染时据此丢弃已结束任务的输出
+        self._marks = {}  # tool_key -> 已显示的进度行标记
+        # 后台线程的输出经调度通道回到界面线程，按帧批量渲染
+        self.dispatcher = dispatcher or UiDispatcher(self.frame)
 
     def insert(self, content, tag=None):
-        self.text.insert("end", content + "\n", tag)
+        """追加文本（可包含多行），超出行数上限时丢弃最旧的行"""
+        new_lines = content.split("\n")[-self.max_lines:]
+        excess = len(self.lines) + len(new_lines) - self.max_lines
+        self.lines.extend((line, tag) for line in new_lines)
+        self.text.insert("end", "\n".join(new_lines) + "\n", tag)
+        if excess > 0:
+            self._trim(excess)
         self.text.see("end")
 
+    def _trim(self, count):
+        """从顶部删除 count 行已提交的内容（跳过所有进度行）"""
+        progress_lines = sorted(int(self.text.index(mark).split(".")[0]) for mark in self._marks.values())
+        deleted = 0
+        for kept, line in enumerate(progress_lines + [None]):
+            # 逐段删除进度行之间的已提交行；前面已删除 deleted 行，顶部保留了 kept 个进度行
+            take = count - deleted if line is None else min(line - deleted - 1 - kept, count - deleted)
+            if take > 0:
+                self.text.delete(f"{kept + 1}.0", f"{kept + 1 + take}.0")
+                deleted += take
+            if deleted >= count:
+                return
+
+    def insert_threadsafe(self, content, tag=None):
+        """从任意线程插入文本（在界面线程的下一帧渲染）"""
+        self.dispatcher.post(self.insert, content, tag)
+
     def clear(self):
         self.text.delete("1.0", "end")
-        self.progress_line_num = None
-        self._active_progress = False
+        self.lines.clear()
+        for mark in self._marks.values():
+            self.text.mark_unset(mark)
+        self._marks.clear()
+        self._progress.clear()
 
     def show_json(self, data):
         import json
-        content = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
-        self.text.insert("end", content)
-        self.text.see("end")
+        self.insert(json.dumps(data, ensure_ascii=False, indent=2))
+
+    def get_log(self):
+        """获取缓冲区中的全部日志行"""
+        return [line for line, _ in self.lines]
 
-    def create_progress_output_func(self):
-        """创建进度条输出函数，适用于UI显示"""
-        if self._active_progress:
-            return None
+    def create_progress_output_func(self, tool_key, keep_lines=False):
+        """为任务 tool_key 创建进度输出函数，适用于UI显示
         
-        self._active_progress = True
+        返回的函数可在任意线程调用；每一帧只渲染最后一行进度，避免输出频繁时界面卡顿。
+        keep_lines 为 True 时每一行都作为日志保留（用于逐阶段推送部分结果的工具），同一帧的多行一次插入。
+        同时运行的任务各自有独立的进度行；clear_progress(tool_key) 之后该函数的输出被丢弃。
+        """
+        handle = self._progress[tool_key] = object()
         
-        def output_func(line):
-            line = line.strip()
-            if not line:
+        def render(lines):
+            lines = [line.strip() for line in lines if line.strip()]
+            if not lines or self._progress.get(tool_key) is not handle:
                 return
-            
-            current_line_count = int(self.text.index("end-1c").split('.')[0])
-            
-            if self.progress_line_num is None or self.progress_line_num > current_line_count:
-                self.text.insert("end", line + "\n")
-                self.progress_line_num = current_line_count
+            if keep_lines:
+                self.insert("\n".join(lines))
             else:
-                start_idx = f"{self.progress_line_num}.0"
-                end_idx = f"{self.progress_line_num + 1}.0"
-                try:
-                    self.text.delete(start_idx, end_idx)
-                except Exception:
-                    pass
-                self.text.insert(start_idx, line + "\n")
-            self.text.see("end")
-        return output_func
+                self._show_progress(tool_key, lines[-1])
+        return self.dispatcher.output_func(render)
 
-    def clear_progress(self):
-        """清除进度条状态并清理相关文本"""
-        if self.progress_line_num is not None:
-            try:
-                line_count = int(self.text.index("end-1c").split('.')[0])
-                if self.progress_line_num <= line_count:
-                    start_idx = f"{self.progress_line_num}.0"
-                    end_idx = f"{self.progress_line_num + 1}.0"
-                    self.text.delete(start_idx, end_idx)
-                else:
-                    self._find_and_clear_progress()
-            except Exception:
-                self._find_and_clear_progress()
-        self.progress_line_num = None
-        self._active_progress = False
-
-    def _find_and_clear_progress(self):
-        """查找并清理包含进度条内容的行"""
-        try:
-            content = self.text.get("1.0", "end")
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if 'Working...' in line or '[|]' in line or '[/]' in line or '[-]' in line or '[\\]' in line:
-                    start_idx = f"{i + 1}.0"
-                    end_idx = f"{i + 2}.0"
-                    self.text.delete(start_idx, end_idx)
-                    break
-        except Exception:
-            pass
+    def _show_progress(self, tool_key, line):
+        """在界面线程中显示（或替换）任务的进度行，进度行的位置由该任务的标记跟踪"""
+        line = line.replace("\n", " ") + "\n"
+        mark = self._marks.get(tool_key)
+        if mark:
+            self.text.delete(mark, f"{mark} +1 lines linestart")
+        else:
+            mark = self._marks[tool_key] = f"{PROGRESS_MARK}-{tool_key}"
+            self.text.mark_set(mark, "end-1c")
+            self.text.mark_gravity(mark, "left")
+        self.text.insert(mark, line)
+        self.text.see("end")
+
+    def clear_progress(self, tool_key):
+        """结束任务 tool_key 的进度输出并删除它的进度行，其他任务的进度不受影响"""
+        self._progress.pop(tool_key, None)
+        mark = self._marks.pop(tool_key, None)
+        if mark:
+            self.text.delete(mark, f"{mark} +1 lines linestart")
+            self.text.mark_unset(mark)
 
     def clear_all_progress(self):
-        """清理所有可能存在的进度条行（用于强制清理）"""
-        content = self.text.get("1.0", "end")
-        lines = content.split('\n')
-        progress_patterns = ['Working...', '[|]', '[/]', '[-]', '[\\]']
-        
-        for i, line in enumerate(lines):
-            if any(p in line for p in progress_patterns):
-                try:
-                    start_idx = f"{i + 1}.0"
-                    end_idx = f"{i + 2}.0"
-                    self.text.delete(start_idx, end_idx)
-                except Exception:
-                    pass
-        
-        self.progress_line_num = None
-        self._active_progress = False
+        """清理所有任务的进度行（用于强制清理）"""
+        for tool_key in list(self._progress) + list(self._marks):
+            self.clear_progress(tool_key)
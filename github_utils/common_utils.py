@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """GitHub工具合集 - 通用工具模块"""
 import sys
-import json
+import re
+import zlib
+import importlib
 import importlib.util
-import inspect
+import threading
+import time
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -11,14 +14,25 @@ CONFIG_PATH = ROOT_DIR / "config.json"
 
 sys.path.insert(0, str(ROOT_DIR))
 
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    CONFIG = json.load(f)
+from github_utils.config_cache_utils import read_json_config, merged_config  # noqa: E402
+
+# 模块注册表：文件路径 -> ((修改时间, 大小), 模块)
+_MODULE_REGISTRY = {}
+_PATH_LOCKS = {}  # 文件路径 -> 该文件的加载锁
+_LOCKS_LOCK = threading.Lock()
+RELOAD_CHECK_INTERVAL = 1.0  # LazyModule 检查源文件是否修改的最小间隔（秒）
+
+
+def get_root_config():
+    """获取根目录配置（带缓存，config.json 修改后自动重新加载）"""
+    return read_json_config(CONFIG_PATH, {})
 
 
 def load_sub_config(sub_dir, sub_config_name="config.json"):
     """加载子项目配置（支持根目录覆盖）
     
-    子项目默认使用自己的 config.json，根目录可通过 subprojects.{子目录名} 进行覆盖
+    子项目默认使用自己的 config.json，根目录可通过 subprojects.{子目录名} 进行覆盖。
+    合并结果会被缓存，任一配置文件修改后才重新合并；返回的字典不应修改。
     
     Args:
         sub_dir: 子项目目录名
@@ -29,18 +43,18 @@ def load_sub_config(sub_dir, sub_config_name="config.json"):
     """
     sub_path = ROOT_DIR / sub_dir / sub_config_name
     
-    if sub_path.exists():
-        with open(sub_path, "r", encoding="utf-8") as f:
-            sub_config = json.load(f)
-    else:
-        sub_config = {}
+    def build():
+        sub_config = read_json_config(sub_path, {})
+        root_config = get_root_config()
+        root_override = root_config.get("subprojects", {}).get(sub_dir)
+        if root_override is None:
+            # 兼容旧版扁平写法 "subprojects.{子目录名}"
+            root_override = root_config.get(f"subprojects.{sub_dir}")
+        if root_override:
+            return _deep_merge(sub_config, root_override)
+        return sub_config
     
-    root_override_key = f"subprojects.{sub_dir}"
-    if root_override_key in CONFIG:
-        root_override = CONFIG[root_override_key]
-        sub_config = _deep_merge(sub_config, root_override)
-    
-    return sub_config
+    return merged_config(("sub", sub_dir, sub_config_name), [sub_path, CONFIG_PATH], build)
 
 
 def _deep_merge(base, override):
@@ -54,12 +68,50 @@ def _deep_merge(base, override):
     return result
 
 
-def load_module(module_name, module_path=None):
-    """动态加载模块
+def _registry_name(path):
+    """根据文件路径生成唯一且稳定的模块名（同一文件在不同进程中名称相同）"""
+    try:
+        relative = path.relative_to(ROOT_DIR).as_posix()
+    except ValueError:
+        relative = path.as_posix()
+    digest = f"{zlib.crc32(relative.encode('utf-8')):08x}"
+    stem = re.sub(r"\W", "_", path.stem, flags=re.ASCII)
+    return f"github_tools_{stem}_{digest}"
+
+
+def _package_module_name(path):
+    """文件位于根目录下可导入的包内时返回点分模块名（如 trace.hosts_manager），否则返回 None"""
+    parts = [path.stem]
+    parent = path.parent
+    while (parent / "__init__.py").exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+    if len(parts) == 1 or parent != ROOT_DIR or not all(part.isidentifier() for part in parts):
+        return None
+    # 同名的其他顶层模块（如标准库 trace）已被导入时，无法按包名导入
+    top = sys.modules.get(parts[0])
+    if top is not None and Path(getattr(top, "__file__", None) or ROOT_DIR).resolve().parent != parent / parts[0]:
+        return None
+    return ".".join(parts)
+
+
+def _path_lock(path):
+    """获取文件的加载锁：不同文件可以并行加载，加载一个模块时不持有全局锁"""
+    with _LOCKS_LOCK:
+        return _PATH_LOCKS.setdefault(path, threading.RLock())
+
+
+def load_module(module_name, module_path=None, reload=False):
+    """动态加载模块（带缓存）
+    
+    每个文件只加载一次并登记在模块注册表中，源文件修改时间变化时才重新加载，
+    重复调用可跳过导入开销并保留模块内的缓存。位于包内的文件按点分模块名导入，
+    与包内其他模块的普通 import 共享同一个模块实例。
     
     Args:
         module_name: 模块名称
         module_path: 模块文件路径（可选，为兼容旧接口）
+        reload: 是否强制重新加载
     """
     if module_path is None:
         path = Path(module_name)
@@ -67,11 +119,76 @@ def load_module(module_name, module_path=None):
         path = Path(module_path)
     else:
         path = Path(module_name)
+    path = path.resolve()
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
     
-    spec = importlib.util.spec_from_file_location("tool_module", path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+    # 执行模块期间只持有该文件的锁（可重入），模块内再加载其他文件不会与之互相等待
+    with _path_lock(path):
+        cached = _MODULE_REGISTRY.get(path)
+        if cached and cached[0] == version and not reload:
+            return cached[1]
+        
+        package_name = _package_module_name(path)
+        if package_name:
+            module = sys.modules.get(package_name)
+            if module is None:
+                module = importlib.import_module(package_name)
+            elif cached or reload:
+                module = importlib.reload(module)
+            _MODULE_REGISTRY[path] = (version, module)
+            return module
+        
+        name = _registry_name(path)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            # 加载失败时保留上一次成功加载的版本
+            if cached:
+                sys.modules[name] = cached[1]
+            else:
+                sys.modules.pop(name, None)
+            raise
+        _MODULE_REGISTRY[path] = (version, module)
+        return module
+
+
+class LazyModule:
+    """延迟加载的模块代理：首次访问属性时才通过 load_module 加载，进程内共享同一个模块实例
+
+    源文件是否修改最多每 RELOAD_CHECK_INTERVAL 秒检查一次，频繁访问属性时不会每次都读取文件状态。
+    """
+
+    def __init__(self, path):
+        self._path = Path(path)
+        self._module = None
+        self._checked = 0.0
+
+    def __getattr__(self, name):
+        now = time.monotonic()
+        if self._module is None or now - self._checked >= RELOAD_CHECK_INTERVAL:
+            self._module = load_module(self._path)
+            self._checked = now
+        return getattr(self._module, name)
+
+    def __repr__(self):
+        return f"<LazyModule {self._path.name}>"
+
+
+def subproject_module(key):
+    """按 config.json 中的工具 key（如 checker、dns、tester、repair）获取共享的延迟加载模块"""
+    return LazyModule(ROOT_DIR / get_tool_config(key)["module"])
+
+
+def lazy_function(module, name):
+    """返回延迟解析的函数：调用时才加载模块并查找同名函数"""
+    def wrapper(*args, **kwargs):
+        return getattr(module, name)(*args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
 
 
 def run_tool(tool_config, output_func=None):
@@ -88,6 +205,7 @@ def run_tool(tool_config, output_func=None):
     func_params = tool_config.get("params", {}).copy()
     
     if output_func is not None:
+        import inspect
         sig = inspect.signature(func)
         if 'output_func' in sig.parameters:
             func_params["output_func"] = output_func
@@ -99,7 +217,7 @@ def run_tool(tool_config, output_func=None):
 
 def get_tool_config(key):
     """获取工具配置"""
-    for tool in CONFIG["tools"]:
+    for tool in get_root_config()["tools"]:
         if tool["key"] == key:
             return tool
     return None
@@ -107,12 +225,17 @@ def get_tool_config(key):
 
 def get_tools_order():
     """获取工具排序列表"""
-    return [tool["key"] for tool in CONFIG["tools"]]
+    return [tool["key"] for tool in get_root_config()["tools"]]
 
 
 def get_ui_config():
     """获取UI配置"""
-    return CONFIG["ui"]
+    return get_root_config()["ui"]
+
+
+def get_monitor_config():
+    """获取监控探测配置"""
+    return get_root_config().get("monitor", {})
 
 
 def create_spinner():
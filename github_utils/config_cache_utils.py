@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 配置缓存模块（按修改时间失效，变更时通知订阅者）"""
+import json
+import threading
+from pathlib import Path
+
+# 文件缓存：路径 -> ((修改时间, 大小), 解析结果)
+_FILE_CACHE = {}
+# 合并结果缓存：键 -> (各来源文件版本, 合并结果)
+_MERGED_CACHE = {}
+# 订阅者：[(来源文件路径元组, 回调, 上次通知时的版本)]
+_SUBSCRIBERS = []
+_CACHE_LOCK = threading.RLock()
+
+
+def _file_version(path):
+    """文件版本（修改时间, 大小），文件不存在时为 None"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_json_config(path, default=None):
+    """读取JSON配置文件（带缓存）
+
+    每个文件只在修改时间或大小变化时才重新解析；文件不存在时返回 default，
+    文件正在写入或格式错误时沿用上一次成功解析的内容。返回的对象在调用方之间共享，不应修改。
+
+    Args:
+        path: 配置文件路径
+        default: 文件不存在或无法解析时的返回值
+    """
+    path = Path(path).resolve()
+    version = _file_version(path)
+    with _CACHE_LOCK:
+        cached = _FILE_CACHE.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        data = default
+        if version is not None:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                if cached:
+                    data = cached[1]
+        _FILE_CACHE[path] = (version, data)
+        return data
+
+
+def merged_config(key, paths, build):
+    """获取由多个配置文件合并得到的结果（带缓存）
+
+    任一来源文件版本变化时才重新调用 build() 生成合并结果。
+
+    Args:
+        key: 缓存键
+        paths: 来源配置文件路径列表
+        build: 生成合并结果的函数（无参数）
+    """
+    versions = tuple(_file_version(Path(path).resolve()) for path in paths)
+    with _CACHE_LOCK:
+        cached = _MERGED_CACHE.get(key)
+        if cached and cached[0] == versions:
+            return cached[1]
+        result = build()
+        _MERGED_CACHE[key] = (versions, result)
+        return result
+
+
+def subscribe_config(paths, callback):
+    """订阅配置变更：任一来源文件变化后，下一次 poll_config_changes() 时调用 callback()"""
+    paths = tuple(Path(path).resolve() for path in paths)
+    with _CACHE_LOCK:
+        _SUBSCRIBERS.append([paths, callback, tuple(_file_version(path) for path in paths)])
+
+
+def poll_config_changes():
+    """检查订阅的配置文件是否变化并通知订阅者，返回被通知的订阅者数量
+
+    每个文件只做一次 stat，内容未变化时不会重新解析。
+    """
+    with _CACHE_LOCK:
+        changed = []
+        for subscriber in _SUBSCRIBERS:
+            versions = tuple(_file_version(path) for path in subscriber[0])
+            if versions != subscriber[2]:
+                subscriber[2] = versions
+                changed.append(subscriber[1])
+    for callback in changed:
+        try:
+            callback()
+        except Exception:
+            pass
+    return len(changed)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 追加式分段事件日志模块（JSONL，按日期和大小滚动）"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+DEFAULT_MAX_BYTES = 1024 * 1024  # 单个分段的大小上限（1MB）
+# 偏移索引每个ID占一条定长记录：分段文件名 + 字节偏移量，第N个ID位于 (N-1) * INDEX_ENTRY_SIZE
+INDEX_NAME_WIDTH = 48
+INDEX_OFFSET_WIDTH = 12
+INDEX_ENTRY_SIZE = INDEX_NAME_WIDTH + INDEX_OFFSET_WIDTH + 1
+TAIL_BLOCK_SIZE = 8192  # 从分段末尾向前读取时每次读取的字节数
+
+
+def _reverse_lines(path: Path, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """从文件末尾按块向前读取，逆序产出非空行及其字节偏移量 (offset, line)"""
+    try:
+        with open(path, "rb") as f:
+            position = f.seek(0, 2)
+            rest = b""
+            while position > 0:
+                size = min(block_size, position)
+                position -= size
+                f.seek(position)
+                pieces = (f.read(size) + rest).split(b"\n")
+                # 块的第一行可能不完整，与前一块拼接后再处理
+                rest = pieces[0]
+                offset = position + len(rest) + 1
+                lines = []
+                for line in pieces[1:]:
+                    lines.append((offset, line))
+                    offset += len(line) + 1
+                for offset, line in reversed(lines):
+                    if line.strip():
+                        yield offset, line
+            if rest.strip():
+                yield 0, rest
+    except OSError:
+        return
+
+
+class EventLog:
+    """追加式事件日志
+
+    分段文件名为 <prefix>-<YYYY-MM-DD>-<序号>.jsonl，每个分段只包含同一天的事件，
+    超过 max_bytes 时在同一天内滚动到下一个序号。按文件名即可筛选日期范围，
+    追加只打开当前分段写入一行，与历史总量无关。
+
+    指定 id_field 时为每条事件分配单调递增的ID，并维护定长的偏移索引（<prefix>.idx），
+    按ID读取时直接定位到索引项和分段中的字节偏移量，无需扫描历史。升级前写入的事件没有ID字段，
+    重建索引后由索引分配ID，读取时补全；事件已写入但索引项未写入（进程中断）时，首次追加前补齐索引。
+    """
+
+    def __init__(self, log_dir: Path, prefix: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 retention_days: Optional[int] = None, id_field: Optional[str] = None):
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.id_field = id_field
+        self.index_path = self.log_dir / f"{prefix}{INDEX_SUFFIX}"
+        self.current = None  # (day, seq, path)
+        self.lock = threading.Lock()
+        self.index_checked = False
+        self._id_map = (0, {})  # (索引大小, {(分段文件名, 偏移量): ID})
+
+    def _parse_name(self, name: str) -> Optional[Tuple[str, int]]:
+        """从分段文件名解析 (日期, 序号)，不匹配时返回 None"""
+        head = f"{self.prefix}-"
+        if not (name.startswith(head) and name.endswith(SEGMENT_SUFFIX)):
+            return None
+        day, _, seq = name[len(head):-len(SEGMENT_SUFFIX)].rpartition("-")
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+            return day, int(seq)
+        except ValueError:
+            return None
+
+    def segments(self, start_day: str = None, end_day: str = None) -> List[Tuple[str, int, Path]]:
+        """列出日期范围内（含两端，YYYY-MM-DD）的分段，按时间顺序排列"""
+        if not self.log_dir.exists():
+            return []
+        result = []
+        for path in self.log_dir.iterdir():
+            parsed = self._parse_name(path.name)
+            if parsed is None:
+                continue
+            day, seq = parsed
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            result.append((day, seq, path))
+        result.sort(key=lambda item: item[:2])
+        return result
+
+    def segment_path(self, day: str, seq: int) -> Path:
+        """获取分段文件路径"""
+        return self.log_dir / f"{self.prefix}-{day}-{seq:04d}{SEGMENT_SUFFIX}"
+
+    def _segment_for(self, day: str) -> Path:
+        """选择写入分段：沿用当天未写满的分段，否则滚动到新序号"""
+        if self.current and self.current[0] == day:
+            _, seq, path = self.current
+        else:
+            existing = self.segments(day, day)
+            _, seq, path = existing[-1] if existing else (day, 1, self.segment_path(day, 1))
+            if not existing and self.retention_days:
+                # 新的一天开始时按整个分段清理过期事件
+                self.prune(self.retention_days)
+        if path.exists() and path.stat().st_size >= self.max_bytes:
+            seq += 1
+            path = self.segment_path(day, seq)
+        self.current = (day, seq, path)
+        return path
+
+    def append(self, record: Dict[str, Any]) -> Tuple[str, int]:
+        """追加一条事件，返回 (分段文件名, 字节偏移量)；启用ID时会写入 record[id_field]"""
+        with self.lock:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            if self.id_field:
+                self._ensure_index()
+                record[self.id_field] = self.last_id() + 1
+            data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            path = self._segment_for(record["timestamp"][:10])
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            if self.id_field:
+                self._append_index_entry(path.name, offset)
+        return path.name, offset
+
+    def _append_index_entry(self, segment: str, offset: int):
+        """向偏移索引追加一条定长记录"""
+        entry = f"{segment:<{INDEX_NAME_WIDTH}}{offset:>{INDEX_OFFSET_WIDTH}}\n"
+        with open(self.index_path, "ab") as f:
+            f.write(entry.encode("ascii"))
+
+    def _ensure_index(self):
+        """索引缺失但已有分段时（如升级前写入的日志）按时间顺序重建索引，否则补齐未写入索引的事件"""
+        if self.index_checked:
+            return
+        self.index_checked = True
+        if not self.index_path.exists():
+            self.index_path.touch()
+            for _, _, path in self.segments():
+                self._index_segment(path, 0)
+            return
+        # 截掉写到一半的索引项，保证每一项都位于 (ID-1) * INDEX_ENTRY_SIZE
+        size = self.index_path.stat().st_size
+        if size % INDEX_ENTRY_SIZE:
+            with open(self.index_path, "r+b") as f:
+                f.truncate(size - size % INDEX_ENTRY_SIZE)
+        last = self.lookup(self.last_id())
+        if last is None:
+            for _, _, path in self.segments():
+                self._index_segment(path, 0)
+            return
+        last_key = self._parse_name(last[0])
+        for day, seq, path in self.segments():
+            if (day, seq) == last_key:
+                self._index_segment(path, last[1], skip_first=True)
+            elif last_key is None or (day, seq) > last_key:
+                self._index_segment(path, 0)
+
+    def _index_segment(self, path: Path, start: int, skip_first: bool = False):
+        """为分段中从字节偏移量 start 开始的事件追加索引项（skip_first 时跳过已索引的第一条）"""
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 未写完的最后一行
+                if line.strip() and not skip_first:
+                    self._append_index_entry(path.name, offset)
+                skip_first = skip_first and not line.strip()
+                offset += len(line)
+
+    def last_id(self) -> int:
+        """当前最大ID（无事件时为0）"""
+        return self.index_path.stat().st_size // INDEX_ENTRY_SIZE if self.index_path.exists() else 0
+
+    def lookup(self, event_id: int) -> Optional[Tuple[str, int]]:
+        """按ID定位事件所在的 (分段文件名, 字节偏移量)"""
+        entries = self.lookup_range(event_id, event_id)
+        return entries[0][1] if entries else None
+
+    def lookup_range(self, first_id: int, last_id: int) -> List[Tuple[int, Tuple[str, int]]]:
+        """按ID范围（含两端）定位事件，只读取索引中对应的连续区间"""
+        first_id, last_id = max(1, int(first_id)), min(int(last_id), self.last_id())
+        if first_id > last_id:
+            return []
+        with open(self.index_path, "rb") as f:
+            f.seek((first_id - 1) * INDEX_ENTRY_SIZE)
+            data = f.read((last_id - first_id + 1) * INDEX_ENTRY_SIZE).decode("ascii")
+        result = []
+        for i in range(0, len(data), INDEX_ENTRY_SIZE):
+            entry = data[i:i + INDEX_ENTRY_SIZE]
+            segment, offset = entry[:INDEX_NAME_WIDTH].rstrip(), int(entry[INDEX_NAME_WIDTH:])
+            result.append((first_id + i // INDEX_ENTRY_SIZE, (segment, offset)))
+        return result
+
+    def _fill_id(self, record: Dict[str, Any], segment: str, offset: int) -> Dict[str, Any]:
+        """启用ID时为没有ID字段的事件（升级前写入、重建索引时才分配ID）补全索引中的ID"""
+        if self.id_field and self.id_field not in record:
+            if not self.index_checked:
+                with self.lock:
+                    self._ensure_index()
+            size = self.index_path.stat().st_size if self.index_path.exists() else 0
+            if self._id_map[0] != size:
+                entries = self.lookup_range(1, size // INDEX_ENTRY_SIZE) if size else []
+                self._id_map = (size, {location: event_id for event_id, location in entries})
+            record[self.id_field] = self._id_map[1].get((segment, offset))
+        return record
+
+    def read_by_ids(self, first_id: int, last_id: int = None) -> List[Dict[str, Any]]:
+        """按ID（或ID范围）直接读取事件；分段已被清理的事件会被跳过"""
+        records = []
+        for event_id, (segment, offset) in self.lookup_range(first_id, last_id or first_id):
+            record = self.read_at(segment, offset)
+            if record is not None:
+                record.setdefault(self.id_field or "id", event_id)
+                records.append(record)
+        return records
+
+    def iter_records(self, start_day: str = None, end_day: str = None) -> Iterator[Dict[str, Any]]:
+        """流式读取日期范围内的事件，只打开范围内的分段，跳过损坏的行"""
+        for _, _, path in self.segments(start_day, end_day):
+            try:
+                with open(path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        start, offset = offset, offset + len(line)
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        yield self._fill_id(record, path.name, start)
+            except OSError:
+                continue
+
+    def tail(self, limit: int, start_day: str = None) -> List[Dict[str, Any]]:
+        """读取最近的 limit 条事件（最新的在前）：从最新的分段末尾向前按块读取，只读取需要的部分"""
+        records = []
+        if limit <= 0:
+            return records
+        for _, _, path in reversed(self.segments(start_day)):
+            for offset, line in _reverse_lines(path):
+                try:
+                    records.append(self._fill_id(json.loads(line), path.name, offset))
+                except ValueError:
+                    continue
+                if len(records) >= limit:
+                    return records
+        return records
+
+    def read_at(self, segment: str, offset: int) -> Optional[Dict[str, Any]]:
+        """按分段文件名和字节偏移量直接读取一条事件"""
+        try:
+            with open(self.log_dir / segment, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def prune(self, retention_days: int) -> int:
+        """删除超过保留天数的分段，返回删除的分段数"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        removed = 0
+        for day, _, path in self.segments(end_day=cutoff):
+            if day < cutoff:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def migrate(self, legacy_path: Path) -> int:
+        """把旧版整文件JSON数组迁移为分段日志，完成后重命名为 *.migrated，返回迁移条数"""
+        legacy_path = Path(legacy_path)
+        if not legacy_path.exists():
+            return 0
+        try:
+            # 旧版修复记录以 utf-8-sig 写入，兼容带BOM的文件
+            records = json.loads(legacy_path.read_text(encoding="utf-8-sig"))
+        except Exception:
+            return 0
+        for record in sorted(records, key=lambda r: r.get("timestamp", "")):
+            if record.get("timestamp"):
+                self.append(record)
+        legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+        return len(records)
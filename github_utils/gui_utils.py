@@ -1,8 +1,66 @@
 #!/usr/bin/env python3
 """GitHub工具合集 - GUI构建工具模块"""
-from tkinter import Tk, ttk
+from tkinter import Tk, Toplevel, ttk
 from .common_utils import get_ui_config
 
+SHARED_WIDGETS_ATTR = "_shared_widgets"  # 顶层窗口上缓存可复用控件的属性名
+
+
+def shared_widget(master, key, factory):
+    """获取 master 所在顶层窗口上可复用的控件
+
+    首次调用时以 factory(顶层窗口) 创建并缓存，之后直接返回同一个控件（已销毁时重新创建），
+    频繁显示/隐藏的控件（如提示框）不再反复创建和销毁。
+    """
+    toplevel = master.winfo_toplevel()
+    cache = toplevel.__dict__.setdefault(SHARED_WIDGETS_ATTR, {})
+    widget = cache.get(key)
+    if widget is None or not widget.winfo_exists():
+        widget = cache[key] = factory(toplevel)
+    return widget
+
+
+class TooltipWindow:
+    """应用内共享的提示框：只创建一个无边框 Toplevel，显示时更新文字并移动位置，隐藏时撤回而不销毁"""
+
+    def __init__(self, master, ui_config):
+        tooltip_cfg = ui_config["tooltip"]
+        self.window = Toplevel(master)
+        self.window.wm_overrideredirect(True)
+        self.window.withdraw()
+        self.label = ttk.Label(self.window, justify="left",
+                               background=tooltip_cfg["background"],
+                               relief=tooltip_cfg["relief"],
+                               borderwidth=tooltip_cfg["borderwidth"],
+                               padding=(tooltip_cfg["padding_x"],
+                                        tooltip_cfg["padding_y"]))
+        self.label.pack()
+        self.owner = None
+
+    def winfo_exists(self):
+        return self.window.winfo_exists()
+
+    def show(self, owner, text, x, y):
+        """为 owner 在屏幕坐标 (x, y) 处显示提示文字"""
+        self.owner = owner
+        if self.label.cget("text") != text:
+            self.label.configure(text=text)
+        self.window.wm_geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self, owner=None):
+        """隐藏提示框；指定 owner 时只在当前由它显示时隐藏"""
+        if owner is None or owner is self.owner:
+            self.owner = None
+            self.window.withdraw()
+
+
+def get_tooltip_window(widget, ui_config=None):
+    """获取 widget 所在窗口共享的提示框（首次调用时创建）"""
+    return shared_widget(widget, "tooltip",
+                         lambda toplevel: TooltipWindow(toplevel, ui_config or get_ui_config()))
+
 
 def create_main_window(title=None, size=None):
     """创建主窗口"""
@@ -59,8 +117,14 @@ def create_exit_button(parent, command, ui_config=None):
 
 
 class ToolButton(ttk.Button):
+    """工具按钮：工具运行期间变为停止按钮，再次点击由 command 取消任务"""
     def __init__(self, parent, tool_key, tool_config, command, layout_config):
         self.tool_key = tool_key
-        super().__init__(parent, text=tool_config["name"],
+        self.name = tool_config["name"]
+        super().__init__(parent, text=self.name,
                          command=lambda: command(tool_key, self),
                          width=layout_config["tool_button_width"])
+
+    def set_running(self, running):
+        """切换运行状态的显示"""
+        self.config(text=f"停止{self.name}" if running else self.name, state="normal")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 共享健康状态服务（单一探测调度器，按各订阅者的间隔交付共享的探测结果）"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from github_utils.common_utils import ROOT_DIR, get_monitor_config, subproject_module, lazy_function
+from github_utils.probe_utils import TieredProber
+
+DEFAULT_INTERVAL = 180  # 没有订阅者指定间隔时的探测间隔（秒）
+STATUS_PATH = ROOT_DIR / "trace" / "data" / "health_status.json"  # 跨进程共享的最新探测结果
+
+
+class HealthMonitor:
+    """健康状态服务
+
+    进程内只有一个分级探测器和一个调度线程。每个订阅者按自己的间隔收到结果（界面指示灯、定时巡检
+    各自保持原有频率）；到期时如果已有足够新的结果（不超过该订阅者的间隔）就直接交付，否则探测一次，
+    同时到期的订阅者共用这次探测。最新结果同时写入状态文件，其他进程（如守护进程）在结果仍然新鲜时
+    直接采用，不再重复探测。
+    """
+
+    def __init__(self, full_check: Callable[..., Dict[str, Any]], tiers: Dict[str, Dict] = None,
+                 status_path: Optional[Path] = None):
+        self.prober = TieredProber(full_check, tiers)
+        self.status_path = Path(status_path) if status_path else None
+        self.subscribers = {}  # 回调 -> {"interval", "on_start", "next_due", "delivered"（上次交付结果的时间戳）}
+        self.last_result = None
+        self.last_time = 0.0
+        self.lock = threading.Lock()
+        self.probe_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def subscribe(self, callback: Callable[[Dict], None], interval: float = None,
+                  on_start: Callable[[], None] = None):
+        """订阅探测结果：每 interval 秒（默认 DEFAULT_INTERVAL）收到一次结果，新订阅者立即收到第一次
+
+        on_start 在为该订阅者发起新的探测前调用；重复订阅只更新间隔。
+        """
+        interval = interval or DEFAULT_INTERVAL
+        with self.lock:
+            current = self.subscribers.get(callback)
+            next_due = min(current["next_due"], time.time() + interval) if current else time.time()
+            delivered = current["delivered"] if current else 0.0
+            self.subscribers[callback] = {"interval": interval, "on_start": on_start, "next_due": next_due,
+                                          "delivered": delivered}
+        self.wake.set()
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        """取消订阅，没有订阅者时调度线程停止"""
+        with self.lock:
+            self.subscribers.pop(callback, None)
+        self.wake.set()
+
+    def latest(self, max_age: float = None) -> Optional[Dict[str, Any]]:
+        """最新的探测结果（包括其他进程写入状态文件的结果），超过 max_age 秒时返回 None"""
+        result, timestamp = self._latest()
+        if result is None or (max_age is not None and time.time() - timestamp > max_age):
+            return None
+        return result
+
+    def probe_now(self, max_age: float = None) -> Dict[str, Any]:
+        """立即获取健康状态（不交付给订阅者，订阅者按各自的间隔取用）
+
+        结果在 max_age 秒内时直接返回，不访问网络；同时发起的多个请求只执行一次探测。
+        """
+        if max_age is not None:
+            fresh = self.latest(max_age)
+            if fresh is not None:
+                return fresh
+        started = time.time()
+        with self.probe_lock:
+            # 等待锁期间其他线程已经完成探测时，直接采用其结果
+            if self.last_time >= started:
+                return self.last_result
+            try:
+                result = self.prober.probe()
+            except Exception as e:
+                result = {"status": "bad", "ms": 0, "tier": None, "message": f"探测失败: {e}", "error": str(e)}
+            self.publish(result)
+            return result
+
+    def publish(self, result: Dict[str, Any]):
+        """发布一个探测结果（例如界面上手动运行的完整检测），订阅者到期时可直接采用，不再重复探测"""
+        with self.lock:
+            self.last_result = result
+            self.last_time = time.time()
+        self._write_shared(result, self.last_time)
+
+    def start(self):
+        """启动调度线程（已启动时忽略）"""
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._loop, daemon=True, name="health-monitor")
+            self.thread.start()
+
+    def _loop(self):
+        """调度循环：等到最早到期的订阅者，交付结果后按其间隔安排下一次"""
+        while True:
+            self.wake.clear()
+            with self.lock:
+                if not self.subscribers:
+                    self.thread = None
+                    return
+                next_due = min(sub["next_due"] for sub in self.subscribers.values())
+            if next_due > time.time():
+                self.wake.wait(next_due - time.time())
+                continue
+            self._deliver_due()
+
+    def _deliver_due(self):
+        """向所有到期的订阅者交付结果：已有结果对某个到期订阅者不够新或已交付过时才探测"""
+        now = time.time()
+        with self.lock:
+            due = [(callback, dict(sub)) for callback, sub in self.subscribers.items() if sub["next_due"] <= now]
+        result, timestamp = self._latest()
+        if result is None or any(now - timestamp >= sub["interval"] or timestamp <= sub["delivered"]
+                                 for _, sub in due):
+            for _, sub in due:
+                if sub["on_start"]:
+                    _safe_call(sub["on_start"])
+            result = self.probe_now()
+            timestamp = self.last_time
+        with self.lock:
+            for callback, sub in due:
+                if callback in self.subscribers:
+                    self.subscribers[callback].update(next_due=now + sub["interval"], delivered=timestamp)
+        for callback, _ in due:
+            _safe_call(callback, result)
+
+    def _latest(self):
+        """内存中与状态文件中较新的 (结果, 时间戳)"""
+        result, timestamp = self.last_result, self.last_time
+        shared = self._read_shared()
+        if shared and shared[1] > timestamp:
+            result, timestamp = shared
+        return result, timestamp
+
+    def _read_shared(self):
+        """读取状态文件中的 (结果, 时间戳)"""
+        if not self.status_path:
+            return None
+        try:
+            data = json.loads(self.status_path.read_text(encoding="utf-8"))
+            return data["result"], float(data["time"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_shared(self, result, timestamp):
+        """写入状态文件（先写临时文件再替换，避免其他进程读到一半的内容）"""
+        if not self.status_path:
+            return
+        try:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.status_path.with_name(self.status_path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"result": result, "time": timestamp}, ensure_ascii=False),
+                                encoding="utf-8")
+            tmp_path.replace(self.status_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+
+def _safe_call(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        pass
+
+
+_MONITOR = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """获取进程内共享的健康状态服务（首次调用时创建，完整检测使用连通性检测子项目）"""
+    global _MONITOR
+    with _MONITOR_LOCK:
+        if _MONITOR is None:
+            check_github = lazy_function(subproject_module("checker"), "check")
+            _MONITOR = HealthMonitor(check_github, get_monitor_config().get("tiers"), STATUS_PATH)
+        return _MONITOR
@@ -6,6 +6,8 @@ import socket
 import ssl
 from typing import List, Dict, Tuple
 
+from github_utils.aio_utils import http_probe_many
+
 
 def test_ip_speed(ip: str, port: int = 443, timeout: float = 3.0) -> Dict[str, any]:
     """Test the speed of a single IP
@@ -78,14 +80,14 @@ def test_ips_speeds(ips: List[str], port: int = 443, timeout: float = 3.0, max_w
     Returns:
         List of speed test results
     """
+    # All probes run as coroutines on one event loop, at most max_workers in flight
+    probes = http_probe_many(ips, port, timeout, hostname="github.com", limit=max_workers)
     results = []
-    
-    # Use sequential testing for simplicity and compatibility
-    # In a real implementation, we could use concurrent.futures for parallel testing
-    for ip in ips:
-        result = test_ip_speed(ip, port, timeout)
+    for ip, probe in zip(ips, probes):
+        result = {"ip": ip, "port": port, "ok": probe["ok"], "ms": probe["ms"], "error": probe.get("error")}
+        if probe["ok"]:
+            result["response_length"] = probe["response_length"]
         results.append(result)
-    
     return results
 
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 进程内ping模块（ICMP回显，不可用时退回TCP连接探测）"""
+import os
+import select
+import socket
+import struct
+import time
+
+from github_utils.port_scan_utils import probe_port_matrix
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+PAYLOAD = b"github-tools-ping"
+TCP_FALLBACK_PORT = 443
+RTF_GATEWAY = 0x0002
+ROUTE_TABLE = "/proc/net/route"
+
+
+def icmp_checksum(data):
+    """计算ICMP校验和"""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def echo_request(ident, seq):
+    """构造ICMP回显请求报文"""
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = icmp_checksum(header + PAYLOAD)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + PAYLOAD
+
+
+def open_icmp_socket():
+    """打开ICMP套接字：优先使用无需特权的数据报套接字，其次原始套接字
+
+    Returns:
+        tuple: (套接字, 是否为原始套接字)，都不可用时为 (None, False)
+    """
+    for sock_type, raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+        try:
+            return socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP), raw
+        except (OSError, AttributeError):
+            continue
+    return None, False
+
+
+def default_gateways(route_table=ROUTE_TABLE):
+    """从路由表读取默认网关（按跃点数排序），无法读取路由表时返回空列表"""
+    gateways = []
+    try:
+        with open(route_table, "r", encoding="ascii") as f:
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                if len(fields) < 7 or fields[1] != "00000000" or not int(fields[3], 16) & RTF_GATEWAY:
+                    continue
+                gateway = socket.inet_ntoa(struct.pack("<L", int(fields[2], 16)))
+                gateways.append((int(fields[6]), gateway))
+    except (OSError, ValueError):
+        return []
+    return [gateway for _, gateway in sorted(gateways) if gateway != "0.0.0.0"]
+
+
+def _resolve(hosts):
+    """把主机名解析为IPv4地址，返回 {地址: [主机, ...]}，无法解析的主机不在其中"""
+    addrs = {}
+    for host in hosts:
+        try:
+            addrs.setdefault(socket.gethostbyname(host), []).append(host)
+        except (OSError, UnicodeError):
+            continue
+    return addrs
+
+
+def _icmp_rounds(sock, raw, addrs, count, timeout, interval):
+    """在一个套接字上向所有地址发送回显请求并收集应答，返回 ({地址: 发送数}, {地址: [RTT毫秒]})"""
+    ident = os.getpid() & 0xFFFF
+    sent_at = {}
+    sent = {addr: 0 for addr in addrs}
+    rtts = {addr: [] for addr in addrs}
+    start = time.perf_counter()
+    deadline = start + (count - 1) * interval + timeout
+    next_round = 0
+    while True:
+        now = time.perf_counter()
+        while next_round < count and now >= start + next_round * interval:
+            for addr in addrs:
+                try:
+                    sock.sendto(echo_request(ident, next_round), (addr, 0))
+                    sent_at[(addr, next_round)] = time.perf_counter()
+                    sent[addr] += 1
+                except OSError:
+                    continue
+            next_round += 1
+        if now >= deadline or (next_round == count and not sent_at):
+            break
+        wake = start + next_round * interval if next_round < count else deadline
+        readable, _, _ = select.select([sock], [], [], max(0, min(wake, deadline) - now))
+        if not readable:
+            continue
+        try:
+            data, (addr, _) = sock.recvfrom(1024)
+        except OSError:
+            continue
+        if data and data[0] >> 4 == 4:
+            # 原始套接字（以及部分系统的数据报套接字）收到的数据带IP头
+            data = data[(data[0] & 0x0F) * 4:]
+        if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+            continue
+        reply_ident, seq = struct.unpack("!HH", data[4:8])
+        if raw and reply_ident != ident:
+            # 原始套接字会收到其他进程的ICMP报文
+            continue
+        start_time = sent_at.pop((addr, seq), None)
+        if start_time is not None:
+            rtts[addr].append((time.perf_counter() - start_time) * 1000)
+    return sent, rtts
+
+
+def _tcp_rounds(addrs, count, timeout, port):
+    """TCP连接探测：同时连接所有地址，连接成功或被拒绝（收到RST）都说明主机可达"""
+    addrs = list(addrs)
+    sent = {addr: 0 for addr in addrs}
+    rtts = {addr: [] for addr in addrs}
+    for _ in range(count):
+        matrix = probe_port_matrix(addrs, [port], timeout)
+        for addr, (cell_rtt,) in zip(addrs, matrix["rtt"]):
+            sent[addr] += 1
+            if cell_rtt is not None:
+                rtts[addr].append(cell_rtt)
+    return sent, rtts
+
+
+def ping_hosts(hosts, count=1, timeout=2.0, interval=0.2, fallback_port=TCP_FALLBACK_PORT):
+    """同时ping多个主机，汇报每个主机的RTT和丢包率
+
+    优先在进程内发送ICMP回显请求（一个套接字发送给所有主机），没有ICMP权限时
+    退回对 fallback_port 的TCP连接探测。不启动任何子进程。
+
+    Args:
+        hosts: 主机名或IP列表
+        count: 每个主机发送的次数
+        timeout: 每轮等待应答的超时（秒）
+        interval: ICMP多次发送之间的间隔（秒）
+        fallback_port: TCP退回探测使用的端口
+
+    Returns:
+        dict: {主机: {"ip", "sent", "received", "loss", "rtt_ms", "min_ms", "max_ms", "method"}}
+    """
+    hosts = list(dict.fromkeys(hosts))
+    addrs = _resolve(hosts)
+    sock, raw = open_icmp_socket()
+    if sock is not None:
+        with sock:
+            sent, rtts = _icmp_rounds(sock, raw, addrs, count, timeout, interval)
+        method = "icmp"
+    else:
+        sent, rtts = _tcp_rounds(addrs, count, timeout, fallback_port)
+        method = "tcp"
+
+    results = {host: {"ip": None, "sent": 0, "received": 0, "loss": 1.0, "rtt_ms": None,
+                      "min_ms": None, "max_ms": None, "method": method, "error": "无法解析"} for host in hosts}
+    for addr, names in addrs.items():
+        samples = rtts[addr]
+        received = min(len(samples), sent[addr])
+        result = {
+            "ip": addr,
+            "sent": sent[addr],
+            "received": received,
+            "loss": 1 - received / sent[addr] if sent[addr] else 1.0,
+            "rtt_ms": round(sum(samples) / len(samples), 1) if samples else None,
+            "min_ms": round(min(samples), 1) if samples else None,
+            "max_ms": round(max(samples), 1) if samples else None,
+            "method": method
+        }
+        for host in names:
+            results[host] = dict(result)
+    return results
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 端口矩阵探测模块（IP × 端口并发连接，统一截止时间）"""
+import errno
+import selectors
+import socket
+import time
+
+# 非阻塞连接已发起、等待完成的错误码
+IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
+DEFAULT_MAX_INFLIGHT = 256
+
+
+def _cell_status(code):
+    """根据连接结果的错误码判断单元格状态"""
+    if code == 0:
+        return "open"
+    if code == errno.ECONNREFUSED or code == getattr(errno, "WSAECONNREFUSED", None):
+        return "refused"
+    return "error"
+
+
+def probe_port_matrix(ips, ports, timeout=3.0, max_inflight=DEFAULT_MAX_INFLIGHT):
+    """并发探测 IP × 端口 矩阵
+
+    所有连接在一个非阻塞选择器上同时发起（同时在途的连接数不超过 max_inflight），
+    整个矩阵共用一个截止时间，总耗时约为一个超时，而不是 IP数 × 端口数 个超时。
+
+    Args:
+        ips: IP列表（矩阵的行）
+        ports: 端口列表（矩阵的列）
+        timeout: 整个矩阵的截止时间（秒）
+        max_inflight: 同时在途的最大连接数
+
+    Returns:
+        dict: {"ips", "ports",
+               "rtt": [[毫秒或None]]（连接成功或被拒绝的单元格为RTT）,
+               "status": [["open" | "refused" | "timeout" | "error"]]}
+    """
+    ips, ports = list(ips), list(ports)
+    rtt = [[None] * len(ports) for _ in ips]
+    status = [["timeout"] * len(ports) for _ in ips]
+    cells = [(row, col) for row in range(len(ips)) for col in range(len(ports))]
+    deadline = time.perf_counter() + timeout
+    next_cell = 0
+
+    with selectors.DefaultSelector() as selector:
+        while True:
+            # 补充在途连接
+            while next_cell < len(cells) and len(selector.get_map()) < max_inflight:
+                row, col = cells[next_cell]
+                next_cell += 1
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                try:
+                    code = sock.connect_ex((ips[row], ports[col]))
+                except (OSError, OverflowError):
+                    code = errno.EINVAL
+                if code in IN_PROGRESS or code == 0:
+                    selector.register(sock, selectors.EVENT_WRITE, (row, col, time.perf_counter()))
+                else:
+                    status[row][col] = _cell_status(code)
+                    sock.close()
+
+            remaining = deadline - time.perf_counter()
+            if not selector.get_map() or remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                row, col, start = key.data
+                code = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                status[row][col] = _cell_status(code)
+                if status[row][col] != "error":
+                    rtt[row][col] = round((time.perf_counter() - start) * 1000, 1)
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+        # 截止时间到达时仍在途的连接记为超时
+        for key in list(selector.get_map().values()):
+            selector.unregister(key.fileobj)
+            key.fileobj.close()
+
+    return {"ips": ips, "ports": ports, "rtt": rtt, "status": status}
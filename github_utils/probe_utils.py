@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 分级健康探测模块"""
+
+import socket
+import ssl
+import threading
+import time
+from typing import Callable, Dict, Any
+
+# 分级探测配置：interval 为同一级别两次探测的最小间隔（秒），timeout 为该级别的时间预算（秒），
+# threshold_ms 为判定退化的延迟阈值，超过阈值或失败时升级到下一级别
+DEFAULT_TIERS = {
+    "tcp": {"interval": 60, "timeout": 2.0, "threshold_ms": 1000},
+    "tls": {"interval": 600, "timeout": 4.0, "threshold_ms": 2000},
+    "http": {"interval": 60, "timeout": 8.0},
+}
+TIER_ORDER = ["tcp", "tls", "http"]
+
+
+def tcp_probe(host: str = "github.com", port: int = 443, timeout: float = 2.0) -> Dict[str, Any]:
+    """TCP连接探测（最便宜的一级）"""
+    start = time.time()
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return {"ok": True, "ms": round((time.time() - start) * 1000)}
+    except socket.timeout:
+        return {"ok": False, "ms": 0, "error": "timeout"}
+    except Exception as e:
+        return {"ok": False, "ms": 0, "error": str(e)}
+
+
+def tls_probe(host: str = "github.com", port: int = 443, timeout: float = 4.0) -> Dict[str, Any]:
+    """TLS握手探测（不发送HTTP请求）"""
+    start = time.time()
+    try:
+        context = ssl.create_default_context()
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host):
+                return {"ok": True, "ms": round((time.time() - start) * 1000)}
+    except socket.timeout:
+        return {"ok": False, "ms": 0, "error": "timeout"}
+    except Exception as e:
+        return {"ok": False, "ms": 0, "error": str(e)}
+
+
+class TieredProber:
+    """分级探测器
+
+    平时只做TCP探测，TLS探测按计划执行，只有当较便宜的级别退化时才升级到完整的HTTP检测。
+    返回结果与 check_github() 保持相同的 status/ms/message 字段，并附带 tier 字段。
+    """
+
+    def __init__(self, full_check: Callable[..., Dict[str, Any]], tiers: Dict[str, Dict] = None,
+                 host: str = "github.com", port: int = 443):
+        self.full_check = full_check
+        self.host = host
+        self.port = port
+        self.tiers = {name: dict(cfg) for name, cfg in DEFAULT_TIERS.items()}
+        for name, cfg in (tiers or {}).items():
+            self.tiers.setdefault(name, {}).update(cfg)
+        self.last_run = {name: 0.0 for name in TIER_ORDER}
+        self.last_result = {name: None for name in TIER_ORDER}
+        self.lock = threading.Lock()
+
+    def _run_tier(self, tier):
+        """执行单个级别的探测"""
+        timeout = self.tiers[tier]["timeout"]
+        if tier == "tcp":
+            result = tcp_probe(self.host, self.port, timeout)
+        elif tier == "tls":
+            result = tls_probe(self.host, self.port, timeout)
+        else:
+            result = dict(self.full_check(timeout=timeout))
+        result["tier"] = tier
+        self.last_run[tier] = time.time()
+        self.last_result[tier] = result
+        return result
+
+    def _is_degraded(self, tier, result):
+        """判断探测结果是否退化"""
+        threshold = self.tiers[tier].get("threshold_ms")
+        return not result["ok"] or (threshold is not None and result["ms"] > threshold)
+
+    def _cached(self, tier, now):
+        """返回仍在该级别间隔内的上次结果"""
+        result = self.last_result[tier]
+        if result is not None and now - self.last_run[tier] < self.tiers[tier]["interval"]:
+            return result
+        return None
+
+    def probe(self, force_tier: str = None) -> Dict[str, Any]:
+        """执行一次分级探测
+
+        Args:
+            force_tier: 强制从指定级别开始探测（可选）
+
+        Returns:
+            dict: 包含 status、ms、tier、message 的探测结果
+        """
+        with self.lock:
+            now = time.time()
+            if force_tier:
+                tier = force_tier
+            elif now - self.last_run["tls"] >= self.tiers["tls"]["interval"]:
+                tier = "tls"
+            else:
+                tier = "tcp"
+
+            start_tier = tier
+            while True:
+                # 只有起始级别可以使用缓存；因退化升级到的级别必须重新探测，否则旧的正常结果会掩盖故障
+                cached = self._cached(tier, now) if tier == start_tier and not force_tier else None
+                result = cached or self._run_tier(tier)
+                if tier == "http":
+                    break
+                if not self._is_degraded(tier, result):
+                    return {"status": "good", "ms": result["ms"], "tier": tier,
+                            "message": f"{tier.upper()}探测正常"}
+                tier = TIER_ORDER[TIER_ORDER.index(tier) + 1]
+
+            message = result.get("message") or f"{tier.upper()}探测{'正常' if result['status'] == 'good' else '异常'}"
+            return dict(result, tier="http", message=message)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 序贯测速排名模块（交错采样流，排名确定后提前停止）
+
+每个IP的样本在一个采样流中交错获得：同一IP同时最多一个探测在途，两次采样至少间隔 min_gap 秒，
+间隔期间事件循环去探测其他IP，因此样本仍有时间上的分散，但不需要整轮等待。每得到一个样本就
+重新计算各IP代价（失败记为惩罚延迟）的置信区间，置信区间已确定在前K名之内或之外的IP不再采样。
+统计可以由历史数据构造的先验开始（prior_stats），历史充分且新鲜的IP不需要任何新的探测。
+"""
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from github_utils.aio_utils import http_probe_async, run_sync
+from github_utils.sketch_utils import new_sketch, sketch_add
+
+DEFAULT_TOP_K = 3
+MIN_SAMPLES = 2  # 每个IP至少采样的次数
+MAX_SAMPLES = 6  # 每个IP最多采样的次数
+MIN_GAP = 0.5  # 同一IP两次采样之间的最小间隔（秒）
+Z_SCORE = 1.96  # 95%置信区间
+MIN_STD_MS = 20  # 标准差下限，避免少量相同样本被误判为已确定
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_LIMIT = 32  # 同时在途的最大探测数
+PRIOR_MAX_SAMPLES = 8  # 历史数据最多折算的等效样本数
+PRIOR_HALF_LIFE = 6 * 3600  # 历史数据权重减半的时间（秒）
+
+
+def new_ip_stats() -> Dict[str, Any]:
+    """创建单个IP的统计：成功样本的延迟草图、成功/总次数（含衰减后的先验）、先验折算前的历史次数与本次新采样次数"""
+    return {"sketch": new_sketch(), "success_count": 0, "total_count": 0, "history_count": 0, "new_count": 0}
+
+
+def prior_stats(sketch: Optional[Dict[str, Any]], success_count: int, total_count: int, age: Optional[float],
+                max_samples: float = PRIOR_MAX_SAMPLES, half_life: float = PRIOR_HALF_LIFE) -> Dict[str, Any]:
+    """由历史统计构造先验
+
+    历史样本折算为最多 max_samples 个等效样本，并按距上次测试的时间 age（秒）指数衰减：
+    越旧的先验越不确定，置信区间越宽，越需要新的采样。衰减只放宽置信区间：最少采样次数按未衰减的
+    历史次数（history_count）判断，刚记录的样本不会因为几秒的衰减而被当作不足。
+    age 未知或没有可用的延迟分布时返回空统计。
+    """
+    stats = new_ip_stats()
+    if not total_count or age is None:
+        return stats
+    successes = sketch["count"] if sketch else 0
+    if success_count:
+        # 延迟草图可能晚于计数加入，按草图覆盖的成功样本折算对应的总次数
+        observed = successes * total_count / success_count
+    else:
+        observed = total_count
+    if not observed:
+        return stats
+    scale = min(observed, max_samples) * 0.5 ** (max(age, 0) / half_life) / observed
+    if successes:
+        stats["sketch"] = dict(sketch, bins={key: count * scale for key, count in sketch["bins"].items()},
+                               **{key: sketch[key] * scale for key in ("count", "sum", "sum_sq", "zero")})
+    stats["success_count"] = successes * scale
+    stats["total_count"] = observed * scale
+    stats["history_count"] = observed
+    return stats
+
+
+def add_sample(stats: Dict[str, Any], latency: Optional[float]):
+    """追加一次采样，latency 为 None 表示失败"""
+    stats["total_count"] += 1
+    stats["new_count"] = stats.get("new_count", 0) + 1
+    if latency is not None:
+        stats["success_count"] += 1
+        sketch_add(stats["sketch"], latency)
+
+
+def cost_interval(stats: Dict[str, Any], penalty_ms: float, z: float = Z_SCORE,
+                  min_std: float = MIN_STD_MS) -> tuple:
+    """IP代价（成功为延迟、失败为 penalty_ms）均值的置信区间，返回 (均值, 下界, 上界)"""
+    count = stats["total_count"]
+    if not count:
+        return penalty_ms, 0.0, math.inf
+    failures = count - stats["success_count"]
+    total = stats["sketch"]["sum"] + failures * penalty_ms
+    total_sq = stats["sketch"]["sum_sq"] + failures * penalty_ms ** 2
+    mean = total / count
+    variance = max(0.0, (total_sq - total * mean) / (count - 1)) if count > 1 else 0.0
+    half_width = z * max(math.sqrt(variance), min_std) / math.sqrt(count)
+    return mean, mean - half_width, mean + half_width
+
+
+def undecided_ips(stats_by_ip: Dict[str, Dict[str, Any]], top_k: int = DEFAULT_TOP_K,
+                  penalty_ms: float = DEFAULT_TIMEOUT * 1000, min_samples: int = MIN_SAMPLES,
+                  max_samples: int = MAX_SAMPLES, z: float = Z_SCORE) -> set:
+    """仍需采样的IP：历史与新采样的次数合计不足，或置信区间与前K名的分界重叠（本次新采样达到 max_samples 的除外）"""
+    intervals = {ip: cost_interval(stats, penalty_ms, z) for ip, stats in stats_by_ip.items()}
+    ordered = sorted(intervals, key=lambda ip: intervals[ip][0])
+    top, rest = ordered[:top_k], ordered[top_k:]
+    undecided = {ip for ip, stats in stats_by_ip.items()
+                 if stats.get("history_count", 0) + stats.get("new_count", 0) < min_samples}
+    if top and rest:
+        best_rest_low = min(intervals[ip][1] for ip in rest)
+        worst_top_high = max(intervals[ip][2] for ip in top)
+        undecided.update(ip for ip in top if intervals[ip][2] >= best_rest_low)
+        undecided.update(ip for ip in rest if intervals[ip][1] <= worst_top_high)
+    return {ip for ip in undecided if stats_by_ip[ip].get("new_count", 0) < max_samples}
+
+
+async def sample_stream_async(ips: List[str], probe: Callable[[str], Awaitable[Optional[float]]],
+                              stats_by_ip: Dict[str, Dict[str, Any]] = None, top_k: int = DEFAULT_TOP_K,
+                              min_samples: int = MIN_SAMPLES, max_samples: int = MAX_SAMPLES,
+                              min_gap: float = MIN_GAP, penalty_ms: float = DEFAULT_TIMEOUT * 1000,
+                              limit: int = DEFAULT_LIMIT,
+                              on_sample: Callable[[str, Optional[float]], None] = None) -> Dict[str, Dict]:
+    """交错采样流：样本最少的待定IP优先，直到所有IP的排名确定或达到采样上限
+
+    Args:
+        probe: 协程函数 probe(ip)，返回延迟毫秒数，失败返回 None
+        stats_by_ip: 已有的统计或先验（原地更新），缺少的IP从零开始
+        on_sample: 每得到一个样本时的回调 (ip, 延迟)
+
+    Returns:
+        dict: {ip: 统计}
+    """
+    stats_by_ip = stats_by_ip if stats_by_ip is not None else {}
+    for ip in ips:
+        stats_by_ip.setdefault(ip, new_ip_stats())
+    candidates = {ip: stats_by_ip[ip] for ip in ips}
+    last_start = {}
+    running = {}  # 任务 -> ip
+    while True:
+        now = time.monotonic()
+        busy = set(running.values())
+        waiting = sorted(undecided_ips(candidates, top_k, penalty_ms, min_samples, max_samples) - busy,
+                         key=lambda ip: (candidates[ip].get("new_count", 0), last_start.get(ip, 0)))
+        for ip in waiting:
+            if len(running) >= limit:
+                break
+            if now - last_start.get(ip, -math.inf) >= min_gap:
+                last_start[ip] = now
+                running[asyncio.ensure_future(probe(ip))] = ip
+        if not running and not waiting:
+            break
+        # 有空闲名额且待定IP仍在间隔期时，最多等到最早的一个可以再次采样
+        next_ready = None
+        if len(running) < limit:
+            next_ready = min((last_start[ip] + min_gap for ip in waiting if ip in last_start), default=None)
+        timeout = max(0.0, next_ready - now) if next_ready is not None else None
+        if not running:
+            await asyncio.sleep(timeout or 0)
+            continue
+        done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            ip = running.pop(task)
+            latency = task.result()
+            add_sample(candidates[ip], latency)
+            if on_sample:
+                on_sample(ip, latency)
+    return stats_by_ip
+
+
+def rank_ips_sequential(ips: List[str], hostname: str = "github.com", timeout: float = DEFAULT_TIMEOUT,
+                        stats_by_ip: Dict[str, Dict[str, Any]] = None, **options) -> Dict[str, Dict]:
+    """同步包装：以HTTPS请求（直连IP，Host/SNI为 hostname）对IP列表执行交错采样流
+
+    options 传给 sample_stream_async（top_k、min_samples、max_samples、min_gap、limit、on_sample）。
+    """
+    async def probe(ip):
+        result = await http_probe_async(ip, 443, timeout, hostname)
+        return result["ms"] if result["ok"] else None
+
+    options.setdefault("penalty_ms", timeout * 1000)
+    return run_sync(sample_stream_async(list(dict.fromkeys(ips)), probe, stats_by_ip, **options))
@@ -20,8 +20,14 @@ def save_config(config, config_path):
     config_path.write_text(json.dumps(config, indent=4, ensure_ascii=False), encoding="utf-8")
 
 
+SEGMENT_PREFIX = "inspection-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
 def load_history(history_path):
-    """加载历史记录"""
+    """加载历史记录（目录按JSONL分段流式读取，文件按旧版JSON读取）"""
+    if history_path.is_dir():
+        return list(iter_history(history_path))
     if history_path.exists():
         try:
             return json.loads(history_path.read_text(encoding="utf-8"))
@@ -31,14 +37,92 @@ def load_history(history_path):
 
 
 def save_history(history, history_path):
-    """保存历史记录"""
+    """保存历史记录（旧版整文件JSON格式）"""
     history_path.write_text(json.dumps(history, indent=4, ensure_ascii=False), encoding="utf-8")
 
 
 def prune_history(history, retention_days):
-    """清理过期历史记录"""
-    cutoff_date = datetime.now() - timedelta(days=retention_days)
-    return [record for record in history if datetime.fromisoformat(record["timestamp"]) >= cutoff_date]
+    """清理过期历史记录
+
+    ISO时间戳可以直接按字符串比较，无需逐条解析
+    """
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+    return [record for record in history if record["timestamp"] >= cutoff]
+
+
+def get_segment_path(history_dir, day):
+    """获取某一天（YYYY-MM-DD）的历史分段文件路径"""
+    return history_dir / f"{SEGMENT_PREFIX}{day}{SEGMENT_SUFFIX}"
+
+
+def list_history_segments(history_dir, start_day=None, end_day=None):
+    """按日期顺序列出历史分段文件，返回 [(day, path), ...]"""
+    if not history_dir.exists():
+        return []
+    segments = []
+    for path in history_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+        day = path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+        if start_day and day < start_day:
+            continue
+        if end_day and day > end_day:
+            continue
+        segments.append((day, path))
+    return sorted(segments)
+
+
+def append_history_record(record, history_dir):
+    """追加一条历史记录到当天的分段文件，O(1) 写入"""
+    history_dir.mkdir(parents=True, exist_ok=True)
+    segment_path = get_segment_path(history_dir, record["timestamp"][:10])
+    with open(segment_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def iter_history(history_dir, start_day=None, end_day=None):
+    """流式读取历史记录，只打开日期范围内的分段文件"""
+    for _, path in list_history_segments(history_dir, start_day, end_day):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程中断时可能留下不完整的最后一行
+                    continue
+
+
+def prune_history_segments(history_dir, retention_days):
+    """按整个分段文件删除过期历史记录，返回删除的分段数"""
+    cutoff_day = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+    removed = 0
+    for day, path in list_history_segments(history_dir):
+        if day >= cutoff_day:
+            break
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def migrate_history(legacy_path, history_dir):
+    """将旧版整文件JSON历史记录迁移为按天分段的JSONL，返回迁移的记录数"""
+    if not legacy_path.exists() or list_history_segments(history_dir):
+        return 0
+    history = load_history(legacy_path)
+    history_dir.mkdir(parents=True, exist_ok=True)
+    segments = {}
+    for record in history:
+        segments.setdefault(record["timestamp"][:10], []).append(record)
+    for day, records in segments.items():
+        with open(get_segment_path(history_dir, day), "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+    return len(history)
 
 
 def generate_alert(message, alert_method):
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 可合并的流式延迟分布草图（对数分桶直方图）
+
+草图以普通字典表示，可直接写入JSON；按对数分桶保存计数，分位数的相对误差不超过 SKETCH_ACCURACY。
+不同时间窗口、不同机器上的草图可直接合并，无需重新扫描原始样本。
+"""
+
+import math
+from typing import Dict, Iterable, Any
+
+SKETCH_ACCURACY = 0.01  # 分位数的相对误差上限（1%）
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+def new_sketch() -> Dict[str, Any]:
+    """创建空草图"""
+    return {"count": 0, "sum": 0.0, "sum_sq": 0.0, "min": None, "max": None, "zero": 0, "bins": {}}
+
+
+def _bin_index(value):
+    """延迟值所属的对数分桶编号"""
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def _bin_value(index):
+    """分桶的代表值（相对误差最小的中点）"""
+    return 2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1)
+
+
+def sketch_add(sketch: Dict[str, Any], value: float, count: int = 1) -> Dict[str, Any]:
+    """向草图追加样本"""
+    if value is None or value < 0:
+        return sketch
+    sketch["count"] += count
+    sketch["sum"] += value * count
+    sketch["sum_sq"] += value * value * count
+    sketch["min"] = value if sketch["min"] is None else min(sketch["min"], value)
+    sketch["max"] = value if sketch["max"] is None else max(sketch["max"], value)
+    if value < 1:
+        sketch["zero"] += count
+    else:
+        key = str(_bin_index(value))
+        sketch["bins"][key] = sketch["bins"].get(key, 0) + count
+    return sketch
+
+
+def sketch_merge(target: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """把 other 合并到 target（原地修改并返回 target）"""
+    if not other or not other.get("count"):
+        return target
+    for key in ("count", "sum", "sum_sq", "zero"):
+        target[key] += other[key]
+    for key, pick in (("min", min), ("max", max)):
+        if other[key] is not None:
+            target[key] = other[key] if target[key] is None else pick(target[key], other[key])
+    for key, count in other["bins"].items():
+        target["bins"][key] = target["bins"].get(key, 0) + count
+    return target
+
+
+def merge_sketches(sketches: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个草图为一个新草图"""
+    merged = new_sketch()
+    for sketch in sketches:
+        sketch_merge(merged, sketch)
+    return merged
+
+
+def sketch_quantile(sketch: Dict[str, Any], q: float) -> float:
+    """估算分位数（q 取 0~1），空草图返回 0"""
+    if not sketch or not sketch["count"]:
+        return 0
+    rank = q * (sketch["count"] - 1)
+    if rank < sketch["zero"]:
+        return sketch["min"]
+    seen = sketch["zero"]
+    for index in sorted(int(key) for key in sketch["bins"]):
+        seen += sketch["bins"][str(index)]
+        if seen > rank:
+            # 代表值限制在真实最小/最大值之间
+            return min(max(_bin_value(index), sketch["min"]), sketch["max"])
+    return sketch["max"]
+
+
+def sketch_percentiles(sketch: Dict[str, Any], percentiles=DEFAULT_PERCENTILES) -> Dict[str, float]:
+    """一次性估算多个百分位数，返回 {"p50": ..., "p95": ...}"""
+    return {f"p{p}": round(sketch_quantile(sketch, p / 100), 1) for p in percentiles}
+
+
+def sketch_mean(sketch: Dict[str, Any]) -> float:
+    """样本均值"""
+    return sketch["sum"] / sketch["count"] if sketch and sketch["count"] else 0
+
+
+def sketch_variance(sketch: Dict[str, Any]) -> float:
+    """样本方差（与 statistics.variance 一致，使用 n-1）"""
+    if not sketch or sketch["count"] < 2:
+        return 0
+    count = sketch["count"]
+    return max(0.0, (sketch["sum_sq"] - sketch["sum"] ** 2 / count) / (count - 1))
+
+
+def sketch_histogram(sketch: Dict[str, Any], edges=(100, 200, 300)) -> Dict[str, int]:
+    """按任意边界把草图折算为粗粒度直方图（按分桶代表值归类）"""
+    labels = [f"<{edges[0]}ms"] + [f"{low}-{high}ms" for low, high in zip(edges, edges[1:])] + [f">{edges[-1]}ms"]
+    counts = [0] * len(labels)
+    counts[0] += sketch["zero"] if sketch else 0
+    for key, count in (sketch or {}).get("bins", {}).items():
+        value = _bin_value(int(key))
+        counts[sum(1 for edge in edges if value >= edge)] += count
+    return dict(zip(labels, counts))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""GitHub工具合集 - 依赖图阶段执行模块（无依赖关系的阶段并发执行）"""
+import concurrent.futures
+
+
+def run_parallel(func, items):
+    """并发对每一项调用 func，按输入顺序返回结果列表"""
+    items = list(items)
+    if not items:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(items)) as executor:
+        return list(executor.map(func, items))
+
+
+def run_stage_graph(stages, on_stage_done=None):
+    """按依赖关系执行各阶段：依赖全部完成的阶段立即启动，彼此独立的阶段并发执行
+
+    Args:
+        stages: {阶段名: (函数, [依赖阶段名])}，函数以依赖阶段的结果为位置参数调用
+        on_stage_done: 每个阶段完成时的回调 (阶段名, 结果, 异常, 已完成数, 总数)
+
+    Returns:
+        tuple: ({阶段名: 结果}, {阶段名: 异常})，失败阶段的结果为 None
+    """
+    results, errors = {}, {}
+    pending = dict(stages)
+    running = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(stages), 1)) as executor:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+            for name in ready:
+                func, deps = pending.pop(name)
+                running[executor.submit(func, *(results[dep] for dep in deps))] = name
+            if not running:
+                raise ValueError(f"阶段依赖无法满足: {', '.join(pending)}")
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = None
+                    errors[name] = e
+                if on_stage_done:
+                    on_stage_done(name, results[name], errors.get(name), len(results), len(stages))
+    return results, errors
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """GitHub工具合集 - 主界面"""
 import sys
-import json
 import threading
 import time
 from pathlib import Path
@@ -10,65 +9,44 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from tkinter import ttk, Canvas  # noqa: E402
 from github_utils import (  # noqa: E402
-    get_tools_order, get_tool_config, run_tool,
-    Tooltip, AsyncTaskRunner, ResultPanel,
+    get_tools_order, get_tool_config, run_tool, get_ui_config, get_monitor_config,
+    Tooltip, AsyncTaskRunner, ResultPanel, UiDispatcher, ToolButton,
     create_main_window, setup_window_style, create_notebook, create_tab,
     create_button_panel, create_exit_button
 )
-from github_utils.common_utils import load_module
 
-# 加载网络检测模块
-checker_module = load_module(
-    Path(__file__).resolve().parent / "github-checker-检测状态" / "github_checker.py"
-)
-check_github = checker_module.check
-
-CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
-with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-    CONFIG = json.load(f)
-
-UI_CONFIG = CONFIG["ui"]
+UI_CONFIG = get_ui_config()
+MONITOR_CONFIG = get_monitor_config()
 TOOLS_ORDER = get_tools_order()
 layout_cfg = UI_CONFIG["layout"]
 text_cfg = UI_CONFIG["text"]
 
 
-class ToolButton(ttk.Button):
-    def __init__(self, parent, tool_key, run_async):
-        self.tool_key = tool_key
-        tool_config = get_tool_config(tool_key)
-        super().__init__(parent, text=tool_config["name"],
-                         command=lambda: run_async(tool_key, self),
-                         width=layout_cfg["tool_button_width"])
-
-
 class NetworkIndicator(Canvas):
     """网络状态指示灯"""
     def __init__(self, parent, size=20, **kwargs):
         super().__init__(parent, width=size, height=size, **kwargs)
         self.size = size
         self.status = "offline"  # online, offline, testing
+        # 圆形指示灯只绘制一次，状态变化时只修改填充色
+        self.light = self.create_oval(2, 2, self.size-2, self.size-2, outline="black", width=1)
         self.draw()
     
     def draw(self):
         """绘制指示灯"""
-        self.delete("all")
-        
         # 定义颜色
         colors = {
             "online": "#4CAF50",  # 绿色 - 在线
             "offline": "#F44336",  # 红色 - 离线
             "testing": "#FFC107"   # 黄色 - 测试中
         }
-        
-        # 绘制圆形指示灯
-        self.create_oval(2, 2, self.size-2, self.size-2, 
-                        fill=colors[self.status], outline="black", width=1)
+        self.itemconfigure(self.light, fill=colors[self.status])
     
     def set_status(self, status):
         """设置指示灯状态"""
-        self.status = status
-        self.draw()
+        if status != self.status:
+            self.status = status
+            self.draw()
     
     def update_status(self, result):
         """根据检测结果更新状态"""
@@ -124,56 +102,64 @@ def main():
     btn_panel = create_button_panel(tools_frame)
     btn_panel.pack(fill="x", pady=(0, 10))
 
-    result_panel = ResultPanel(tools_frame, UI_CONFIG, layout_cfg)
-    result_text = result_panel.text
-    
-    # 网络检测结果显示
-    network_status_text = result_text
+    # 后台线程（工具输出、任务结果、定时检测）统一经调度通道更新界面
+    dispatcher = UiDispatcher(root)
+    result_panel = ResultPanel(tools_frame, UI_CONFIG, layout_cfg, dispatcher=dispatcher)
     
-    # 定时网络检测函数
-    def check_network_status():
-        """检测网络状态并更新指示灯"""
-        network_indicator.set_status("testing")
-        try:
-            result = check_github()
-            current_time = time.strftime("%H:%M:%S")
+    # 网络状态由共享的健康状态服务探测（后台线程），结果经调度通道在界面线程中显示
+    def show_network_status(result, error=None):
+        """更新指示灯并记录检测结果"""
+        current_time = time.strftime("%H:%M:%S")
+        error = error if error is not None else result.get("error")
+        if error is not None:
+            network_indicator.set_status("offline")
+            last_check_label.config(text="最后检测: 失败")
+            result_panel.insert(f"[{current_time}] 网络检测失败: {error}")
+        else:
             network_indicator.update_status(result)
             last_check_label.config(text=f"最后检测: {current_time}")
-            
-            # 记录检测结果
-            network_status_text.insert("end", f"\n[{current_time}] 网络检测: {result['status']} - {result.get('message', '')}")
-            network_status_text.see("end")
-        except Exception as e:
-            network_indicator.set_status("offline")
-            last_check_label.config(text=f"最后检测: 失败")
-            network_status_text.insert("end", f"\n[{time.strftime('%H:%M:%S')}] 网络检测失败: {str(e)}")
-            network_status_text.see("end")
+            result_panel.insert(f"[{current_time}] 网络检测: {result['status']} - {result.get('message', '')}")
     
-    # 定时检测线程
+    def on_health_result(result):
+        """健康状态订阅回调（在探测线程中调用），转交界面线程处理"""
+        dispatcher.post(show_network_status, result)
+
+    health = {}
+
+    # 订阅健康状态服务：分级探测、ssl等依赖在后台线程中导入，不占用界面线程
     def start_network_monitor():
-        """启动定时网络检测"""
-        while True:
-            check_network_status()
-            time.sleep(180)  # 每3分钟检测一次
+        from github_utils.health_utils import get_health_monitor
+        monitor = get_health_monitor()
+        monitor.subscribe(on_health_result, MONITOR_CONFIG.get("interval", 180),  # 默认每3分钟检测一次
+                          on_start=lambda: dispatcher.post(network_indicator.set_status, "testing"))
+        monitor.start()
+        health["monitor"] = monitor
+    
+    # 窗口首次绘制完成后再启动后台线程
+    def start_background_tasks():
+        threading.Thread(target=start_network_monitor, daemon=True, name="network-monitor-init").start()
     
-    # 启动检测线程
-    monitor_thread = threading.Thread(target=start_network_monitor, daemon=True)
-    monitor_thread.start()
-
-    ttk.Label(info_frame, text=text_cfg["info_frame_title"],
-              font=tuple(UI_CONFIG["style"]["label_font"])).pack(
-                  anchor="w",
-                  pady=(0, UI_CONFIG["padding"]["info_title_pady_bottom"]))
-    ttk.Label(info_frame, text=text_cfg["info_content"],
-              justify="left",
-              foreground=UI_CONFIG["colors"]["info_text_foreground"]).pack(
-                  anchor="w")
+    root.after_idle(start_background_tasks)
+
+    # 说明选项卡在首次切换到该页时才填充内容
+    def fill_info_frame(event=None):
+        if notebook.select() != str(info_frame) or info_frame.winfo_children():
+            return
+        ttk.Label(info_frame, text=text_cfg["info_frame_title"],
+                  font=tuple(UI_CONFIG["style"]["label_font"])).pack(
+                      anchor="w",
+                      pady=(0, UI_CONFIG["padding"]["info_title_pady_bottom"]))
+        ttk.Label(info_frame, text=text_cfg["info_content"],
+                  justify="left",
+                  foreground=UI_CONFIG["colors"]["info_text_foreground"]).pack(
+                      anchor="w")
+    
+    notebook.bind("<<NotebookTabChanged>>", fill_info_frame)
 
     def handle_result(tool_key, status, data):
-        result_panel.clear_progress()
+        result_panel.clear_progress(tool_key)
         if status == "success":
-            result_text.insert("end", json.dumps(data, ensure_ascii=False,
-                                                 indent=2) + "\n")
+            result_panel.show_json(data)
             
             # 更新网络状态指示灯
             # 检查工具类型和结果格式，更新网络状态指示灯
@@ -182,6 +168,9 @@ def main():
                 network_indicator.update_status(data)
                 current_time = time.strftime("%H:%M:%S")
                 last_check_label.config(text=f"最后检测: {current_time}")
+                if tool_key == "checker" and "monitor" in health:
+                    # 手动完整检测的结果交给健康状态服务，其他订阅者到期时直接采用，不再重复探测
+                    health["monitor"].publish(data)
             elif tool_key == "connection_diagnostic":
                 # 连接诊断工具的结果格式
                 if data.get("github_status"):
@@ -195,35 +184,33 @@ def main():
                     network_indicator.set_status("online")
                     current_time = time.strftime("%H:%M:%S")
                     last_check_label.config(text=f"最后检测: {current_time}")
+        elif status == "cancelled":
+            result_panel.insert(f"{data}")
         else:
-            result_text.insert("end", f"错误: {data}\n")
-        result_text.see("end")
+            result_panel.insert(f"错误: {data}")
 
-    task_runner = AsyncTaskRunner(result_callback=handle_result)
+    task_runner = AsyncTaskRunner(result_callback=handle_result, dispatcher=dispatcher)
 
     def run_tool_async(tool_key, btn):
         tool_config = get_tool_config(tool_key)
-        result_panel.clear_progress()
-        result_text.insert("end", f"\n{'=' * 40}\n")
-        result_text.insert("end", f"正在执行: {tool_config['name']}...\n")
-        result_text.see("end")
-        output_func = result_panel.create_progress_output_func()
-        if output_func is not None:
-            task_runner.run_tool_async(tool_key, tool_config, run_tool, btn,
-                                       output_func=output_func)
-        else:
-            task_runner.run_tool_async(tool_key, tool_config, run_tool, btn)
-        root.after(100, check_queue)
-
-    def check_queue():
-        if task_runner.check_queue(list(tool_buttons.values())):
-            root.after(100, check_queue)
+        if task_runner.is_running(tool_key):
+            # 运行中再次点击即停止：排队中的任务立即取消，运行中的任务在下一次输出时中止
+            if task_runner.cancel(tool_key):
+                btn.config(state="disabled")
+                result_panel.insert(f"正在停止: {tool_config['name']}...")
+            return
+        result_panel.clear_progress(tool_key)
+        result_panel.insert(f"\n{'=' * 40}")
+        result_panel.insert(f"正在执行: {tool_config['name']}...")
+        # 逐阶段推送部分结果的工具（如连接诊断）保留每一行输出，其余工具只显示最新进度
+        output_func = result_panel.create_progress_output_func(tool_key, tool_config.get("stream_output", False))
+        task_runner.run_tool_async(tool_key, tool_config, run_tool, btn, output_func=output_func)
 
     tool_buttons = {}
     for i, key in enumerate(TOOLS_ORDER):
         row = i // layout_cfg["buttons_per_row"]
         col = i % layout_cfg["buttons_per_row"]
-        btn = ToolButton(btn_panel, key, run_tool_async)
+        btn = ToolButton(btn_panel, key, get_tool_config(key), run_tool_async, layout_cfg)
         btn.grid(row=row, column=col,
                  padx=layout_cfg["button_padding_x"],
                  pady=layout_cfg["button_padding_y"],
@@ -231,7 +218,13 @@ def main():
         tool_buttons[key] = btn
         Tooltip(btn, get_tool_config(key)["description"], UI_CONFIG)
 
-    exit_btn = create_exit_button(btn_panel, root.destroy, UI_CONFIG)
+    def exit_app():
+        if "monitor" in health:
+            health["monitor"].unsubscribe(on_health_result)
+        task_runner.shutdown()
+        root.destroy()
+
+    exit_btn = create_exit_button(btn_panel, exit_app, UI_CONFIG)
     exit_btn.grid(row=0, column=layout_cfg["exit_button_column"],
                   padx=layout_cfg["button_padding_x"],
                   pady=layout_cfg["button_padding_y"],
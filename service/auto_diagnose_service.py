@@ -4,45 +4,35 @@ import sys
 import time
 import json
 import os
+import concurrent.futures
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import from github_utils
-from github_utils.common_utils import load_module
+from github_utils.common_utils import subproject_module, lazy_function
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
 # Import from trace layer
 import trace.fault_analysis as fault_analysis
+from trace import connection_diagnostic
 
-# Import from subprojects
-checker_module = load_module(
-    ROOT_DIR / "github-checker-检测状态" / "github_checker.py"
-)
-check_github = checker_module.check
+# Import from subprojects（首次调用时才加载，与trace层共享同一个模块实例）
+checker_module = subproject_module("checker")
+check_github = lazy_function(checker_module, "check")
 
-dns_module = load_module(
-    ROOT_DIR / "GitHub-searcher-dns-DNS" / "github_dns.py"
-)
-get_dns_ips = dns_module.resolve_all
+dns_module = subproject_module("dns")
+get_dns_ips = lazy_function(dns_module, "resolve_all")
 
-tester_module = load_module(
-    ROOT_DIR / "GitHub-searcher-test-测速" / "github_ip_tester.py"
-)
-test_ips = tester_module.test_all
+tester_module = subproject_module("tester")
+test_ips = lazy_function(tester_module, "test_all")
 
-repair_module = load_module(
-    ROOT_DIR / "GitHub-repair-fix-修复" / "github_repair_fix.py"
-)
-update_hosts = repair_module.update_hosts
-is_admin = repair_module.is_admin
+repair_module = subproject_module("repair")
+update_hosts = lazy_function(repair_module, "update_hosts")
+is_admin = lazy_function(repair_module, "is_admin")
 
-# Import from connection_diagnostic subproject
-connection_diagnostic = load_module(
-    ROOT_DIR / "trace" / "connection_diagnostic.py"
-)
 get_known_good_ips = connection_diagnostic.get_known_good_ips
 fallback_dns_lookup = connection_diagnostic.fallback_dns_lookup
 fallback_known_ips = connection_diagnostic.fallback_known_ips
@@ -50,6 +40,11 @@ fallback_ip_quality_db = connection_diagnostic.fallback_ip_quality_db
 fallback_quick_test = connection_diagnostic.fallback_quick_test
 fallback_manual_config = connection_diagnostic.fallback_manual_config
 test_single_ip = connection_diagnostic.test_single_ip
+verify_ip_sni = connection_diagnostic.verify_ip_sni
+
+# 候选IP数量与备选IP
+CANDIDATE_TOP_K = 3
+MANUAL_IPS = ["140.82.113.4", "140.82.113.5", "140.82.114.4"]
 
 def load_ip_quality_db():
     """加载IP质量数据库"""
@@ -85,6 +80,26 @@ def print_step(step_num, message):
     print('='*50)
 
 
+def rank_candidates(test_results, top_k=CANDIDATE_TOP_K):
+    """根据测速结果生成按延迟排序的前top_k个候选IP
+
+    Returns:
+        list: [(ip, latency), ...]
+    """
+    successful = [r for r in test_results if r.get("status") == "OK" and r.get("latency")]
+    successful.sort(key=lambda r: r["latency"])
+    return [(r["ip"], r["latency"]) for r in successful[:top_k]]
+
+
+def verify_candidates(ips, host="github.com"):
+    """并行对候选IP做SNI直连校验，按原排名返回通过校验的IP"""
+    if not ips:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ips)) as executor:
+        results = list(executor.map(lambda ip: verify_ip_sni(ip, host), ips))
+    return [r["ip"] for r in results if r["ok"]]
+
+
 def try_hosts_repair_with_fallback(github_ips):
     """尝试修复hosts，失败时提供备用方案"""
     if not is_admin():
@@ -182,38 +197,39 @@ def run(progress_callback=None):
 
     # 阶段3: 智能IP测试与筛选
     update_progress(3, "开始智能IP测试与筛选...")
-    best_ip = None
-    best_latency = float('inf')
+    candidates = []
     
     if unique_ips:
-        # 使用github_ip_tester测试所有IP
+        # 使用github_ip_tester测试所有IP，按实测延迟取前K个候选
         try:
             test_results = test_ips(unique_ips)
             update_progress(3, f"测试完成，共测试了{len(test_results)}个IP")
-            
-            # 按延迟排序，选择最佳IP
-            sorted_results = sorted(test_results.items(), key=lambda x: x[1]['latency'] if x[1]['success'] else float('inf'))
-            if sorted_results:
-                best_ip, best_result = sorted_results[0]
-                if best_result['success']:
-                    best_latency = best_result['latency']
-                    update_progress(3, f"找到最佳IP: {best_ip} (延迟: {best_latency:.0f}ms)")
-                else:
-                    update_progress(3, "没有找到可用的IP")
+            candidates = rank_candidates(test_results)
+            if candidates:
+                ranking = ", ".join(f"{ip}({latency}ms)" for ip, latency in candidates)
+                update_progress(3, f"候选IP排名: {ranking}")
+            else:
+                update_progress(3, "没有找到可用的IP")
         except Exception as e:
             update_progress(3, f"IP测试失败: {e}")
     
-    if not best_ip:
+    if not candidates:
         update_progress(3, "IP测试失败，使用备选方案...")
-        # 备选方案：手动配置的IP
-        manual_ips = ["140.82.113.4", "140.82.113.5"]  # 常用的GitHub IP
-        best_ip = manual_ips[0]
-        best_latency = 0
-        update_progress(3, f"使用手动配置的最佳IP: {best_ip}")
+        # 备选方案：手动配置的IP，同样需要经过阶段4的校验
+        candidates = [(ip, 0) for ip in MANUAL_IPS]
+        update_progress(3, f"使用手动配置的候选IP: {', '.join(MANUAL_IPS)}")
 
     # 阶段4: 多策略修复尝试
     update_progress(4, "开始多策略修复尝试...")
     
+    # 写入hosts前先以SNI直连校验候选IP，只提交通过校验的IP
+    candidate_latency = dict(candidates)
+    verified_ips = verify_candidates([ip for ip, _ in candidates])
+    update_progress(4, f"SNI校验通过{len(verified_ips)}/{len(candidates)}个候选IP")
+    
+    best_ip = verified_ips[0] if verified_ips else candidates[0][0]
+    best_latency = candidate_latency.get(best_ip, 0)
+    
     # 准备修复用的IP映射
     github_ips = {
         "github.com": best_ip,
@@ -229,8 +245,12 @@ def run(progress_callback=None):
     }
     
     # 尝试修复hosts文件
-    update_progress(4, f"尝试更新hosts文件，使用IP: {best_ip}")
-    repair_result = try_hosts_repair_with_fallback(github_ips)
+    if verified_ips:
+        update_progress(4, f"尝试更新hosts文件，使用IP: {best_ip}")
+        repair_result = try_hosts_repair_with_fallback(github_ips)
+    else:
+        update_progress(4, "没有候选IP通过SNI校验，跳过hosts写入")
+        repair_result = {"success": False, "error": "没有候选IP通过SNI校验"}
     
     # 阶段5: 全面验证修复结果
     update_progress(5, "开始全面验证修复结果...")
@@ -268,6 +288,8 @@ def run(progress_callback=None):
             "before": repair_before,
             "after": repair_after,
             "github_ips": github_ips,
+            "candidates": candidates,
+            "verified_ips": verified_ips,
             "repair_result": repair_result
         }
     )
@@ -280,22 +302,23 @@ def run(progress_callback=None):
         # 这里可以添加更多深度诊断逻辑
         update_progress(6, "深度诊断完成，尝试最终修复方案...")
         
-        # 最终尝试：使用备选IP
-        backup_ips = ["140.82.113.5", "140.82.114.4"]
-        for backup_ip in backup_ips:
-            if backup_ip != best_ip:
-                update_progress(6, f"尝试使用备选IP: {backup_ip}")
-                backup_github_ips = {
-                    "github.com": backup_ip,
-                    "api.github.com": backup_ip
-                }
-                backup_repair_result = try_hosts_repair_with_fallback(backup_github_ips)
-                time.sleep(2)
-                backup_verify_result = check_github()
-                if backup_verify_result["status"] == "good":
-                    update_progress(6, f"最终尝试成功！GitHub连接正常（{backup_verify_result.get('ms', 0):.0f}ms）")
-                    verify_result = backup_verify_result
-                    break
+        # 最终尝试：切换到下一个已通过SNI校验的候选IP，只写入一次hosts
+        backup_ip = next((ip for ip in verified_ips if ip != best_ip), None)
+        if backup_ip:
+            update_progress(6, f"尝试使用已校验的备选IP: {backup_ip}")
+            backup_github_ips = {
+                "github.com": backup_ip,
+                "api.github.com": backup_ip
+            }
+            try_hosts_repair_with_fallback(backup_github_ips)
+            time.sleep(2)
+            backup_verify_result = check_github()
+            if backup_verify_result["status"] == "good":
+                update_progress(6, f"最终尝试成功！GitHub连接正常（{backup_verify_result.get('ms', 0):.0f}ms）")
+                verify_result = backup_verify_result
+                best_ip = backup_ip
+        else:
+            update_progress(6, "没有其他已校验的候选IP可供切换")
     else:
         update_progress(6, "修复成功，无需深度诊断")
     
@@ -1,26 +1,32 @@
 #!/usr/bin/env python3
 """GitHub守护进程 - 配置工具模块"""
 import os
-import json
 from pathlib import Path
 
+from github_utils.common_utils import ROOT_DIR, CONFIG_PATH, load_sub_config
+from github_utils.config_cache_utils import subscribe_config
+
 # 引入trace层模块，符合service层必须引用trace层内容的要求
 from trace import hosts_manager
 
 
+GUARDIAN_DIR = "GitHub-guardian-守护进程"
+DEFAULT_CONFIG = {
+    "ip_pool": ["140.82.113.4", "140.82.114.4", "140.82.113.3"],
+    "check_interval": 60,
+    "timeout": 3
+}
+
+
 def load_config():
-    """加载配置"""
-    CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    else:
-        # 默认配置
-        return {
-            "ip_pool": ["140.82.113.4", "140.82.114.4", "140.82.113.3"],
-            "check_interval": 60,
-            "timeout": 3
-        }
+    """加载守护进程配置（子项目配置合并根目录覆盖，带缓存）"""
+    return {**DEFAULT_CONFIG, **load_sub_config(GUARDIAN_DIR)}
+
+
+def watch_config(callback):
+    """订阅守护进程配置变更，配置文件修改后以新配置调用 callback(config)"""
+    subscribe_config([ROOT_DIR / GUARDIAN_DIR / "config.json", CONFIG_PATH],
+                     lambda: callback(load_config()))
 
 
 def get_hosts_path():
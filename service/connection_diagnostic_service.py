@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """连接诊断服务 - 复杂的GitHub连接诊断逻辑"""
 import socket
-import subprocess
 import sys
 import time
 from pathlib import Path
@@ -13,73 +12,78 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from trace import fault_analysis
 from trace import connection_diagnostic
 
-# Import from subprojects
-from github_utils.common_utils import load_module
+# Import from subprojects（首次调用时才加载，与trace层共享同一个模块实例）
+from github_utils.common_utils import subproject_module, lazy_function
+from github_utils.stage_utils import run_parallel, run_stage_graph
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
-# Load subproject modules
-checker_module = load_module(
-    ROOT_DIR / "github-checker-检测状态" / "github_checker.py"
-)
-check_github = checker_module.check
+checker_module = subproject_module("checker")
+check_github = lazy_function(checker_module, "check")
 
-dns_module = load_module(
-    ROOT_DIR / "GitHub-searcher-dns-DNS" / "github_dns.py"
-)
-get_dns_ips = dns_module.resolve_all
+dns_module = subproject_module("dns")
+get_dns_ips = lazy_function(dns_module, "resolve_all")
 
-tester_module = load_module(
-    ROOT_DIR / "GitHub-searcher-test-测速" / "github_ip_tester.py"
-)
-test_single = tester_module.test_homepage_speed
+tester_module = subproject_module("tester")
+test_single = lazy_function(tester_module, "test_homepage_speed")
+
+# 读取不到路由表时尝试的常见网关地址
+COMMON_GATEWAYS = ["192.168.1.1", "192.168.0.1", "10.0.0.1", "192.168.2.1", "192.168.10.1"]
 
 
 def check_local_network():
-    """检查本地网络连通性"""
-    print("\n[1/5] 本地网络检查")
-    print("-" * 40)
-
-    # 常见网关地址列表，提高检测准确性
-    common_gateways = ["192.168.1.1", "192.168.0.1", "10.0.0.1", "192.168.2.1", "192.168.10.1"]
-    gateway = None
-    for g in common_gateways:
-        if connection_diagnostic.ping_host(g):
-            gateway = g
-            break
-    gateway = gateway or common_gateways[0]  # 默认使用192.168.1.1
-
-    checks = {
-        "网关": gateway,
-        "DNS": "114.114.114.114",
-        "互联网": "8.8.8.8"
-    }
+    """检查本地网络连通性（进程内同时ping网关和外部主机）"""
+    lines = ["\n[1/5] 本地网络检查", "-" * 40]
+
+    # 优先使用路由表中的默认网关，读取不到时再尝试常见网关地址
+    gateways = connection_diagnostic.find_gateways() or COMMON_GATEWAYS
+    others = {"DNS": "114.114.114.114", "互联网": "8.8.8.8"}
+    pings = connection_diagnostic.ping_many(gateways + list(others.values()))
+
+    # 按顺序取第一个可达的网关，都不可达时使用第一个
+    gateway = next((g for g in gateways if pings[g]["received"]), gateways[0])
+    checks = {"网关": gateway, **others}
 
     results = {}
     for name, host in checks.items():
-        success = connection_diagnostic.ping_host(host)
+        ping = pings[host]
+        success = ping["received"] > 0
         symbol = "✓" if success else "✗"
         results[name] = success
-        print(f"  {symbol} {name}可达: {host}")
+        detail = f"{ping['rtt_ms']}ms" if success else f"丢包 {ping['loss']:.0%}"
+        lines.append(f"  {symbol} {name}可达: {host} ({detail})")
 
-    print("\n  提示: 如已配置 hosts 文件，可绕过 DNS 直接访问")
+    lines.append("\n  提示: 如已配置 hosts 文件，可绕过 DNS 直接访问")
+    print("\n".join(lines))
     return results
 
 
+def check_github_status():
+    """检查 GitHub 整体状态"""
+    github_status = check_github()
+    lines = ["\n[5/5] GitHub 状态检查", "-" * 40,
+             f"  当前状态: {github_status['status'].upper()}",
+             f"  响应时间: {github_status['ms']}ms"]
+    for name, result in github_status["results"]:
+        status = "✓" if result["ok"] else "✗"
+        lines.append(f"  {status} {name}: {'OK' if result['ok'] else 'FAIL'} ({result['ms']}ms)")
+    print("\n".join(lines))
+    return github_status
+
+
 def check_dns_resolution():
     """检查 DNS 解析"""
-    print("\n[2/5] DNS 解析检查")
-    print("-" * 40)
-
-    print("  正在解析 github.com...")
+    lines = ["\n[2/5] DNS 解析检查", "-" * 40, "  正在解析 github.com..."]
     ips = get_dns_ips()
 
     if ips:
-        print("  ✓ DNS 解析成功")
-        print(f"    解析结果: {', '.join(ips[:5])}{'...' if len(ips) > 5 else ''}")
+        lines.append("  ✓ DNS 解析成功")
+        lines.append(f"    解析结果: {', '.join(ips[:5])}{'...' if len(ips) > 5 else ''}")
+        print("\n".join(lines))
         return True, ips
     else:
-        print("  ✗ DNS 解析失败，无法获取 IP")
+        lines.append("  ✗ DNS 解析失败，无法获取 IP")
+        print("\n".join(lines))
         # 记录 DNS 故障
         fault_analysis.log_fault(
             "dns_failure",
@@ -88,44 +92,38 @@ def check_dns_resolution():
         return False, []
 
 
+def connect_tcp(ip, port=443, timeout=3):
+    """连接单个IP的TCP端口，返回 (是否成功, 说明)"""
+    try:
+        start = time.time()
+        with socket.create_connection((ip, port), timeout=timeout):
+            latency = int((time.time() - start) * 1000)
+        return True, f"连接成功 ({latency}ms)"
+    except socket.timeout:
+        return False, "连接失败 (连接超时)"
+    except ConnectionRefusedError:
+        return False, "连接失败 (连接被拒绝)"
+    except Exception as e:
+        return False, f"连接失败 ({type(e).__name__})"
+
+
 def check_tcp_connection(ips):
-    """检查 TCP 连接"""
-    print("\n[3/5] TCP 连接检查")
-    print("-" * 40)
+    """检查 TCP 连接（各IP同时连接）"""
+    lines = ["\n[3/5] TCP 连接检查", "-" * 40]
 
     if not ips:
-        print("  ✗ 无可用 IP 进行连接检查")
+        lines.append("  ✗ 无可用 IP 进行连接检查")
+        print("\n".join(lines))
         return {}
 
     results = {}
-    all_failed = True
-    for ip in ips[:5]:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(3)
-            start = time.time()
-            sock.connect((ip, 443))
-            latency = int((time.time() - start) * 1000)
-            sock.close()
-            symbol = "✓"
-            results[ip] = True
-            all_failed = False
-            print(f"  {symbol} {ip}:443 - 连接成功 ({latency}ms)")
-        except socket.timeout:
-            symbol = "✗"
-            results[ip] = False
-            print(f"  {symbol} {ip}:443 - 连接失败 (连接超时)")
-        except ConnectionRefusedError:
-            symbol = "✗"
-            results[ip] = False
-            print(f"  {symbol} {ip}:443 - 连接失败 (连接被拒绝)")
-        except Exception as e:
-            symbol = "✗"
-            results[ip] = False
-            print(f"  {symbol} {ip}:443 - 连接失败 ({type(e).__name__})")
+    for ip, (success, message) in zip(ips[:5], run_parallel(connect_tcp, ips[:5])):
+        results[ip] = success
+        lines.append(f"  {'✓' if success else '✗'} {ip}:443 - {message}")
+    print("\n".join(lines))
     
     # 如果所有TCP连接都失败，记录TCP故障
-    if all_failed:
+    if not any(results.values()):
         fault_analysis.log_fault(
             "tcp_failure",
             details={"ips": ips[:5], "reason": "所有IP的TCP连接都失败", "port": 443}
@@ -135,31 +133,27 @@ def check_tcp_connection(ips):
 
 
 def check_http_response(ips):
-    """检查 HTTP 响应"""
-    print("\n[4/5] HTTP 响应检查")
-    print("-" * 40)
+    """检查 HTTP 响应（各IP同时请求）"""
+    lines = ["\n[4/5] HTTP 响应检查", "-" * 40]
 
     if not ips:
-        print("  ✗ 无可用 IP 进行 HTTP 检查")
+        lines.append("  ✗ 无可用 IP 进行 HTTP 检查")
+        print("\n".join(lines))
         return {}
 
     results = {}
-    all_failed = True
-    for ip in ips[:3]:
-        result = test_single(ip)
+    for ip, result in zip(ips[:3], run_parallel(test_single, ips[:3])):
         if result.get("latency"):
-            symbol = "✓"
             results[ip] = True
-            all_failed = False
-            print(f"  {symbol} GET / HTTP/1.1 - 响应成功 ({result['latency']}ms)")
+            lines.append(f"  ✓ GET / HTTP/1.1 - 响应成功 ({result['latency']}ms)")
         else:
-            symbol = "✗"
             results[ip] = False
             error = result.get("error", "未知错误")
-            print(f"  {symbol} GET / HTTP/1.1 - 无响应 ({error})")
+            lines.append(f"  ✗ GET / HTTP/1.1 - 无响应 ({error})")
+    print("\n".join(lines))
     
     # 如果所有HTTP请求都失败，记录HTTP故障
-    if all_failed:
+    if not any(results.values()):
         fault_analysis.log_fault(
             "http_failure",
             details={"ips": ips[:3], "reason": "所有IP的HTTP请求都失败", "port": 443}
@@ -168,47 +162,78 @@ def check_http_response(ips):
     return results
 
 
+def resolved_ips(dns_result):
+    """从DNS阶段的结果中取出IP列表（DNS阶段失败时为空）"""
+    return dns_result[1] if dns_result else []
+
+
+# 诊断阶段：{阶段名: (函数, 依赖阶段)}，本地网络、GitHub状态、DNS解析互不依赖，TCP/HTTP检查只依赖DNS解析
+DIAGNOSIS_STAGES = {
+    "local_network": (check_local_network, []),
+    "github_status": (check_github_status, []),
+    "dns_resolution": (check_dns_resolution, []),
+    "tcp_connection": (lambda dns_result: check_tcp_connection(resolved_ips(dns_result)), ["dns_resolution"]),
+    "http_response": (lambda dns_result: check_http_response(resolved_ips(dns_result)), ["dns_resolution"]),
+}
+STAGE_NAMES = {
+    "local_network": "本地网络检查",
+    "github_status": "GitHub状态检查",
+    "dns_resolution": "DNS解析检查",
+    "tcp_connection": "TCP连接检查",
+    "http_response": "HTTP响应检查",
+}
+
+
+def count_passed(results, unit):
+    """统计 {项: 是否通过} 中通过的数量"""
+    return f"{sum(1 for ok in results.values() if ok)}/{len(results)} {unit}" if results else f"无可检查的{unit}"
+
+
+def stage_summary(name, result):
+    """阶段结果摘要（随进度回调推送，不必等待整个诊断结束）"""
+    if name == "local_network":
+        return "，".join(f"{item}{'可达' if ok else '不可达'}" for item, ok in (result or {}).items()) or "无结果"
+    if name == "github_status":
+        status = result or {}
+        return f"{status.get('status', 'error').upper()} ({status.get('ms', 0)}ms)"
+    if name == "dns_resolution":
+        ok, ips = result or (False, [])
+        return f"解析到 {len(ips)} 个IP: {', '.join(ips[:3])}" if ok else "解析失败"
+    if name == "tcp_connection":
+        return f"{count_passed(result or {}, '个IP')}可连接"
+    return f"{count_passed(result or {}, '个IP')}响应正常"
+
+
 def diagnose_connection(progress_callback=None):
-    """诊断 GitHub 连接问题"""
+    """诊断 GitHub 连接问题
+    
+    各阶段按依赖关系并发执行，每个阶段完成时立即通过 progress_callback(阶段, 结果摘要, 进度百分比) 推送，
+    网络完全不通时整体耗时约为单个超时，而不是各项超时之和。
+    """
     print("\n" + "=" * 60)
     print("GitHub 连接诊断")
     print("=" * 60)
     
-    # 阶段1: 检查本地网络
-    if progress_callback:
-        progress_callback("本地网络检查", "开始检查本地网络连通性", 0)
-    local_network_ok = all(check_local_network().values())
-    
-    # 阶段2: 检查 GitHub 状态
-    if progress_callback:
-        progress_callback("GitHub状态检查", "开始检查GitHub整体状态", 25)
-    github_status = check_github()
-    print(f"\n[5/5] GitHub 状态检查")
-    print("-" * 40)
-    print(f"  当前状态: {github_status['status'].upper()}")
-    print(f"  响应时间: {github_status['ms']}ms")
-    for name, result in github_status["results"]:
-        status = "✓" if result["ok"] else "✗"
-        print(f"  {status} {name}: {'OK' if result['ok'] else 'FAIL'} ({result['ms']}ms)")
-    
-    # 阶段3: 检查 DNS 解析
-    if progress_callback:
-        progress_callback("DNS解析检查", "开始检查DNS解析功能", 50)
-    dns_ok, ips = check_dns_resolution()
-    
-    # 阶段4: 检查 TCP 连接
-    if progress_callback:
-        progress_callback("TCP连接检查", "开始检查TCP连接能力", 75)
-    tcp_ok = check_tcp_connection(ips)
-    
-    # 阶段5: 检查 HTTP 响应
     if progress_callback:
-        progress_callback("HTTP响应检查", "开始检查HTTP响应能力", 100)
-    http_ok = check_http_response(ips)
+        progress_callback("连接诊断", "并发开始本地网络、GitHub状态和DNS解析检查", 0)
+
+    def on_stage_done(name, result, error, done, total):
+        if error is not None:
+            print(f"\n  ✗ {STAGE_NAMES[name]}出错: {error}")
+        if progress_callback:
+            message = f"出错: {error}" if error is not None else f"已完成 - {stage_summary(name, result)}"
+            progress_callback(STAGE_NAMES[name], message, int(done * 100 / total))
+
+    results, _ = run_stage_graph(DIAGNOSIS_STAGES, on_stage_done)
+    dns_ok, ips = results["dns_resolution"] or (False, [])
+    tcp_ok = results["tcp_connection"] or {}
+    http_ok = results["http_response"] or {}
+    local_network = results["local_network"] or {}
+    github_status = results["github_status"] or {"status": "error", "ms": 0, "results": []}
     
     # 生成诊断报告
     diagnosis = {
-        "local_network": local_network_ok,
+        "local_network": bool(local_network) and all(local_network.values()),
         "github_status": github_status,
         "dns_resolution": dns_ok,
         "tcp_connection": any(tcp_ok.values()) if tcp_ok else False,
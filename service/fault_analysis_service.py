@@ -9,6 +9,7 @@ from collections import defaultdict
 # 导入trace层的基础功能
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from trace import fault_analysis
+from trace.fault_analysis_rollup import empty_day, query_days, merge_faults, merge_repairs
 
 # 故障类型定义
 FAULT_TYPES = {
@@ -30,196 +31,99 @@ REPAIR_SCHEMES = {
     "other": "其他修复方案"
 }
 
-def analyze_fault_trends(days=30):
-    """分析故障趋势"""
-    fault_history = fault_analysis.load_fault_history()
-    repair_history = fault_analysis.load_repair_history()
-    
-    # 计算日期范围
+def get_date_range(days):
+    """计算最近 days 天的日期范围 (start_date, end_date)"""
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # 按日期分组故障记录
-    daily_faults = defaultdict(list)
-    for record in fault_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            date_key = record_date.strftime("%Y-%m-%d")
-            daily_faults[date_key].append(record)
-    
-    # 按日期分组修复记录
-    daily_repairs = defaultdict(list)
-    for record in repair_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            date_key = record_date.strftime("%Y-%m-%d")
-            daily_repairs[date_key].append(record)
+    return end_date - timedelta(days=days), end_date
+
+def query_rollup(days, rollup=None):
+    """从预聚合汇总中取出最近 days 天每天的汇总 [(date, entry), ...]
+
+    rollup 为已同步的汇总（可选），同一份报告的多个统计共用一次同步。
+    """
+    start_date, end_date = get_date_range(days)
+    rollup = rollup if rollup is not None else fault_analysis.get_rollup()
+    return query_days(rollup, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+
+def success_rate(successful, count):
+    """计算成功率（百分比，保留一位小数）"""
+    return round(successful / count * 100, 1) if count > 0 else 0
+
+def analyze_fault_trends(days=30, rollup=None):
+    """分析故障趋势"""
+    daily = dict(query_rollup(days, rollup))
+    start_date, end_date = get_date_range(days)
     
     # 生成趋势数据
     trend_data = []
     current_date = start_date
     while current_date <= end_date:
         date_key = current_date.strftime("%Y-%m-%d")
-        
-        # 统计当日故障
-        day_faults = daily_faults.get(date_key, [])
-        day_repairs = daily_repairs.get(date_key, [])
-        
-        # 故障类型统计
-        fault_type_count = defaultdict(int)
-        for fault in day_faults:
-            fault_type_count[fault["fault_type"]] += 1
+        entry = daily.get(date_key, empty_day())
         
         # 修复成功率统计
-        total_repairs = len(day_repairs)
-        successful_repairs = sum(1 for r in day_repairs if r["success"])
-        success_rate = (successful_repairs / total_repairs * 100) if total_repairs > 0 else 0
+        total_repairs = sum(stats["count"] for stats in entry["repairs"].values())
+        successful_repairs = sum(stats["successful"] for stats in entry["repairs"].values())
         
         trend_data.append({
             "date": date_key,
-            "fault_count": len(day_faults),
+            "fault_count": sum(stats["count"] for stats in entry["faults"].values()),
             "repair_count": total_repairs,
             "successful_repairs": successful_repairs,
-            "success_rate": round(success_rate, 1),
-            "fault_types": dict(fault_type_count)
+            "success_rate": success_rate(successful_repairs, total_repairs),
+            "fault_types": {fault_type: stats["count"] for fault_type, stats in entry["faults"].items()}
         })
         
         current_date += timedelta(days=1)
     
     return trend_data
 
-def analyze_fault_distribution(days=30):
+def analyze_fault_distribution(days=30, rollup=None):
     """分析故障类型分布"""
-    fault_history = fault_analysis.load_fault_history()
-    
-    # 计算日期范围
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # 统计故障类型
-    fault_stats = defaultdict(lambda: {
-        "count": 0,
-        "name": "未知故障",
-        "first_occurrence": None,
-        "last_occurrence": None,
-        "avg_latency": []
-    })
-    
-    for record in fault_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            fault_type = record["fault_type"]
-            fault_stats[fault_type]["count"] += 1
-            fault_stats[fault_type]["name"] = record["fault_name"]
-            
-            # 更新首次和末次出现时间
-            if fault_stats[fault_type]["first_occurrence"] is None:
-                fault_stats[fault_type]["first_occurrence"] = record["timestamp"]
-            fault_stats[fault_type]["last_occurrence"] = record["timestamp"]
-            
-            # 收集延迟数据
-            if record["latency"]:
-                fault_stats[fault_type]["avg_latency"].append(record["latency"])
-    
-    # 计算平均延迟
-    for stats in fault_stats.values():
-        if stats["avg_latency"]:
-            stats["avg_latency"] = round(sum(stats["avg_latency"]) / len(stats["avg_latency"]), 1)
-        else:
-            stats["avg_latency"] = 0
-    
-    return dict(fault_stats)
+    fault_stats = {}
+    for fault_type, stats in merge_faults(entry for _, entry in query_rollup(days, rollup)).items():
+        avg_latency = stats["latency_sum"] / stats["latency_count"] if stats["latency_count"] else 0
+        fault_stats[fault_type] = {
+            "count": stats["count"],
+            "name": stats["name"],
+            "first_occurrence": stats["first"],
+            "last_occurrence": stats["last"],
+            "avg_latency": round(avg_latency, 1)
+        }
+    return fault_stats
 
-def analyze_repair_effectiveness(days=30):
+def analyze_repair_effectiveness(days=30, rollup=None):
     """分析修复方案效果"""
-    repair_history = fault_analysis.load_repair_history()
-    
-    # 计算日期范围
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # 统计修复方案效果
-    repair_stats = defaultdict(lambda: {
-        "count": 0,
-        "successful": 0,
-        "name": "未知修复方案",
-        "success_rate": 0
-    })
-    
-    # 按故障类型统计修复效果
-    fault_repair_stats = defaultdict(lambda: defaultdict(lambda: {
-        "count": 0,
-        "successful": 0,
-        "success_rate": 0
-    }))
-    
-    for record in repair_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            scheme = record["scheme"]
-            success = record["success"]
-            fault_type = record["fault_type"]
-            
-            # 总体修复方案统计
-            repair_stats[scheme]["count"] += 1
-            if success:
-                repair_stats[scheme]["successful"] += 1
-            repair_stats[scheme]["name"] = record["scheme_name"]
-            
-            # 按故障类型统计
-            if fault_type:
-                fault_repair_stats[fault_type][scheme]["count"] += 1
-                if success:
-                    fault_repair_stats[fault_type][scheme]["successful"] += 1
-    
-    # 计算成功率
-    for scheme, stats in repair_stats.items():
-        if stats["count"] > 0:
-            stats["success_rate"] = round(stats["successful"] / stats["count"] * 100, 1)
-    
-    # 计算按故障类型的成功率
-    for fault_type, schemes in fault_repair_stats.items():
-        for scheme, stats in schemes.items():
-            if stats["count"] > 0:
-                stats["success_rate"] = round(stats["successful"] / stats["count"] * 100, 1)
+    repair_stats = {}
+    fault_repair_stats = defaultdict(dict)
+    for scheme, stats in merge_repairs(entry for _, entry in query_rollup(days, rollup)).items():
+        repair_stats[scheme] = {
+            "count": stats["count"],
+            "successful": stats["successful"],
+            "name": stats["name"],
+            "success_rate": success_rate(stats["successful"], stats["count"])
+        }
+        # 按故障类型统计
+        for fault_type, counts in stats["by_fault"].items():
+            fault_repair_stats[fault_type][scheme] = dict(
+                counts, success_rate=success_rate(counts["successful"], counts["count"])
+            )
     
     return {
-        "overall": dict(repair_stats),
+        "overall": repair_stats,
         "by_fault_type": dict(fault_repair_stats)
     }
 
-def get_fault_summary(days=30):
+def get_fault_summary(days=30, rollup=None):
     """获取故障统计摘要"""
-    fault_history = fault_analysis.load_fault_history()
-    repair_history = fault_analysis.load_repair_history()
+    entries = [entry for _, entry in query_rollup(days, rollup)]
+    faults = merge_faults(entries)
+    repairs = merge_repairs(entries)
     
-    # 计算日期范围
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # 统计故障总数
-    total_faults = 0
-    fault_type_count = defaultdict(int)
-    for record in fault_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            total_faults += 1
-            fault_type_count[record["fault_type"]] += 1
-    
-    # 统计修复总数
-    total_repairs = 0
-    successful_repairs = 0
-    repair_scheme_count = defaultdict(int)
-    for record in repair_history:
-        record_date = datetime.fromisoformat(record["timestamp"])
-        if start_date <= record_date <= end_date:
-            total_repairs += 1
-            repair_scheme_count[record["scheme"]] += 1
-            if record["success"]:
-                successful_repairs += 1
-    
-    # 计算修复成功率
-    repair_success_rate = (successful_repairs / total_repairs * 100) if total_repairs > 0 else 0
+    fault_type_count = {fault_type: stats["count"] for fault_type, stats in faults.items()}
+    repair_scheme_count = {scheme: stats["count"] for scheme, stats in repairs.items()}
+    total_repairs = sum(repair_scheme_count.values())
+    successful_repairs = sum(stats["successful"] for stats in repairs.values())
     
     # 获取最常见故障类型
     most_common_fault = None
@@ -233,23 +137,24 @@ def get_fault_summary(days=30):
     
     return {
         "time_range": f"最近{days}天",
-        "total_faults": total_faults,
+        "total_faults": sum(fault_type_count.values()),
         "total_repairs": total_repairs,
-        "repair_success_rate": round(repair_success_rate, 1),
+        "repair_success_rate": success_rate(successful_repairs, total_repairs),
         "most_common_fault": most_common_fault,
         "most_effective_scheme": most_effective_scheme,
-        "fault_type_count": dict(fault_type_count),
-        "repair_scheme_count": dict(repair_scheme_count)
+        "fault_type_count": fault_type_count,
+        "repair_scheme_count": repair_scheme_count
     }
 
-def print_fault_analysis(days=30):
-    """打印故障分析报告"""
+def print_fault_analysis(days=30, rollup=None):
+    """打印故障分析报告（汇总只同步一次，最近记录只读取最新分段的末尾）"""
     print("=" * 60)
     print("网络故障原因及修复效果分析")
     print("=" * 60)
+    rollup = rollup if rollup is not None else fault_analysis.get_rollup()
     
     # 获取故障摘要
-    summary = get_fault_summary(days)
+    summary = get_fault_summary(days, rollup)
     print(f"\n【统计时间范围】{summary['time_range']}")
     print("-" * 50)
     print(f"  故障总数: {summary['total_faults']} 次")
@@ -267,23 +172,22 @@ def print_fault_analysis(days=30):
     # 故障类型分布
     print("\n【故障类型分布】")
     print("-" * 50)
-    fault_dist = analyze_fault_distribution(days)
+    fault_dist = analyze_fault_distribution(days, rollup)
     for fault_type, stats in sorted(fault_dist.items(), key=lambda x: x[1]['count'], reverse=True):
         print(f"  {stats['name']:<20} {stats['count']:>6} 次  平均延迟: {stats['avg_latency']:>5}ms")
     
     # 修复方案效果
     print("\n【修复方案效果】")
     print("-" * 50)
-    repair_effect = analyze_repair_effectiveness(days)
+    repair_effect = analyze_repair_effectiveness(days, rollup)
     for scheme, stats in sorted(repair_effect['overall'].items(), key=lambda x: x[1]['success_rate'], reverse=True):
         print(f"  {stats['name']:<20} 成功率: {stats['success_rate']:>5}%  ({stats['successful']}/{stats['count']} 次)")
     
     # 最近故障记录
     print("\n【最近故障记录】")
     print("-" * 50)
-    fault_history = fault_analysis.load_fault_history()
-    recent_faults = sorted(fault_history, key=lambda x: x['timestamp'], reverse=True)[:5]
-    for i, fault in enumerate(recent_faults, 1):
+    start_day = get_date_range(days)[0].strftime("%Y-%m-%d")
+    for i, fault in enumerate(fault_analysis.recent_faults(5, start_day), 1):
         timestamp = datetime.fromisoformat(fault['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
         print(f"  {i}. {timestamp} - {fault['fault_name']}")
         if fault['details']:
@@ -293,9 +197,7 @@ def print_fault_analysis(days=30):
     # 最近修复记录
     print("\n【最近修复记录】")
     print("-" * 50)
-    repair_history = fault_analysis.load_repair_history()
-    recent_repairs = sorted(repair_history, key=lambda x: x['timestamp'], reverse=True)[:5]
-    for i, repair in enumerate(recent_repairs, 1):
+    for i, repair in enumerate(fault_analysis.recent_repairs(5, start_day), 1):
         timestamp = datetime.fromisoformat(repair['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
         status = "成功" if repair['success'] else "失败"
         print(f"  {i}. {timestamp} - {repair['scheme_name']} - {status}")
@@ -307,26 +209,25 @@ def print_fault_analysis(days=30):
     print("故障分析报告完成")
     print("=" * 60)
 
-def generate_repair_report(repair_id=None, format="text"):
+def generate_repair_report(repair_id=None, format="text", last_id=None):
     """生成详细的修复报告
     
     Args:
         repair_id: 修复记录ID，None表示生成所有修复记录报告
         format: 报告格式，支持"text"和"json"
+        last_id: 结束ID（可选），与repair_id一起表示ID范围（含两端）
     
     Returns:
         生成的修复报告
     """
-    repair_history = fault_analysis.load_repair_history()
-    
     if repair_id:
-        # 生成单个修复记录报告
-        repair_record = next((r for r in repair_history if r.get("id") == repair_id), None)
-        if not repair_record:
+        # 按ID（或ID范围）经偏移索引直接定位修复记录
+        repair_records = fault_analysis.get_repair_records(repair_id, last_id)
+        if not repair_records:
             return f"找不到ID为{repair_id}的修复记录"
-        repair_records = [repair_record]
     else:
         # 生成所有修复记录报告，按时间倒序排序
+        repair_history = fault_analysis.load_repair_history()
         repair_records = sorted(repair_history, key=lambda x: x['timestamp'], reverse=True)
     
     if format == "json":
@@ -347,9 +248,9 @@ def generate_repair_report(repair_id=None, format="text"):
         report_lines.append(f"修复记录数量: {len(repair_records)}")
         report_lines.append("=" * 80)
         
-        for i, record in enumerate(repair_records, 1):
+        for record in repair_records:
             report_lines.append("")
-            report_lines.append(f"修复记录 #{i}")
+            report_lines.append(f"修复记录 #{record['id']}")
             report_lines.append("-" * 80)
             
             # 修复基本信息
@@ -406,19 +307,20 @@ def generate_repair_report(repair_id=None, format="text"):
         
         return "\n".join(report_lines)
 
-def save_repair_report(file_path, repair_id=None, format="text"):
+def save_repair_report(file_path, repair_id=None, format="text", last_id=None):
     """保存修复报告到文件
     
     Args:
         file_path: 报告文件路径
         repair_id: 修复记录ID，None表示生成所有修复记录报告
         format: 报告格式，支持"text"和"json"
+        last_id: 结束ID（可选），与repair_id一起表示ID范围（含两端）
     
     Returns:
         保存结果
     """
     try:
-        report = generate_repair_report(repair_id, format)
+        report = generate_repair_report(repair_id, format, last_id)
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(report)
         return f"修复报告已保存到: {file_path}"
@@ -427,15 +329,16 @@ def save_repair_report(file_path, repair_id=None, format="text"):
 
 def run():
     """运行故障分析功能"""
-    print_fault_analysis()
+    rollup = fault_analysis.get_rollup()
+    print_fault_analysis(rollup=rollup)
     
-    # 返回分析结果
+    # 返回分析结果（与打印的报告共用同一次汇总同步）
     return {
         "success": True,
-        "summary": get_fault_summary(),
-        "fault_distribution": analyze_fault_distribution(),
-        "repair_effectiveness": analyze_repair_effectiveness(),
-        "trends": analyze_fault_trends(),
+        "summary": get_fault_summary(rollup=rollup),
+        "fault_distribution": analyze_fault_distribution(rollup=rollup),
+        "repair_effectiveness": analyze_repair_effectiveness(rollup=rollup),
+        "trends": analyze_fault_trends(rollup=rollup),
         "report_generation": {
             "available_formats": ["text", "json"],
             "generate_report": "调用generate_repair_report()生成详细报告",
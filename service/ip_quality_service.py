@@ -13,6 +13,7 @@ from trace import fault_analysis
 
 # Import from subprojects
 from github_utils.common_utils import load_module
+from github_utils.sketch_utils import new_sketch, sketch_add, sketch_percentiles
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
@@ -57,6 +58,8 @@ def analyze_ip_quality(ip, latency, success):
         db[ip]["total_latency"] += latency
     if success:
         db[ip]["success_count"] += 1
+        # 延迟分布草图：长期累计且可合并，history 只保留最近几十条用于趋势展示
+        sketch_add(db[ip].setdefault("sketch", new_sketch()), latency)
     db[ip]["last_updated"] = time.time()
     
     # 添加历史记录
@@ -124,6 +127,7 @@ def get_ip_quality_report(ip):
         "success_count": data["success_count"],
         "success_rate": round(success_rate, 1),
         "avg_latency": round(avg_latency, 1),
+        "latency_percentiles": sketch_percentiles(data.get("sketch")),
         "last_updated": data["last_updated"],
         "history_trend": history_trend
     }
@@ -38,6 +38,9 @@ def print_status(status):
     print(f"异常次数:     {stats['abnormal']}")
     print(f"平均延迟:     {stats['avg_latency']}ms")
     print(f"可用率:       {stats['availability']}%")
+    percentiles = status.get('today_percentiles')
+    if stats['normal'] and percentiles:
+        print(f"延迟分位:     P50 {percentiles['p50']}ms / P95 {percentiles['p95']}ms / P99 {percentiles['p99']}ms")
     
     # 输出最近异常
     recent_abnormal = status['recent_abnormal']
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""追加式事件日志与偏移索引测试"""
+import json
+
+from github_utils.event_log_utils import EventLog, INDEX_ENTRY_SIZE
+
+
+def make_record(day, n):
+    return {"timestamp": f"2026-10-{day:02d}T10:00:{n:02d}", "n": n}
+
+
+def test_index_entries_are_fixed_width(tmp_path):
+    """每个ID占一条定长索引项，按ID定位到的分段和偏移量可以直接读出对应事件"""
+    log = EventLog(tmp_path, "repair", max_bytes=120, id_field="id")
+    for n in range(10):
+        log.append(make_record(10 + n // 4, n))
+    data = log.index_path.read_bytes()
+    assert len(data) == 10 * INDEX_ENTRY_SIZE == log.last_id() * INDEX_ENTRY_SIZE
+    assert all(len(line) + 1 == INDEX_ENTRY_SIZE for line in data.decode("ascii").splitlines())
+    for event_id, (segment, offset) in log.lookup_range(1, 10):
+        assert log.read_at(segment, offset)["id"] == event_id
+
+
+def test_lookup_range_clips_to_existing_ids(tmp_path):
+    """ID范围超出已有ID时截断，空范围返回空列表"""
+    log = EventLog(tmp_path, "repair", id_field="id")
+    for n in range(5):
+        log.append(make_record(10, n))
+    assert [event_id for event_id, _ in log.lookup_range(0, 3)] == [1, 2, 3]
+    assert [event_id for event_id, _ in log.lookup_range(4, 99)] == [4, 5]
+    assert log.lookup_range(4, 3) == []
+    assert [record["n"] for record in log.read_by_ids(2, 4)] == [1, 2, 3]
+
+
+def test_rebuilt_index_assigns_ids_to_legacy_events(tmp_path):
+    """升级前写入的事件没有ID：重建索引后由索引分配ID，读取、按ID查找与最近记录都带有该ID"""
+    legacy = EventLog(tmp_path, "repair")
+    for n in range(3):
+        legacy.append(make_record(10, n))
+    old_history = tmp_path / "repair_history.json"
+    old_history.write_text(json.dumps([make_record(9, 9)]), encoding="utf-8")
+
+    log = EventLog(tmp_path, "repair", id_field="id")
+    assert log.migrate(old_history) == 1
+    log.append(make_record(11, 4))
+    records = list(log.iter_records())
+    assert [(record["n"], record["id"]) for record in records] == [(9, 4), (0, 1), (1, 2), (2, 3), (4, 5)]
+    assert log.read_by_ids(2)[0]["n"] == 1
+    assert [record["id"] for record in log.tail(3)] == [5, 3, 2]
+
+
+def test_index_repaired_after_crash_between_writes(tmp_path):
+    """事件已写入分段但索引项未写入（以及写到一半的索引项）时，下次追加前补齐索引，ID不重复"""
+    log = EventLog(tmp_path, "repair", id_field="id")
+    for n in range(3):
+        log.append(make_record(10, n))
+    # 模拟进程在写入事件之后、写入索引项之前中断
+    crashed = dict(make_record(10, 3), id=4)
+    with open(log.segments()[-1][2], "ab") as f:
+        f.write((json.dumps(crashed) + "\n").encode("utf-8"))
+    with open(log.index_path, "ab") as f:
+        f.write(b"repair-2026")
+
+    log = EventLog(tmp_path, "repair", id_field="id")
+    log.append(make_record(10, 4))
+    assert log.index_path.stat().st_size == 5 * INDEX_ENTRY_SIZE
+    assert [record["n"] for record in log.read_by_ids(1, 5)] == [0, 1, 2, 3, 4]
+    assert [record["id"] for record in log.iter_records()] == [1, 2, 3, 4, 5]
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""分级健康探测测试"""
+from github_utils import probe_utils
+from github_utils.probe_utils import TieredProber
+
+
+def test_escalation_ignores_cached_tls_success(monkeypatch):
+    """TCP探测失败后升级到TLS时必须重新探测，不能沿用缓存中的TLS成功结果"""
+    tcp_results = [{"ok": True, "ms": 10}, {"ok": False, "ms": 0, "error": "timeout"}]
+    tls_results = [{"ok": True, "ms": 50}, {"ok": False, "ms": 0, "error": "timeout"}]
+    monkeypatch.setattr(probe_utils, "tcp_probe", lambda *args: tcp_results.pop(0))
+    monkeypatch.setattr(probe_utils, "tls_probe", lambda *args: tls_results.pop(0))
+    full_checks = []
+
+    def full_check(timeout=None):
+        full_checks.append(timeout)
+        return {"status": "bad", "ms": 0, "message": "连接失败"}
+
+    prober = TieredProber(full_check)
+    # 首次探测从TLS开始，随后TLS结果在间隔内有效，平时只做TCP探测
+    assert prober.probe()["tier"] == "tls"
+    assert prober.probe()["tier"] == "tcp"
+
+    # TCP缓存过期后重新探测失败，TLS缓存仍在间隔内
+    prober.last_run["tcp"] = 0
+    result = prober.probe()
+    assert result["status"] == "bad"
+    assert result["tier"] == "http"
+    assert not tls_results and len(full_checks) == 1
+
+
+def test_starting_tier_uses_cache():
+    """起始级别在间隔内直接使用缓存结果"""
+    prober = TieredProber(lambda timeout=None: {"status": "good", "ms": 1})
+    prober.last_run["tls"] = prober.last_run["tcp"] = probe_utils.time.time()
+    prober.last_result["tcp"] = {"ok": True, "ms": 7, "tier": "tcp"}
+    assert prober.probe() == {"status": "good", "ms": 7, "tier": "tcp", "message": "TCP探测正常"}
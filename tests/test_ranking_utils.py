@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""序贯测速排名测试"""
+import asyncio
+import time
+
+from github_utils.ranking_utils import cost_interval, prior_stats, sample_stream_async, undecided_ips
+from github_utils.sketch_utils import new_sketch, sketch_add
+
+PENALTY_MS = 5000
+LATENCIES = {"1.1.1.1": 50, "2.2.2.2": 200, "3.3.3.3": 400, "4.4.4.4": 600}
+
+
+def make_priors(age, samples=2):
+    """每个IP由 samples 个相同延迟的历史样本构造先验"""
+    priors = {}
+    for ip, latency in LATENCIES.items():
+        sketch = new_sketch()
+        for _ in range(samples):
+            sketch_add(sketch, latency)
+        priors[ip] = prior_stats(sketch, samples, samples, age)
+    return priors
+
+
+def test_fresh_prior_meets_min_samples():
+    """刚记录的历史样本经过几十秒衰减后仍满足最少采样次数，排名确定时不需要重新探测"""
+    priors = make_priors(age=60)
+    assert all(stats["total_count"] < 2 for stats in priors.values())
+    assert undecided_ips(priors, top_k=1) == set()
+
+
+def test_stale_prior_widens_interval():
+    """陈旧的先验只放宽置信区间，区间重叠的IP仍需采样"""
+    priors = make_priors(age=3 * 24 * 3600)
+    assert undecided_ips(priors, top_k=1) == set(LATENCIES)
+
+
+def run_stream(latencies, **options):
+    """用假的异步探测运行采样流，返回 (统计, 各IP每次探测的开始时间)"""
+    starts = {ip: [] for ip in latencies}
+
+    async def probe(ip):
+        starts[ip].append(time.monotonic())
+        await asyncio.sleep(0)
+        latency = latencies[ip]
+        return latency(len(starts[ip])) if callable(latency) else latency
+
+    options.setdefault("min_gap", 0)
+    stats = asyncio.run(sample_stream_async(list(latencies), probe, penalty_ms=PENALTY_MS, **options))
+    return stats, starts
+
+
+def ranking(stats):
+    """按代价均值排序的IP列表"""
+    return sorted(stats, key=lambda ip: cost_interval(stats[ip], PENALTY_MS)[0])
+
+
+def test_top_k_settles_after_min_samples():
+    """前K名与其余IP的置信区间分离后停止采样，每个IP只采样 min_samples 次"""
+    stats, _ = run_stream({"a": 10, "b": 20, "c": 500, "d": 600, "e": 700}, top_k=2, min_samples=2)
+    assert {ip: s["new_count"] for ip, s in stats.items()} == dict.fromkeys("abcde", 2)
+    assert ranking(stats)[:2] == ["a", "b"]
+
+
+def test_failures_cost_penalty():
+    """失败按惩罚延迟计入代价：总是失败或时好时坏的IP排在稳定较慢的IP之后"""
+    stats, _ = run_stream({"down": None, "flaky": lambda n: 10 if n % 2 else None, "steady": 100},
+                          top_k=1, min_samples=2, max_samples=4)
+    assert ranking(stats) == ["steady", "flaky", "down"]
+    assert cost_interval(stats["down"], PENALTY_MS)[0] == PENALTY_MS
+
+
+def test_ties_stop_at_max_samples():
+    """排名无法确定的并列IP最多采样 max_samples 次"""
+    stats, _ = run_stream({"a": 50, "b": 50, "c": 900}, top_k=1, min_samples=2, max_samples=4)
+    assert stats["a"]["new_count"] == stats["b"]["new_count"] == 4
+    assert stats["c"]["new_count"] == 2
+
+
+def test_samples_of_one_ip_are_spaced_by_min_gap():
+    """同一IP相邻两次采样的开始时间至少间隔 min_gap"""
+    _, starts = run_stream({"a": 50, "b": 50}, top_k=1, min_samples=2, max_samples=3, min_gap=0.05)
+    for times in starts.values():
+        assert len(times) == 3
+        assert all(later - earlier >= 0.05 - 1e-3 for earlier, later in zip(times, times[1:]))
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """连接诊断 - 基础工具函数"""
 import socket
-import subprocess
+import ssl
 import sys
 import time
 from pathlib import Path
@@ -11,22 +11,25 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # 导入故障分析模块，用于记录故障信息
 from trace import fault_analysis
+from github_utils.ping_utils import ping_hosts, default_gateways
+from github_utils.port_scan_utils import probe_port_matrix
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
 
 def ping_host(host, count=1, timeout=2000):
-    """ping 主机"""
-    try:
-        result = subprocess.run(
-            ["ping", "-n", str(count), "-w", str(timeout), host],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
+    """ping 主机（timeout 单位为毫秒）"""
+    return ping_hosts([host], count=count, timeout=timeout / 1000)[host]["received"] > 0
+
+
+def ping_many(hosts, count=1, timeout=2000):
+    """同时 ping 多个主机（timeout 单位为毫秒），返回每个主机的RTT和丢包率"""
+    return ping_hosts(hosts, count=count, timeout=timeout / 1000)
+
+
+def find_gateways():
+    """从系统路由表读取默认网关"""
+    return default_gateways()
 
 
 
@@ -41,11 +44,14 @@ def test_tcp_connectivity(host, port=443, timeout=5):
 
 
 def test_multiple_ports(host, ports=(443, 80, 22), timeout=3):
-    """测试多个端口的连接情况"""
-    results = {}
-    for port in ports:
-        results[port] = test_tcp_connectivity(host, port, timeout)
-    return results
+    """测试多个端口的连接情况（所有端口同时连接）"""
+    matrix = test_port_matrix([host], ports, timeout)
+    return {port: status == "open" for port, status in zip(matrix["ports"], matrix["status"][0])}
+
+
+def test_port_matrix(ips, ports=(443, 80, 22), timeout=3):
+    """并发测试 IP × 端口 矩阵，整个矩阵共用一个超时，返回每个单元格的状态和RTT"""
+    return probe_port_matrix(ips, ports, timeout)
 
 
 
@@ -116,12 +122,9 @@ def fallback_ip_quality_db():
 
 
 def fallback_quick_test(ips):
-    """备用方案4: 快速测试IP"""
-    results = []
-    for ip in ips[:10]:
-        if test_single_ip(ip):
-            results.append(ip)
-    return results
+    """备用方案4: 快速测试IP（同时连接所有IP的443端口）"""
+    matrix = test_port_matrix(ips[:10], [443], timeout=2)
+    return [ip for ip, (status,) in zip(matrix["ips"], matrix["status"]) if status == "open"]
 
 
 
@@ -139,13 +142,35 @@ def test_single_ip(ip, port=443, timeout=2):
 
 
 
+def verify_ip_sni(ip, host="github.com", port=443, timeout=3):
+    """直连IP并携带SNI完成TLS握手，校验证书确实属于host"""
+    start = time.time()
+    try:
+        context = ssl.create_default_context()
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host):
+                latency = int((time.time() - start) * 1000)
+        return {"ip": ip, "ok": True, "latency": latency}
+    except Exception as e:
+        return {"ip": ip, "ok": False, "latency": None, "error": str(e)}
+
+
+
 def fallback_manual_config():
     """备用方案5: 提供手动配置建议"""
     return {"manual": True}
 
 
-def run(progress_callback=None):
-    """连接诊断主函数 - 调用service层的复杂诊断逻辑"""
+def run(progress_callback=None, output_func=None):
+    """连接诊断主函数 - 调用service层的复杂诊断逻辑
+
+    Args:
+        progress_callback: 进度回调 (阶段, 结果摘要, 进度百分比)，每个阶段完成时调用
+        output_func: 界面输出函数（可选），未指定 progress_callback 时每个阶段的结果摘要输出一行
+    """
+    if progress_callback is None and output_func is not None:
+        def progress_callback(stage, message, percent):
+            output_func(f"[{percent:3d}%] {stage}: {message}")
     try:
         # 调用service层的连接诊断服务
         from service import connection_diagnostic_service
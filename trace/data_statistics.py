@@ -4,30 +4,18 @@ import sys
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
 
-# 导入辅助模块
-import sys
-from pathlib import Path
+from github_utils.scheduled_inspection_utils import iter_history, migrate_history
 
 # 从trace层内部导入辅助模块
-from .data_statistics_utils import (
-    load_inspection_history,
-    load_ip_quality_db,
-    save_inspection_history,
-    save_ip_quality_db,
-    get_records_by_date_range,
-    group_records_by_period
-)
-from .data_statistics_analysis import (
-    calculate_daily_stats,
-    calculate_trend_stats,
-    calculate_hourly_stats,
-    calculate_weekly_stats,
-    analyze_latency_distribution,
-    get_top_abnormal_ips
-)
+from .data_statistics_utils import load_ip_quality_db
+from .data_statistics_analysis import calculate_trend_stats, analyze_latency_distribution
+from .data_statistics_columnar import HistoryColumns
+from .data_statistics_index import update_index
 from .data_statistics_specific import (
+    aggregate_windows,
+    format_percentiles,
+    get_index_version,
     get_today_stats as get_today_stats_impl,
     get_weekly_stats as get_weekly_stats_impl,
     get_monthly_stats as get_monthly_stats_impl,
@@ -41,26 +29,84 @@ DATA_DIR = ROOT_DIR / "trace" / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
 # 数据文件路径
-INSPECTION_HISTORY = DATA_DIR / "inspection_history.json"
+INSPECTION_HISTORY = DATA_DIR / "inspection_history"
+LEGACY_HISTORY = DATA_DIR / "inspection_history.json"  # 旧版整文件历史，首次统计时迁移
+INSPECTION_INDEX = DATA_DIR / "inspection_index.json"
 IP_QUALITY_DB = ROOT_DIR / "trace" / "ip_quality_db.json"
+TREND_DAYS = 7  # 趋势与延迟分布报表覆盖的天数
 
 class DataStatistics:
     """数据统计类"""
     def __init__(self):
-        self.inspection_history = load_inspection_history(INSPECTION_HISTORY)
+        # 升级后尚未运行过定时巡检时，旧版历史也需要先迁移为分段文件
+        migrate_history(LEGACY_HISTORY, INSPECTION_HISTORY)
+        # 只增量读取巡检历史中尚未索引的部分，报表只查询范围内的聚合桶
+        self.index = update_index(INSPECTION_HISTORY, INSPECTION_INDEX)
         self.ip_quality_db = load_ip_quality_db(IP_QUALITY_DB)
+        self._windows = None
+        self._windows_key = None
+        self._columns = None
+        self._columns_key = None
+    
+    def refresh(self):
+        """重新同步索引，历史记录没有变化时沿用已计算的窗口"""
+        self.index = update_index(INSPECTION_HISTORY, INSPECTION_INDEX)
+        self.ip_quality_db = load_ip_quality_db(IP_QUALITY_DB)
+    
+    def get_windows(self):
+        """单次遍历计算所有统计窗口，按历史版本和日期缓存结果"""
+        key = (get_index_version(self.index), datetime.now().date())
+        if self._windows is None or self._windows_key != key:
+            self._windows = aggregate_windows(self.index)
+            self._windows_key = key
+        return self._windows
+    
+    def get_columns(self):
+        """近 TREND_DAYS 天巡检历史的列式表示，每次同步后历史有变化时才重新构建"""
+        today = datetime.now().date()
+        key = (get_index_version(self.index), today)
+        if self._columns is None or self._columns_key != key:
+            start_day = (today - timedelta(days=TREND_DAYS - 1)).isoformat()
+            self._columns = HistoryColumns(iter_history(INSPECTION_HISTORY, start_day))
+            self._columns_key = key
+        return self._columns
+    
+    def get_daily_trend(self):
+        """获取近几天的每日统计"""
+        return calculate_trend_stats(self.get_columns(), TREND_DAYS)
+    
+    def get_latency_distribution(self):
+        """获取近几天正常记录的延迟分布"""
+        return analyze_latency_distribution(self.get_columns())
     
     def get_today_stats(self):
         """获取今日统计数据"""
-        return get_today_stats_impl(self.inspection_history)
+        return get_today_stats_impl(self.get_windows(), self.ip_quality_db)
     
     def get_weekly_stats(self):
         """获取本周统计数据"""
-        return get_weekly_stats_impl(self.inspection_history)
+        return get_weekly_stats_impl(self.get_windows())
     
     def get_monthly_stats(self):
         """获取本月统计数据"""
-        return get_monthly_stats_impl(self.inspection_history)
+        return get_monthly_stats_impl(self.get_windows())
+    
+    def get_hourly_stats(self):
+        """获取每小时统计数据"""
+        return self.get_windows()["hourly"]
+    
+    def get_weekly_trend(self):
+        """获取每周统计数据"""
+        return self.get_windows()["weekly"]
+    
+    def collect_stats(self):
+        """汇总报表所需的全部统计数据"""
+        return {
+            "today": self.get_today_stats(),
+            "weekly": self.get_weekly_stats(),
+            "monthly": self.get_monthly_stats(),
+            "ip_usage": self.get_ip_usage_distribution()
+        }
     
     def get_ip_usage_distribution(self):
         """获取 IP 使用分布"""
@@ -68,13 +114,13 @@ class DataStatistics:
     
     def export_data(self, format="json"):
         """导出数据"""
-        stats = {
-            "today": self.get_today_stats(),
-            "weekly": self.get_weekly_stats(),
-            "monthly": self.get_monthly_stats(),
-            "ip_usage": self.get_ip_usage_distribution(),
-            "export_time": datetime.now().isoformat()
-        }
+        stats = self.collect_stats()
+        stats["export_time"] = datetime.now().isoformat()
+        if format == "json":
+            stats["hourly"] = self.get_hourly_stats()
+            stats["weekly_trend"] = self.get_weekly_trend()
+            stats["daily_trend"] = self.get_daily_trend()
+            stats["latency_distribution"] = self.get_latency_distribution()
         
         if format == "json":
             return json.dumps(stats, ensure_ascii=False, indent=2)
@@ -87,6 +133,8 @@ class DataStatistics:
             csv_lines.append(f"今日平均延迟(ms),{stats['today']['avg_latency']}")
             csv_lines.append(f"今日最佳延迟(ms),{stats['today']['best_latency']}")
             csv_lines.append(f"今日最差延迟(ms),{stats['today']['worst_latency']}")
+            csv_lines.append(f"今日P95延迟(ms),{stats['today']['percentiles']['p95']}")
+            csv_lines.append(f"今日P99延迟(ms),{stats['today']['percentiles']['p99']}")
             # 添加周统计
             csv_lines.append(f"本周可用率(%),{stats['weekly']['available_rate']}")
             csv_lines.append(f"本周平均延迟(ms),{stats['weekly']['avg_latency']}")
@@ -95,6 +143,7 @@ class DataStatistics:
             # 添加月统计
             csv_lines.append(f"本月可用率(%),{stats['monthly']['available_rate']}")
             csv_lines.append(f"本月平均延迟(ms),{stats['monthly']['avg_latency']}")
+            csv_lines.append(f"本月P95延迟(ms),{stats['monthly']['percentiles']['p95']}")
             csv_lines.append(f"本月异常天数,{stats['monthly']['abnormal_days']}")
             return "\n".join(csv_lines)
         return None
@@ -114,6 +163,7 @@ class DataStatistics:
         print(f"平均延迟:     {today_stats['avg_latency']}ms")
         print(f"最佳延迟:     {today_stats['best_latency']}ms")
         print(f"最差延迟:     {today_stats['worst_latency']}ms")
+        print(f"延迟分位:     {format_percentiles(today_stats['percentiles'])}")
         if today_stats['best_ip']:
             print(f"最优 IP:      {today_stats['best_ip']}")
         
@@ -123,6 +173,7 @@ class DataStatistics:
         print("-" * 50)
         print(f"可用率:       {weekly_stats['available_rate']}%")
         print(f"平均延迟:     {weekly_stats['avg_latency']}ms")
+        print(f"延迟分位:     {format_percentiles(weekly_stats['percentiles'])}")
         if weekly_stats['best_time_period']:
             print(f"最佳时段:     {weekly_stats['best_time_period']}")
         if weekly_stats['worst_time_period']:
@@ -134,8 +185,19 @@ class DataStatistics:
         print("-" * 50)
         print(f"可用率:       {monthly_stats['available_rate']}%")
         print(f"平均延迟:     {monthly_stats['avg_latency']}ms")
+        print(f"延迟分位:     {format_percentiles(monthly_stats['percentiles'])}")
         print(f"异常天数:     {monthly_stats['abnormal_days']} 天")
         
+        # 近几天趋势
+        print(f"\n【近{TREND_DAYS}天趋势】")
+        print("-" * 50)
+        for item in self.get_daily_trend():
+            day_stats = item["stats"]
+            print(f"{item['date']}  {day_stats['count']:>5} 次  可用率 {day_stats['availability']:>5}%  "
+                  f"平均 {day_stats['avg_latency']}ms")
+        distribution = "  ".join(f"{label} {count}" for label, count in self.get_latency_distribution().items())
+        print(f"延迟分布:     {distribution}")
+        
         # IP 使用排行榜
         ip_usage = self.get_ip_usage_distribution()
         print("\n【IP 使用排行榜】")
@@ -154,14 +216,10 @@ class DataStatistics:
         """运行数据统计功能"""
         self.print_statistics()
         
-        # 返回统计结果
-        return {
-            "success": True,
-            "today": self.get_today_stats(),
-            "weekly": self.get_weekly_stats(),
-            "monthly": self.get_monthly_stats(),
-            "ip_usage": self.get_ip_usage_distribution()
-        }
+        # 返回统计结果（复用打印时已缓存的窗口，不再重复计算）
+        result = {"success": True}
+        result.update(self.collect_stats())
+        return result
 
 def run():
     """运行数据统计功能"""
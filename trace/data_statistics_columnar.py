@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""数据统计 - 列式统计后端（可选NumPy向量化，缺失时退回纯Python实现）"""
+import bisect
+import math
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EPOCH = datetime(1970, 1, 1)
+STATUS_CODES = {"good": 0, "warn": 1, "bad": 2}
+BAD = STATUS_CODES["bad"]
+LATENCY_EDGES = (100, 200, 300)
+
+
+def to_local_epoch(timestamp):
+    """把本地ISO时间戳转换为自1970-01-01起的秒数（不做时区换算，按本地日期分桶）"""
+    return (datetime.fromisoformat(timestamp).replace(tzinfo=None) - EPOCH).total_seconds()
+
+
+def day_number(day):
+    """日期转换为自1970-01-01起的天数"""
+    return (datetime(day.year, day.month, day.day) - EPOCH).days
+
+
+class HistoryColumns:
+    """巡检历史的列式表示：时间戳、延迟、状态码各一列，只解析一次"""
+
+    def __init__(self, records=(), _columns=None):
+        if _columns is not None:
+            self.timestamps, self.latency, self.status = _columns
+        else:
+            timestamps, latency, status = [], [], []
+            for record in records:
+                timestamps.append(to_local_epoch(record["timestamp"]))
+                latency.append(record.get("latency") or 0)
+                status.append(STATUS_CODES.get(record["status"], STATUS_CODES["warn"]))
+            if np is not None:
+                self.timestamps = np.asarray(timestamps, dtype=np.float64)
+                self.latency = np.asarray(latency, dtype=np.float64)
+                self.status = np.asarray(status, dtype=np.int8)
+            else:
+                self.timestamps, self.latency, self.status = timestamps, latency, status
+        self.size = len(self.timestamps)
+
+    def period_keys(self, period):
+        """计算每条记录所属周期的整数键（hour/day/week，week为周一所在天数）"""
+        if np is not None:
+            if period == "hour":
+                return (self.timestamps // 3600).astype(np.int64)
+            days = (self.timestamps // 86400).astype(np.int64)
+            return days - (days + 3) % 7 if period == "week" else days
+        if period == "hour":
+            return [int(ts // 3600) for ts in self.timestamps]
+        days = [int(ts // 86400) for ts in self.timestamps]
+        return [day - (day + 3) % 7 for day in days] if period == "week" else days
+
+    def slice_days(self, start_day, end_day):
+        """截取日期范围（含两端）内的记录"""
+        low, high = day_number(start_day) * 86400, (day_number(end_day) + 1) * 86400
+        if np is not None:
+            mask = (self.timestamps >= low) & (self.timestamps < high)
+            return HistoryColumns(_columns=(self.timestamps[mask], self.latency[mask], self.status[mask]))
+        rows = [row for row in zip(self.timestamps, self.latency, self.status) if low <= row[0] < high]
+        return HistoryColumns(_columns=tuple(list(column) for column in zip(*rows)) if rows else ([], [], []))
+
+    def normal_latencies(self):
+        """正常记录的延迟列"""
+        if np is not None:
+            return self.latency[self.status != BAD]
+        return [latency for latency, status in zip(self.latency, self.status) if status != BAD]
+
+
+def as_columns(records):
+    """接受记录列表或已构建的 HistoryColumns"""
+    return records if isinstance(records, HistoryColumns) else HistoryColumns(records)
+
+
+def summarize(count, normal, latency_sum):
+    """根据计数与延迟和生成统计结果"""
+    avg_latency = latency_sum / normal if normal else 0
+    availability = normal / count * 100 if count else 0
+    return {
+        "count": int(count),
+        "normal": int(normal),
+        "abnormal": int(count - normal),
+        "avg_latency": round(float(avg_latency), 1),
+        "availability": round(float(availability), 1)
+    }
+
+
+def overall_stats(columns):
+    """整体统计"""
+    latencies = columns.normal_latencies()
+    return summarize(columns.size, len(latencies), sum(latencies) if np is None else latencies.sum())
+
+
+def key_label(key, period):
+    """整数周期键转换为展示标签"""
+    if period == "hour":
+        return (EPOCH + timedelta(hours=key)).strftime("%Y-%m-%d %H")
+    day = EPOCH + timedelta(days=key)
+    if period == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.strftime("%Y-%m-%d")
+
+
+def group_stats(columns, period="day"):
+    """按周期分组统计，返回按时间排序的 [(标签, 统计结果), ...]"""
+    if not columns.size:
+        return []
+    keys = columns.period_keys(period)
+    if np is not None:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        normal = columns.status != BAD
+        counts = np.bincount(inverse, minlength=len(unique))
+        normals = np.bincount(inverse, weights=normal.astype(np.float64), minlength=len(unique))
+        sums = np.bincount(inverse, weights=np.where(normal, columns.latency, 0), minlength=len(unique))
+        rows = zip(unique.tolist(), counts, normals, sums)
+    else:
+        groups = {}
+        for key, latency, status in zip(keys, columns.latency, columns.status):
+            entry = groups.setdefault(key, [0, 0, 0])
+            entry[0] += 1
+            if status != BAD:
+                entry[1] += 1
+                entry[2] += latency
+        rows = [(key, *groups[key]) for key in sorted(groups)]
+    return [(key_label(key, period), summarize(count, normal, total)) for key, count, normal, total in rows]
+
+
+def histogram_labels(edges=LATENCY_EDGES):
+    """延迟直方图的分桶标签"""
+    labels = [f"<{edges[0]}ms"]
+    labels += [f"{low}-{high}ms" for low, high in zip(edges, edges[1:])]
+    labels.append(f">{edges[-1]}ms")
+    return labels
+
+
+def latency_histogram(columns, edges=LATENCY_EDGES):
+    """正常记录的延迟直方图"""
+    latencies = columns.normal_latencies()
+    if np is not None:
+        counts = np.bincount(np.searchsorted(edges, latencies, side="right"), minlength=len(edges) + 1).tolist()
+    else:
+        counts = [0] * (len(edges) + 1)
+        for latency in latencies:
+            counts[bisect.bisect_right(edges, latency)] += 1
+    return dict(zip(histogram_labels(edges), counts))
+
+
+def latency_percentiles(columns, percentiles=(50, 90, 95, 99)):
+    """正常记录的延迟百分位数（线性插值，与 numpy.percentile 默认一致）"""
+    latencies = columns.normal_latencies()
+    if not len(latencies):
+        return {f"p{p}": 0 for p in percentiles}
+    if np is not None:
+        values = np.percentile(latencies, percentiles).tolist()
+    else:
+        ordered = sorted(latencies)
+        values = []
+        for p in percentiles:
+            position = (len(ordered) - 1) * p / 100
+            low, high = math.floor(position), math.ceil(position)
+            values.append(ordered[low] + (ordered[high] - ordered[low]) * (position - low))
+    return {f"p{p}": round(float(value), 1) for p, value in zip(percentiles, values)}
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""数据统计 - 按时间分区的巡检历史索引（按小时/按天预聚合）"""
+import json
+
+from github_utils.scheduled_inspection_utils import (
+    list_history_segments, SEGMENT_PREFIX, SEGMENT_SUFFIX
+)
+from github_utils.sketch_utils import new_sketch, sketch_add, sketch_merge, sketch_percentiles
+
+INDEX_VERSION = 2  # 2: 聚合桶附带延迟分布草图
+
+# 延迟直方图分桶（上界, 标签），None 表示无上界
+LATENCY_BUCKETS = [
+    (100, "<100ms"),
+    (200, "100-200ms"),
+    (300, "200-300ms"),
+    (None, ">300ms")
+]
+
+
+def new_bucket():
+    """创建空的聚合桶"""
+    return {
+        "count": 0,
+        "normal": 0,
+        "abnormal": 0,
+        "latency_sum": 0,
+        "latency_min": None,
+        "latency_max": None,
+        "histogram": {label: 0 for _, label in LATENCY_BUCKETS},
+        "sketch": new_sketch()
+    }
+
+
+def latency_label(latency):
+    """获取延迟所属的直方图分桶标签"""
+    for upper, label in LATENCY_BUCKETS:
+        if upper is None or latency < upper:
+            return label
+
+
+def add_record(bucket, record):
+    """将一条巡检记录累加到聚合桶"""
+    bucket["count"] += 1
+    if record["status"] == "bad":
+        bucket["abnormal"] += 1
+        return
+    latency = record.get("latency") or 0
+    bucket["normal"] += 1
+    bucket["latency_sum"] += latency
+    if bucket["latency_min"] is None or latency < bucket["latency_min"]:
+        bucket["latency_min"] = latency
+    if bucket["latency_max"] is None or latency > bucket["latency_max"]:
+        bucket["latency_max"] = latency
+    bucket["histogram"][latency_label(latency)] += 1
+    sketch_add(bucket["sketch"], latency)
+
+
+def merge_buckets(buckets):
+    """合并多个聚合桶"""
+    merged = new_bucket()
+    for bucket in buckets:
+        for key in ("count", "normal", "abnormal", "latency_sum"):
+            merged[key] += bucket[key]
+        for key, pick in (("latency_min", min), ("latency_max", max)):
+            if bucket[key] is not None:
+                merged[key] = bucket[key] if merged[key] is None else pick(merged[key], bucket[key])
+        for label, count in bucket["histogram"].items():
+            merged["histogram"][label] = merged["histogram"].get(label, 0) + count
+        sketch_merge(merged["sketch"], bucket.get("sketch"))
+    return merged
+
+
+def summarize_bucket(bucket):
+    """把聚合桶转换为统计结果"""
+    avg_latency = bucket["latency_sum"] / bucket["normal"] if bucket["normal"] else 0
+    availability = bucket["normal"] / bucket["count"] * 100 if bucket["count"] else 0
+    return {
+        "count": bucket["count"],
+        "normal": bucket["normal"],
+        "abnormal": bucket["abnormal"],
+        "avg_latency": round(avg_latency, 1),
+        "availability": round(availability, 1),
+        "best_latency": bucket["latency_min"] or 0,
+        "worst_latency": bucket["latency_max"] or 0,
+        "percentiles": sketch_percentiles(bucket["sketch"])
+    }
+
+
+def empty_index():
+    """创建空索引"""
+    return {"version": INDEX_VERSION, "segments": {}, "days": {}, "hours": {}}
+
+
+def load_index(index_path):
+    """加载索引文件，版本不一致时重建"""
+    if index_path.exists():
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            if index.get("version") == INDEX_VERSION:
+                return index
+        except Exception:
+            pass
+    return empty_index()
+
+
+def save_index(index, index_path):
+    """保存索引文件"""
+    try:
+        index_path.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        return True
+    except Exception:
+        return False
+
+
+def drop_day(index, day):
+    """删除某一天的全部聚合桶"""
+    index["days"].pop(day, None)
+    for hour in [key for key in index["hours"] if key.startswith(day)]:
+        del index["hours"][hour]
+
+
+def sync_index(index, history_dir):
+    """增量同步索引：只读取各分段文件中尚未索引的新增内容
+
+    Returns:
+        bool: 索引是否发生变化
+    """
+    segments = list_history_segments(history_dir)
+    present = {path.name for _, path in segments}
+    changed = False
+
+    # 分段被保留策略删除后，同步删除对应日期的聚合桶
+    for name in list(index["segments"]):
+        if name not in present:
+            drop_day(index, name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            del index["segments"][name]
+            changed = True
+
+    for day, path in segments:
+        offset = index["segments"].get(path.name, 0)
+        size = path.stat().st_size
+        if size < offset:
+            # 分段被重写，重新索引这一天
+            drop_day(index, day)
+            offset = 0
+        if size == offset:
+            continue
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # 只消费完整的行，未写完的最后一行留到下次同步
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            timestamp = record["timestamp"]
+            add_record(index["days"].setdefault(timestamp[:10], new_bucket()), record)
+            add_record(index["hours"].setdefault(timestamp[:13].replace("T", " "), new_bucket()), record)
+        index["segments"][path.name] = offset + end
+        changed = True
+
+    return changed
+
+
+def update_index(history_dir, index_path):
+    """同步并持久化索引，返回最新索引"""
+    index = load_index(index_path)
+    if sync_index(index, history_dir):
+        save_index(index, index_path)
+    return index
+
+
+def query_buckets(index, start_day, end_day, level="days"):
+    """获取日期范围内的聚合桶，按时间排序
+
+    Args:
+        index: 索引
+        start_day: 开始日期（YYYY-MM-DD）
+        end_day: 结束日期（YYYY-MM-DD）
+        level: "days" 或 "hours"
+
+    Returns:
+        list: [(key, bucket), ...]
+    """
+    buckets = index[level]
+    return [(key, buckets[key]) for key in sorted(buckets) if start_day <= key[:10] <= end_day]
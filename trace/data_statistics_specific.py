@@ -1,48 +1,154 @@
 #!/usr/bin/env python3
 """数据统计 - 特定功能模块"""
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
+from .data_statistics_index import merge_buckets, summarize_bucket
 
-def get_today_stats(records):
+WINDOWS = ("today", "week", "month", "hourly", "weekly")
+
+
+def get_index_version(index):
+    """索引版本：各分段已索引到的偏移量，历史记录有新增或删除时才会变化"""
+    return tuple(sorted(index["segments"].items()))
+
+
+def aggregate_windows(index, windows=WINDOWS, today=None):
+    """单次遍历天级和小时级聚合桶，同时填充所有请求的统计窗口
+
+    Args:
+        index: 巡检历史索引
+        windows: 需要计算的窗口，可选 today/week/month/hourly/weekly
+        today: 统计基准日期（默认今天）
+
+    Returns:
+        dict: 窗口名称到聚合结果的映射
+    """
+    today = today or datetime.now().date()
+    end = today.isoformat()
+    starts = {
+        "today": end,
+        "week": (today - timedelta(days=today.weekday())).isoformat(),
+        "month": today.replace(day=1).isoformat()
+    }
+    ranges = {name: [] for name in starts if name in windows}
+    abnormal_days = 0
+    weekly = {}
+    for day, bucket in sorted(index["days"].items()):
+        if day > end:
+            continue
+        for name in ranges:
+            if day >= starts[name]:
+                ranges[name].append(bucket)
+        if day >= starts["month"] and bucket["abnormal"]:
+            abnormal_days += 1
+        if "weekly" in windows:
+            year, week, _ = date.fromisoformat(day).isocalendar()
+            weekly.setdefault(f"{year}-W{week:02d}", []).append(bucket)
+
+    hourly = []
+    week_periods = {}
+    for key, bucket in sorted(index["hours"].items()):
+        if key[:10] > end:
+            continue
+        if "hourly" in windows:
+            hourly.append({"hour": key, "stats": summarize_bucket(bucket)})
+        if "week" in windows and key[:10] >= starts["week"]:
+            week_periods.setdefault(key[-2:], []).append(bucket)
+
+    result = {name: summarize_bucket(merge_buckets(buckets)) for name, buckets in ranges.items()}
+    if "week" in result:
+        result["week"]["time_periods"] = get_time_periods(week_periods)
+    if "month" in result:
+        result["month"]["abnormal_days"] = abnormal_days
+    if "hourly" in windows:
+        result["hourly"] = hourly
+    if "weekly" in windows:
+        result["weekly"] = [{"week": week, "stats": summarize_bucket(merge_buckets(buckets))}
+                            for week, buckets in sorted(weekly.items())]
+    return result
+
+
+def get_time_periods(periods):
+    """按一天中的小时汇总，返回 (最佳时段, 最差时段)"""
+    averages = []
+    for hour, buckets in periods.items():
+        stats = summarize_bucket(merge_buckets(buckets))
+        if stats["normal"]:
+            averages.append((stats["avg_latency"], hour))
+    if not averages:
+        return None, None
+
+    best_hour = min(averages)[1]
+    worst_hour = max(averages)[1]
+    return f"{best_hour}:00-{best_hour}:59", f"{worst_hour}:00-{worst_hour}:59"
+
+
+def get_best_ip(ip_quality_db):
+    """从IP质量数据库中选出成功率最高、延迟最低的IP"""
+    candidates = [(ip, data) for ip, data in ip_quality_db.items() if data.get("count")]
+    if not candidates:
+        return None
+    ip, _ = min(candidates, key=lambda item: (
+        -item[1]["success_count"] / item[1]["count"],
+        item[1]["total_latency"] / item[1]["count"]
+    ))
+    return ip
+
+
+def get_today_stats(windows, ip_quality_db=None):
     """获取今日统计数据"""
-    today = datetime.now().date()
-    today_records = [record for record in records if datetime.fromisoformat(record["timestamp"]).date() == today]
-    return today_records
+    stats = windows["today"]
+    return {
+        "test_count": stats["count"],
+        "success_rate": stats["availability"],
+        "avg_latency": stats["avg_latency"],
+        "best_latency": stats["best_latency"],
+        "worst_latency": stats["worst_latency"],
+        "percentiles": stats["percentiles"],
+        "best_ip": get_best_ip(ip_quality_db or {})
+    }
 
 
-def get_weekly_stats(records):
+def get_weekly_stats(windows):
     """获取本周统计数据"""
-    today = datetime.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    weekly_records = [record for record in records if week_start <= datetime.fromisoformat(record["timestamp"]).date() <= today]
-    return weekly_records
+    stats = windows["week"]
+    best_period, worst_period = stats["time_periods"]
+    return {
+        "available_rate": stats["availability"],
+        "avg_latency": stats["avg_latency"],
+        "percentiles": stats["percentiles"],
+        "best_time_period": best_period,
+        "worst_time_period": worst_period
+    }
 
 
-def get_monthly_stats(records):
+def get_monthly_stats(windows):
     """获取本月统计数据"""
-    today = datetime.now().date()
-    month_start = today.replace(day=1)
-    monthly_records = [record for record in records if month_start <= datetime.fromisoformat(record["timestamp"]).date() <= today]
-    return monthly_records
-
-
-def get_ip_usage_distribution(records):
-    """获取IP使用分布"""
-    if not records:
-        return {}
-    
-    ip_distribution = {}
-    total = len(records)
-    
-    for record in records:
-        if "ip" in record:
-            ip = record["ip"]
-            if ip not in ip_distribution:
-                ip_distribution[ip] = 0
-            ip_distribution[ip] += 1
-    
-    # 转换为百分比
-    for ip in ip_distribution:
-        ip_distribution[ip] = round((ip_distribution[ip] / total) * 100, 2)
-    
-    return dict(sorted(ip_distribution.items(), key=lambda x: x[1], reverse=True))
+    stats = windows["month"]
+    return {
+        "available_rate": stats["availability"],
+        "avg_latency": stats["avg_latency"],
+        "percentiles": stats["percentiles"],
+        "abnormal_days": stats["abnormal_days"]
+    }
+
+
+def get_ip_usage_distribution(ip_quality_db, top_n=10):
+    """获取IP使用分布（按测试次数排序）"""
+    usage = []
+    for ip, data in ip_quality_db.items():
+        count = data.get("count", 0)
+        if not count:
+            continue
+        usage.append({
+            "ip": ip,
+            "usage_count": count,
+            "success_rate": round(data.get("success_count", 0) / count * 100, 1)
+        })
+    usage.sort(key=lambda item: item["usage_count"], reverse=True)
+    return usage[:top_n]
+
+
+def format_percentiles(percentiles):
+    """格式化延迟分位数，如 P50 120ms / P95 310ms / P99 480ms"""
+    return " / ".join(f"P{key[1:]} {value:g}ms" for key, value in percentiles.items() if key != "p90")
@@ -4,9 +4,13 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from github_utils.scheduled_inspection_utils import iter_history
+
 
 def load_inspection_history(file_path):
-    """加载巡检历史数据"""
+    """加载巡检历史数据（目录为按天分段的JSONL，流式读取）"""
+    if file_path.is_dir():
+        return list(iter_history(file_path))
     if file_path.exists():
         try:
             return json.loads(file_path.read_text(encoding="utf-8"))
@@ -25,15 +29,6 @@ def load_ip_quality_db(file_path):
     return {}
 
 
-def save_inspection_history(data, file_path):
-    """保存巡检历史数据"""
-    try:
-        file_path.write_text(json.dumps(data, indent=4, ensure_ascii=False), encoding="utf-8")
-        return True
-    except Exception:
-        return False
-
-
 def save_ip_quality_db(data, file_path):
     """保存 IP 质量数据库"""
     try:
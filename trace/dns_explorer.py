@@ -6,26 +6,14 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-import importlib.util
-from pathlib import Path
-
-def load_module(module_path):
-    """动态加载模块"""
-    path = Path(module_path)
-    spec = importlib.util.spec_from_file_location("tool_module", path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+from github_utils.common_utils import subproject_module, lazy_function
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
-# 加载依赖模块
-tester_module = load_module(
-    "tester",
-    ROOT_DIR / "GitHub-searcher-test-测速" / "github_ip_tester.py"
-)
-test_ips = tester_module.test_all
-test_single = tester_module.test_homepage_speed
+# 依赖的子项目模块在首次调用时才加载，进程内共享
+tester_module = subproject_module("tester")
+test_ips = lazy_function(tester_module, "test_all")
+test_single = lazy_function(tester_module, "test_homepage_speed")
 
 def resolve_with_dns(server, domain="github.com"):
     """使用指定 DNS 服务器解析域名"""
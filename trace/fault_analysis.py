@@ -1,16 +1,27 @@
 #!/usr/bin/env python3
 """故障分析 - 基础日志记录和数据存储"""
-import json
 from pathlib import Path
 from datetime import datetime
 
+from github_utils.event_log_utils import EventLog
+from .fault_analysis_rollup import load_rollup, save_rollup, sync_log
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "trace" / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-# 故障记录文件路径
+# 故障/修复事件日志（按天分段的追加式JSONL），旧版整文件JSON首次使用时自动迁移
 FAULT_HISTORY = DATA_DIR / "fault_history.json"
 REPAIR_HISTORY = DATA_DIR / "repair_history.json"
+FAULT_LOG_DIR = DATA_DIR / "fault_log"
+REPAIR_LOG_DIR = DATA_DIR / "repair_log"
+ROLLUP_PATH = DATA_DIR / "fault_rollup.json"
+RETENTION_DAYS = 365
+
+fault_log = EventLog(FAULT_LOG_DIR, "fault", retention_days=RETENTION_DAYS)
+repair_log = EventLog(REPAIR_LOG_DIR, "repair", retention_days=RETENTION_DAYS, id_field="id")
+_migrated = False
+_rollup = None
 
 # 故障类型定义
 FAULT_TYPES = {
@@ -33,43 +44,66 @@ REPAIR_SCHEMES = {
 }
 
 
-def load_fault_history():
-    """加载故障历史记录"""
-    if FAULT_HISTORY.exists():
-        try:
-            with open(FAULT_HISTORY, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
-    return []
+def ensure_migrated():
+    """首次使用时把旧版整文件历史迁移为分段日志"""
+    global _migrated
+    if not _migrated:
+        fault_log.migrate(FAULT_HISTORY)
+        repair_log.migrate(REPAIR_HISTORY)
+        _migrated = True
+
+
+def iter_fault_history(start_day=None, end_day=None):
+    """流式读取日期范围内（YYYY-MM-DD，含两端）的故障记录"""
+    ensure_migrated()
+    return fault_log.iter_records(start_day, end_day)
+
 
+def iter_repair_history(start_day=None, end_day=None):
+    """流式读取日期范围内（YYYY-MM-DD，含两端）的修复记录"""
+    ensure_migrated()
+    return repair_log.iter_records(start_day, end_day)
 
 
-def save_fault_history(history):
-    """保存故障历史记录"""
-    with open(FAULT_HISTORY, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def load_fault_history(start_day=None, end_day=None):
+    """加载故障历史记录（可按日期范围只读取相关分段）"""
+    return list(iter_fault_history(start_day, end_day))
 
 
+def load_repair_history(start_day=None, end_day=None):
+    """加载修复历史记录（可按日期范围只读取相关分段）"""
+    return list(iter_repair_history(start_day, end_day))
 
-def load_repair_history():
-    """加载修复历史记录"""
-    if REPAIR_HISTORY.exists():
-        try:
-            with open(REPAIR_HISTORY, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return []
-    return []
 
+def recent_faults(limit=5, start_day=None):
+    """最近的 limit 条故障记录（最新的在前），只读取最新分段的末尾"""
+    ensure_migrated()
+    return fault_log.tail(limit, start_day)
 
 
-def save_repair_history(history):
-    """保存修复历史记录"""
-    with open(REPAIR_HISTORY, "w", encoding="utf-8-sig") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def recent_repairs(limit=5, start_day=None):
+    """最近的 limit 条修复记录（最新的在前），只读取最新分段的末尾"""
+    ensure_migrated()
+    return repair_log.tail(limit, start_day)
 
 
+def get_repair_records(first_id, last_id=None):
+    """按修复记录ID（或ID范围，含两端）直接读取，经偏移索引定位，不扫描历史"""
+    ensure_migrated()
+    return repair_log.read_by_ids(first_id, last_id)
+
+
+def get_rollup():
+    """获取按 (日期, 故障类型, 修复方案) 预聚合的汇总，只增量读取日志中新增的事件"""
+    global _rollup
+    ensure_migrated()
+    if _rollup is None:
+        _rollup = load_rollup(ROLLUP_PATH)
+    faults_changed = sync_log(_rollup, fault_log, "faults")
+    if sync_log(_rollup, repair_log, "repairs") or faults_changed:
+        save_rollup(_rollup, ROLLUP_PATH)
+    return _rollup
+
 
 def log_fault(fault_type, details=None, latency=None):
     """记录故障信息"""
@@ -81,30 +115,29 @@ def log_fault(fault_type, details=None, latency=None):
         "latency": latency
     }
     
-    history = load_fault_history()
-    history.append(fault_record)
-    save_fault_history(history)
+    ensure_migrated()
+    fault_log.append(fault_record)
     return fault_record
 
 
 
 def log_repair(scheme, success, fault_type=None, details=None):
-    """记录修复信息"""
+    """记录修复信息（自动分配单调递增的 id）"""
+    details = details or {}
     repair_record = {
         "timestamp": datetime.now().isoformat(),
         "scheme": scheme,
         "scheme_name": REPAIR_SCHEMES.get(scheme, "未知修复方案"),
         "success": success,
         "fault_type": fault_type,
-        "details": details or {},
+        "details": details,
         "reason": details.get("reason", "未明确"),
         "fix_method": details.get("fix_method", "未记录"),
         "verification": details.get("verification", "未验证")
     }
     
-    history = load_repair_history()
-    history.append(repair_record)
-    save_repair_history(history)
+    ensure_migrated()
+    repair_log.append(repair_record)
     return repair_record
 
 
@@ -118,7 +151,12 @@ def run():
             "log_fault - 记录故障信息",
             "log_repair - 记录修复信息",
             "load_fault_history - 加载故障历史",
-            "load_repair_history - 加载修复历史"
+            "load_repair_history - 加载修复历史",
+            "iter_fault_history - 按日期范围流式读取故障历史",
+            "iter_repair_history - 按日期范围流式读取修复历史",
+            "recent_faults - 读取最近的故障记录",
+            "recent_repairs - 读取最近的修复记录",
+            "get_repair_records - 按ID或ID范围读取修复记录"
         ]
     }
 
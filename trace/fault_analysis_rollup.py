@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""故障分析 - 按 (日期, 故障类型, 修复方案) 预聚合的事件汇总"""
+import json
+
+ROLLUP_VERSION = 1
+
+
+def empty_rollup():
+    """创建空汇总：segments 记录各日志分段已汇总到的字节偏移量"""
+    return {"version": ROLLUP_VERSION, "segments": {}, "days": {}}
+
+
+def empty_day():
+    """创建某一天的空汇总"""
+    return {"faults": {}, "repairs": {}}
+
+
+def load_rollup(rollup_path):
+    """加载汇总文件，版本不一致时重建"""
+    if rollup_path.exists():
+        try:
+            rollup = json.loads(rollup_path.read_text(encoding="utf-8"))
+            if rollup.get("version") == ROLLUP_VERSION:
+                return rollup
+        except Exception:
+            pass
+    return empty_rollup()
+
+
+def save_rollup(rollup, rollup_path):
+    """保存汇总文件"""
+    try:
+        rollup_path.write_text(json.dumps(rollup, ensure_ascii=False), encoding="utf-8")
+        return True
+    except Exception:
+        return False
+
+
+def add_fault(day, record):
+    """把一条故障记录累加到当天汇总"""
+    stats = day["faults"].setdefault(record["fault_type"], {
+        "name": record.get("fault_name", "未知故障"),
+        "count": 0,
+        "latency_sum": 0,
+        "latency_count": 0,
+        "first": record["timestamp"],
+        "last": record["timestamp"]
+    })
+    stats["count"] += 1
+    if record.get("latency"):
+        stats["latency_sum"] += record["latency"]
+        stats["latency_count"] += 1
+    stats["first"] = min(stats["first"], record["timestamp"])
+    stats["last"] = max(stats["last"], record["timestamp"])
+
+
+def add_repair(day, record):
+    """把一条修复记录累加到当天汇总（同时按故障类型细分）"""
+    stats = day["repairs"].setdefault(record["scheme"], {
+        "name": record.get("scheme_name", "未知修复方案"),
+        "count": 0,
+        "successful": 0,
+        "by_fault": {}
+    })
+    success = 1 if record.get("success") else 0
+    stats["count"] += 1
+    stats["successful"] += success
+    if record.get("fault_type"):
+        by_fault = stats["by_fault"].setdefault(record["fault_type"], {"count": 0, "successful": 0})
+        by_fault["count"] += 1
+        by_fault["successful"] += success
+
+
+def sync_log(rollup, event_log, kind):
+    """增量汇总一个事件日志中新增的内容（kind 为 faults 或 repairs）
+
+    Returns:
+        bool: 汇总是否发生变化
+    """
+    segments = event_log.segments()
+    present = {path.name for _, _, path in segments}
+    offsets = rollup["segments"]
+    add = add_fault if kind == "faults" else add_repair
+    changed = False
+
+    # 分段被清理或重写后，重新汇总受影响的日期
+    stale_days = set()
+    for name in [name for name in offsets if name.startswith(f"{event_log.prefix}-")]:
+        if name not in present:
+            stale_days.add(name[len(event_log.prefix) + 1:][:10])
+            del offsets[name]
+    for day, _, path in segments:
+        if path.stat().st_size < offsets.get(path.name, 0):
+            stale_days.add(day)
+    for day in stale_days:
+        entry = rollup["days"].get(day)
+        if entry is not None:
+            entry[kind] = {}
+        for _, _, path in event_log.segments(day, day):
+            offsets.pop(path.name, None)
+        changed = True
+
+    for day, _, path in segments:
+        offset = offsets.get(path.name, 0)
+        if path.stat().st_size == offset:
+            continue
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # 只消费完整的行，未写完的最后一行留到下次同步
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            add(rollup["days"].setdefault(record["timestamp"][:10], empty_day()), record)
+        offsets[path.name] = offset + end
+        changed = True
+
+    # 去掉已经没有任何事件的日期
+    for day in [day for day, entry in rollup["days"].items() if not entry["faults"] and not entry["repairs"]]:
+        del rollup["days"][day]
+    return changed
+
+
+def query_days(rollup, start_day, end_day):
+    """获取日期范围内（含两端）每天的汇总，按日期排序"""
+    days = rollup["days"]
+    return [(day, days[day]) for day in sorted(days) if start_day <= day <= end_day]
+
+
+def merge_faults(entries):
+    """合并多天的故障汇总，返回 {fault_type: 统计}"""
+    merged = {}
+    for entry in entries:
+        for fault_type, stats in entry["faults"].items():
+            target = merged.setdefault(fault_type, dict(stats, count=0, latency_sum=0, latency_count=0))
+            for key in ("count", "latency_sum", "latency_count"):
+                target[key] += stats[key]
+            target["first"] = min(target["first"], stats["first"])
+            target["last"] = max(target["last"], stats["last"])
+    return merged
+
+
+def merge_repairs(entries):
+    """合并多天的修复汇总，返回 {scheme: 统计}"""
+    merged = {}
+    for entry in entries:
+        for scheme, stats in entry["repairs"].items():
+            target = merged.setdefault(scheme, {"name": stats["name"], "count": 0, "successful": 0, "by_fault": {}})
+            target["count"] += stats["count"]
+            target["successful"] += stats["successful"]
+            for fault_type, counts in stats["by_fault"].items():
+                by_fault = target["by_fault"].setdefault(fault_type, {"count": 0, "successful": 0})
+                by_fault["count"] += counts["count"]
+                by_fault["successful"] += counts["successful"]
+    return merged
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """IP质量数据库 - 基础IP质量数据管理"""
 import json
+from datetime import datetime
 from pathlib import Path
 
+from github_utils.sketch_utils import new_sketch, sketch_add, sketch_percentiles
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 IP_QUALITY_DB = ROOT_DIR / "trace" / "ip_quality_db.json"
 IP_BLACKLIST = ROOT_DIR / "trace" / "ip_blacklist.json"
@@ -28,9 +31,8 @@ def save_ip_quality_db(db):
 
 
 
-def record_ip_result(ip, latency, success):
-    """记录单个IP的测试结果"""
-    db = load_ip_quality_db()
+def _apply_ip_result(db, ip, latency, success):
+    """把单次测试结果累加到数据库条目（含延迟分布草图）"""
     if ip not in db:
         db[ip] = {
             "count": 0, 
@@ -40,7 +42,7 @@ def record_ip_result(ip, latency, success):
             "last_test_time": None
         }
     db[ip]["count"] += 1
-    db[ip]["last_test_time"] = "now"  # 实际使用时应该记录时间戳
+    db[ip]["last_test_time"] = datetime.now().isoformat(timespec="seconds")
     
     if latency is not None:
         db[ip]["total_latency"] += latency
@@ -48,13 +50,52 @@ def record_ip_result(ip, latency, success):
     if success:
         db[ip]["success_count"] += 1
         db[ip]["last_success"] = True
+        sketch_add(db[ip].setdefault("sketch", new_sketch()), latency)
     else:
         db[ip]["last_success"] = False
-    
+
+
+def record_ip_result(ip, latency, success):
+    """记录单个IP的测试结果"""
+    db = load_ip_quality_db()
+    _apply_ip_result(db, ip, latency, success)
     save_ip_quality_db(db)
     return db
 
 
+def record_ip_results(results):
+    """批量记录测速结果（test_all 的返回格式），只读写一次数据库"""
+    db = load_ip_quality_db()
+    for r in results:
+        latency = r.get("latency")
+        _apply_ip_result(db, r["ip"], latency, bool(latency) and r.get("status", "OK") == "OK")
+    save_ip_quality_db(db)
+    return db
+
+
+def get_ip_latency_percentiles(ip):
+    """获取单个IP的延迟分位数（基于累计的分布草图）"""
+    info = get_ip_quality(ip) or {}
+    return sketch_percentiles(info.get("sketch"))
+
+
+
+def load_ip_priors(ips, now=None):
+    """由质量库的历史数据构造各IP的测速先验（按距上次测试的时间衰减），供排名采样流使用"""
+    from github_utils.ranking_utils import prior_stats  # 排名模块依赖 asyncio，用到时才导入
+    db = load_ip_quality_db()
+    now = now or datetime.now()
+    priors = {}
+    for ip in ips:
+        info = db.get(ip) or {}
+        try:
+            age = (now - datetime.fromisoformat(info["last_test_time"])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            age = None  # 没有记录真实测试时间的旧条目不作为先验
+        priors[ip] = prior_stats(info.get("sketch"), info.get("success_count", 0), info.get("count", 0), age)
+    return priors
+
+
 
 def get_ip_quality(ip):
     """获取单个IP的质量信息"""
@@ -131,6 +172,8 @@ if __name__ == "__main__":
     print("- load_ip_quality_db() - 加载IP质量数据库")
     print("- save_ip_quality_db(db) - 保存IP质量数据库")
     print("- record_ip_result(ip, latency, success) - 记录单个IP的测试结果")
+    print("- record_ip_results(results) - 批量记录测速结果")
+    print("- get_ip_latency_percentiles(ip) - 获取单个IP的延迟分位数")
     print("- get_ip_quality(ip) - 获取单个IP的质量信息")
     print("- load_blacklist() - 加载IP黑名单")
     print("- save_blacklist(blacklist) - 保存IP黑名单")
@@ -1,36 +1,20 @@
 #!/usr/bin/env python3
 """IP 速度排行榜 - 多次测速并记录历史数据，筛选出长期稳定的优质 IP"""
 import sys
-import time
-import statistics
 from pathlib import Path
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-import importlib.util
-from pathlib import Path
-
-def load_module(module_path):
-    """动态加载模块"""
-    path = Path(module_path)
-    spec = importlib.util.spec_from_file_location("tool_module", path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+from github_utils.sketch_utils import sketch_mean, sketch_variance, sketch_percentiles
+from trace.ip_quality_db import record_ip_results, load_ip_priors
+from github_utils.common_utils import subproject_module, lazy_function
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
-# 加载依赖模块
-dns_module = load_module(
-    ROOT_DIR / "GitHub-searcher-dns-DNS" / "github_dns.py"
-)
-get_dns_ips = dns_module.resolve_all
-
-tester_module = load_module(
-    ROOT_DIR / "GitHub-searcher-test-测速" / "github_ip_tester.py"
-)
-test_ips = tester_module.test_all
+# 依赖的子项目模块在首次调用时才加载，进程内共享
+dns_module = subproject_module("dns")
+get_dns_ips = lazy_function(dns_module, "resolve_all")
 
 def calculate_score(latency, success_rate, variance):
     """计算 IP 综合评分"""
@@ -59,15 +43,16 @@ def calculate_score(latency, success_rate, variance):
 
 def run():
     """运行 IP 速度排行榜功能"""
+    # 采样流依赖 asyncio/ssl，运行时才导入
+    from github_utils.ranking_utils import (
+        rank_ips_sequential, cost_interval, DEFAULT_TOP_K, DEFAULT_TIMEOUT, MIN_SAMPLES, MAX_SAMPLES
+    )
+    
     print("=" * 60)
     print("GitHub IP 速度排行榜")
     print("=" * 60)
     
-    # 配置参数
-    TEST_ROUNDS = 3
-    TEST_INTERVAL = 5  # 秒
-    
-    print(f"\n测试配置：{TEST_ROUNDS} 轮测速，间隔 {TEST_INTERVAL} 秒")
+    print(f"\n测试配置：每个 IP {MIN_SAMPLES}-{MAX_SAMPLES} 次交错采样，前 {DEFAULT_TOP_K} 名确定后停止")
     print("=" * 60)
     
     # 第一步：解析 DNS 获取所有 IP 地址
@@ -80,94 +65,85 @@ def run():
     
     print(f"  ✓ 找到 {len(ips)} 个 IP 地址")
     
-    # 第二步：执行多轮测速
-    all_results = {}
-    for round_num in range(TEST_ROUNDS):
-        print(f"\n[2/{TEST_ROUNDS+1}] 第 {round_num+1} 轮测速...")
-        
-        results = test_ips(ips)
-        
-        # 保存本轮结果
-        for r in results:
-            ip = r["ip"]
-            latency = r.get("latency")
-            
-            if ip not in all_results:
-                all_results[ip] = {
-                    "latencies": [],
-                    "success_count": 0,
-                    "total_count": 0
-                }
-            
-            all_results[ip]["total_count"] += 1
-            if latency:
-                all_results[ip]["latencies"].append(latency)
-                all_results[ip]["success_count"] += 1
-        
-        # 输出本轮最快 IP
-        fastest = min(results, key=lambda x: x.get("latency", float("inf")))
-        if fastest.get("latency"):
-            print(f"  本轮最快: {fastest['ip']} ({fastest['latency']}ms)")
-        
-        # 间隔时间
-        if round_num < TEST_ROUNDS - 1:
-            print(f"  等待 {TEST_INTERVAL} 秒进行下一轮...")
-            time.sleep(TEST_INTERVAL)
+    # 第二步：以质量库的历史数据为先验，只对不确定或数据过旧的 IP 交错采样（每个IP只维护一个延迟分布草图）
+    print("\n[2/5] 交错采样测速...")
+    priors = load_ip_priors(ips)
+    print(f"  {sum(1 for stats in priors.values() if stats['total_count'])} 个 IP 有可用的历史数据")
+    samples = []
+    all_results = rank_ips_sequential(
+        ips, stats_by_ip=priors, on_sample=lambda ip, latency: samples.append(
+            {"ip": ip, "latency": latency, "status": "OK" if latency is not None else "FAIL"}))
+    
+    # 新样本写回IP质量库（整个采样流只读写一次）
+    if samples:
+        record_ip_results(samples)
+    
+    fastest = min(samples, key=lambda x: x["latency"] if x["latency"] is not None else float("inf"), default=None)
+    print(f"  共采样 {len(samples)} 次（上限 {len(ips) * MAX_SAMPLES} 次）")
+    if fastest and fastest["latency"] is not None:
+        print(f"  最快样本: {fastest['ip']} ({fastest['latency']}ms)")
     
     # 第三步：计算统计数据
     print("\n[3/5] 计算统计数据...")
     ranking = []
     
     for ip, data in all_results.items():
-        latencies = data["latencies"]
+        sketch = data["sketch"]
         success_count = data["success_count"]
         total_count = data["total_count"]
         
-        if not latencies:
+        if not sketch["count"]:
             continue
         
         # 计算统计指标
-        avg_latency = statistics.mean(latencies)
-        variance = statistics.variance(latencies) if len(latencies) > 1 else 0
+        avg_latency = sketch_mean(sketch)
+        variance = sketch_variance(sketch)
         success_rate = success_count / total_count
         stability = 100 - (variance / 10)  # 转换为 0-100 分
         
         # 计算综合评分
         score = calculate_score(avg_latency, success_rate, variance)
         
+        # 平均代价（失败记为超时）：与采样流判定前K名使用同一指标，排行榜按它排序
+        cost = cost_interval(data, DEFAULT_TIMEOUT * 1000)[0]
+        
         ranking.append({
             "ip": ip,
+            "cost": round(cost),
             "avg_latency": round(avg_latency),
             "success_rate": round(success_rate * 100),
             "stability": round(stability),
+            "p95_latency": sketch_percentiles(sketch, (95,))["p95"],
+            "samples": data["new_count"],
             "score": score
         })
     
     # 第四步：排序生成排行榜
     print("\n[4/5] 生成排行榜...")
-    ranking.sort(key=lambda x: (-x["score"], x["avg_latency"]))
+    ranking.sort(key=lambda x: (x["cost"], x["avg_latency"]))
     
     # 输出排行榜
-    print("\n" + "=" * 60)
-    print("IP 地址          平均延迟    成功率    稳定度    综合评分")
-    print("-" * 60)
+    print("\n" + "=" * 70)
+    print("IP 地址          平均代价    平均延迟    成功率    稳定度    综合评分")
+    print("-" * 70)
     
     for item in ranking:
-        print(f"{item['ip']:<18} {item['avg_latency']}ms      {item['success_rate']}%     {item['stability']}%       {item['score']}")
+        print(f"{item['ip']:<18} {item['cost']}ms      {item['avg_latency']}ms      "
+              f"{item['success_rate']}%     {item['stability']}%       {item['score']}")
     
     # 第五步：生成稳定 IP 推荐
     print("\n" + "=" * 60)
     print("稳定 IP 推荐")
     print("-" * 60)
     
-    # 筛选稳定 IP（成功率 100%，综合评分 > 80）
-    stable_ips = [item for item in ranking if item["success_rate"] == 100 and item["score"] > 80]
+    # 推荐采样流已确定的前K名中成功率 100% 的 IP
+    stable_ips = [item for item in ranking[:DEFAULT_TOP_K] if item["success_rate"] == 100]
     
     if stable_ips:
-        print(f"共 {len(stable_ips)} 个稳定 IP，按评分排序：")
+        print(f"共 {len(stable_ips)} 个稳定 IP，按平均代价排序：")
         print("\n# GitHub 稳定 IP（自动生成）")
         print(f"# 生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"# 测试配置：{TEST_ROUNDS} 轮测速")
+        print(f"# 测试配置：交错采样 {len(samples)} 次")
         
         for item in stable_ips:
             print(f"{item['ip']}    github.com")
@@ -183,7 +159,7 @@ def run():
         "success": True,
         "ranking": ranking,
         "stable_ips": [item["ip"] for item in stable_ips],
-        "test_rounds": TEST_ROUNDS
+        "probes": len(samples)
     }
 
 
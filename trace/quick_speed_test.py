@@ -6,68 +6,16 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-import importlib.util
-import json
-from pathlib import Path
-
-
-def load_module(module_path):
-    """动态加载模块"""
-    path = Path(module_path)
-    spec = importlib.util.spec_from_file_location("tool_module", path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-def load_sub_config(sub_dir, sub_config_name="config.json"):
-    """加载子项目配置"""
-    root_dir = Path(__file__).resolve().parent.parent
-    sub_path = root_dir / sub_dir / sub_config_name
-    
-    if sub_path.exists():
-        with open(sub_path, "r", encoding="utf-8") as f:
-            sub_config = json.load(f)
-    else:
-        sub_config = {}
-    
-    # 加载根配置进行覆盖
-    config_path = root_dir / "config.json"
-    if config_path.exists():
-        with open(config_path, "r", encoding="utf-8") as f:
-            root_config = json.load(f)
-        
-        root_override_key = f"subprojects.{sub_dir}"
-        if root_override_key in root_config:
-            root_override = root_config[root_override_key]
-            sub_config = _deep_merge(sub_config, root_override)
-    
-    return sub_config
-
-
-def _deep_merge(base, override):
-    """深度合并配置"""
-    result = base.copy()
-    for key, value in override.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = _deep_merge(result[key], value)
-        else:
-            result[key] = value
-    return result
+from github_utils.common_utils import load_sub_config, subproject_module, lazy_function
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
-dns_module = load_module(
-    ROOT_DIR / "GitHub-searcher-dns-DNS" / "github_dns.py"
-)
-get_dns_ips = dns_module.resolve_all
-
-tester_module = load_module(
-    ROOT_DIR / "GitHub-searcher-test-测速" / "github_ip_tester.py"
-)
-test_ips = tester_module.test_all
+# 依赖的子项目模块在首次调用时才加载，进程内共享
+dns_module = subproject_module("dns")
+get_dns_ips = lazy_function(dns_module, "resolve_all")
 
-config_ips = load_sub_config("GitHub-searcher-test-测速").get("ips", [])
+tester_module = subproject_module("tester")
+test_ips = lazy_function(tester_module, "test_all")
 
 
 def get_quality_level(avg_latency):
@@ -90,6 +38,7 @@ def run():
     print("-" * 50)
 
     ips = get_dns_ips()
+    config_ips = load_sub_config("GitHub-searcher-test-测速").get("ips", [])
     
     if not ips:
         print("  ✗ 无法解析 DNS，尝试使用配置中的 IP...")
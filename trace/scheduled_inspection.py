@@ -1,34 +1,27 @@
 #!/usr/bin/env python3
 """定时巡检 - 定时检测 GitHub 连接状态，记录历史趋势，异常时发出告警"""
 import sys
-import time
-import json
-import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 
-# 导入辅助模块
-import sys
-from pathlib import Path
-
 # 从通用工具包导入辅助模块
-from github_utils import load_config, save_config, load_history, save_history
-from github_utils.common_utils import load_module
+from github_utils import (
+    load_config, save_config, load_history, prune_history,
+    append_history_record, prune_history_segments, migrate_history
+)
+from github_utils.health_utils import get_health_monitor
+from github_utils.sketch_utils import new_sketch, sketch_add, merge_sketches, sketch_percentiles
+from trace.data_statistics_columnar import HistoryColumns
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "trace" / "data"
 DATA_DIR.mkdir(exist_ok=True)
-HISTORY_DB = DATA_DIR / "inspection_history.json"
+HISTORY_DB = DATA_DIR / "inspection_history.json"  # 旧版整文件历史，首次加载时迁移
+HISTORY_DIR = DATA_DIR / "inspection_history"
 CONFIG_DB = DATA_DIR / "inspection_config.json"
 
-# 加载依赖模块
-checker_module = load_module(
-    ROOT_DIR / "github-checker-检测状态" / "github_checker.py"
-)
-check_github = checker_module.check
-
 class ScheduledInspector:
     """定时巡检类"""
     def __init__(self):
@@ -36,9 +29,15 @@ class ScheduledInspector:
         self.interval = 10 * 60  # 默认 10 分钟
         self.alert_method = "console"  # 默认控制台告警
         self.retention_days = 30  # 默认保留 30 天数据
+        self.last_prune_day = None
         self.history = self.load_history()
+        self._columns = (None, None)  # (历史版本, 列式表示)
+        self.sketches = {}  # 每小时的延迟分布草图，巡检时在线更新
+        for record in self.history:
+            self.add_to_sketch(record)
         self.config = self.load_config()
-        self.thread = None
+        # 探测由共享的健康状态服务统一调度，巡检只订阅结果
+        self.monitor = get_health_monitor()
     
     def load_config(self):
         """加载配置"""
@@ -63,32 +62,55 @@ class ScheduledInspector:
     
     def load_history(self):
         """加载历史记录"""
-        return load_history(HISTORY_DB)
-    
-    def save_history(self):
-        """保存历史记录"""
-        save_history(self.history, HISTORY_DB)
+        migrate_history(HISTORY_DB, HISTORY_DIR)
+        return load_history(HISTORY_DIR)
+    
+    def save_record(self, record):
+        """追加保存一条巡检记录，跨天时按分段清理旧数据"""
+        append_history_record(record, HISTORY_DIR)
+        day = record["timestamp"][:10]
+        if day != self.last_prune_day:
+            self.last_prune_day = day
+            self.clean_old_data()
     
     def clean_old_data(self):
         """清理旧数据"""
-        self.history = clean_old_data(self.history, self.retention_days)
+        self.history = prune_history(self.history, self.retention_days)
+        prune_history_segments(HISTORY_DIR, self.retention_days)
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d %H")
+        self.sketches = {hour: sketch for hour, sketch in self.sketches.items() if hour >= cutoff}
+    
+    def add_to_sketch(self, record):
+        """把正常记录的延迟累加到所属小时的草图"""
+        if record["status"] != "bad":
+            hour = record["timestamp"][:13].replace("T", " ")
+            sketch_add(self.sketches.setdefault(hour, new_sketch()), record.get("latency") or 0)
+    
+    def get_latency_percentiles(self, day=None):
+        """合并某一天（默认今天）各小时的草图，返回延迟分位数"""
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        return sketch_percentiles(merge_sketches(s for hour, s in self.sketches.items() if hour.startswith(day)))
     
     def run_inspection(self):
-        """执行一次巡检"""
+        """立即执行一次巡检（探测结果由健康状态服务共享，其他订阅者到期时直接采用）"""
+        return self.record_result(self.monitor.probe_now())
+    
+    def record_result(self, result):
+        """记录一次探测结果（订阅回调），异常时告警"""
         try:
-            result = check_github()
             timestamp = datetime.now().isoformat()
             
             inspection_record = {
                 "timestamp": timestamp,
                 "status": result["status"],
                 "latency": result.get("ms", 0),
-                "message": result.get("message", "")
+                "message": result.get("message", ""),
+                "tier": result.get("tier", "http")
             }
             
             self.history.append(inspection_record)
-            self.clean_old_data()
-            self.save_history()
+            self.add_to_sketch(inspection_record)
+            self.save_record(inspection_record)
             
             # 检查是否需要告警
             if result["status"] == "bad":
@@ -108,31 +130,26 @@ class ScheduledInspector:
             print(alert_message)
         # 可以扩展其他告警方式，如系统通知、邮件等
     
-    def inspection_loop(self):
-        """巡检循环"""
-        while self.is_running:
-            self.run_inspection()
-            time.sleep(self.interval)
-    
     def start(self):
-        """启动巡检"""
+        """启动巡检：订阅健康状态服务，至少每个巡检间隔探测一次"""
         if not self.is_running:
             self.is_running = True
-            self.thread = threading.Thread(target=self.inspection_loop, daemon=True)
-            self.thread.start()
+            self.monitor.subscribe(self.record_result, self.interval)
+            self.monitor.start()
             return True
         return False
     
     def stop(self):
         """停止巡检"""
         self.is_running = False
-        if self.thread:
-            self.thread.join(timeout=5)
+        self.monitor.unsubscribe(self.record_result)
         return True
     
     def set_interval(self, minutes):
         """设置巡检间隔"""
         self.interval = minutes * 60
+        if self.is_running:
+            self.monitor.subscribe(self.record_result, self.interval)
         self.save_config()
     
     def set_alert_method(self, method):
@@ -140,9 +157,16 @@ class ScheduledInspector:
         self.alert_method = method
         self.save_config()
     
+    def get_columns(self):
+        """巡检历史的列式表示：每次加载、追加或清理历史后只构建一次，统计时直接复用"""
+        version = (id(self.history), len(self.history))
+        if self._columns[0] != version:
+            self._columns = (version, HistoryColumns(self.history))
+        return self._columns[1]
+    
     def get_today_stats(self):
         """获取今日统计数据"""
-        return calculate_today_stats(self.history)
+        return calculate_today_stats(self.get_columns())
     
     def get_recent_abnormal(self, limit=5):
         """获取最近的异常记录"""
@@ -157,12 +181,13 @@ class ScheduledInspector:
             "retention_days": self.retention_days,
             "next_inspection": datetime.now() + timedelta(seconds=self.interval) if self.is_running else None,
             "today_stats": self.get_today_stats(),
+            "today_percentiles": self.get_latency_percentiles(),
             "recent_abnormal": self.get_recent_abnormal()
         }
 
 # 导入辅助模块
 from scheduled_inspection_cli import print_status, print_inspection_result
-from scheduled_inspection_stats import calculate_today_stats, get_recent_abnormal, clean_old_data
+from scheduled_inspection_stats import calculate_today_stats, get_recent_abnormal
 
 # 创建全局巡检实例
 inspector = ScheduledInspector()